@@ -2,7 +2,33 @@
 
 from __future__ import annotations
 
+from .cache import CacheEntry, DiskResponseCache, ResponseCache
+from .circuit import CircuitOpenError, HostCircuitBreaker
 from .config import FetcherConfig
 from .core import ClaudeCodeFetcher
+from .deadline import DeadlineExceededError, RunDeadline
+from .digest import SUPPORTED_HASH_ALGORITHMS
+from .generations import GenerationStore
+from .journal import RunJournal
+from .search import SEARCH_INDEX_FILE, build_search_index
+from .transport import HTTP2Session, TransferLog, create_session
 
-__all__ = ["ClaudeCodeFetcher", "FetcherConfig"]
+__all__ = [
+    "CacheEntry",
+    "CircuitOpenError",
+    "ClaudeCodeFetcher",
+    "DeadlineExceededError",
+    "DiskResponseCache",
+    "FetcherConfig",
+    "GenerationStore",
+    "HTTP2Session",
+    "HostCircuitBreaker",
+    "ResponseCache",
+    "RunDeadline",
+    "RunJournal",
+    "SEARCH_INDEX_FILE",
+    "SUPPORTED_HASH_ALGORITHMS",
+    "TransferLog",
+    "build_search_index",
+    "create_session",
+]
@@ -0,0 +1,322 @@
+"""HTTP response cache for the Claude Code documentation fetcher."""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+class CacheEntry:
+    """Metadata of one cached response."""
+
+    def __init__(
+        self,
+        url: str,
+        digest: str,
+        size: int,
+        validators: dict[str, str] | None = None,
+        fetched_at: float | None = None,
+        last_access: float | None = None,
+    ) -> None:
+        """Initialize a cache entry.
+
+        Args:
+            url: URL the response was fetched from.
+            digest: SHA-256 of the body, which is also its storage key.
+            size: Body size in bytes.
+            validators: ETag / Last-Modified sent by the server.
+            fetched_at: When the body was last downloaded or revalidated.
+            last_access: When the entry was last read, for LRU eviction.
+        """
+        now = time.time()
+        self.url = url
+        self.digest = digest
+        self.size = size
+        self.validators = validators or {}
+        self.fetched_at = fetched_at if fetched_at is not None else now
+        self.last_access = last_access if last_access is not None else now
+
+    def is_fresh(self, ttl_seconds: float) -> bool:
+        """Check whether the entry can be used without contacting the server."""
+        return ttl_seconds > 0 and time.time() - self.fetched_at < ttl_seconds
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize the entry for the on-disk index."""
+        return {
+            "url": self.url,
+            "digest": self.digest,
+            "size": self.size,
+            "validators": self.validators,
+            "fetched_at": self.fetched_at,
+            "last_access": self.last_access,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> CacheEntry:
+        """Deserialize an entry from the on-disk index."""
+        return cls(
+            url=data["url"],
+            digest=data["digest"],
+            size=data["size"],
+            validators=data.get("validators"),
+            fetched_at=data.get("fetched_at"),
+            last_access=data.get("last_access"),
+        )
+
+    def __repr__(self) -> str:
+        return f"CacheEntry(url={self.url}, size={self.size})"
+
+
+class ResponseCache(ABC):
+    """Interface for caches consulted by the fetcher before hitting the network.
+
+    Implementations must be safe to use from several worker threads.
+    """
+
+    @abstractmethod
+    def lookup(self, url: str) -> CacheEntry | None:
+        """Get the entry cached for a URL, if any."""
+
+    @abstractmethod
+    def read_body(self, entry: CacheEntry) -> bytes:
+        """Read the body of a cached entry."""
+
+    @abstractmethod
+    def store(self, url: str, body: bytes, validators: dict[str, str]) -> CacheEntry:
+        """Cache a freshly downloaded body."""
+
+    def store_stream(
+        self, url: str, chunks: Iterable[bytes], validators: dict[str, str]
+    ) -> Iterator[bytes]:
+        """Cache a body while passing its chunks through to the caller.
+
+        The default implementation buffers the chunks and stores them once
+        the stream is exhausted; a stream abandoned early is not cached.
+        """
+        buffered = []
+        for chunk in chunks:
+            buffered.append(chunk)
+            yield chunk
+        self.store(url, b"".join(buffered), validators)
+
+    @abstractmethod
+    def refresh(self, url: str, validators: dict[str, str] | None = None) -> None:
+        """Mark a cached entry as revalidated by the server just now."""
+
+    @abstractmethod
+    def evict(self, url: str) -> None:
+        """Drop the entry cached for a URL, e.g. after its body failed validation."""
+
+    def as_response(self, entry: CacheEntry, cache_status: str) -> requests.Response:
+        """Build a requests.Response serving a cached body.
+
+        Args:
+            entry: Cached entry to serve.
+            cache_status: Value of the X-Cache header, e.g. "HIT".
+
+        Returns:
+            A 200 response whose content is the cached body.
+        """
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.url = entry.url
+        response.encoding = "utf-8"
+        # Served like a downloaded body: .content and iter_content() read it
+        # from raw, without touching requests' private state
+        response.raw = io.BytesIO(self.read_body(entry))
+        headers: CaseInsensitiveDict[str] = CaseInsensitiveDict()
+        if entry.validators.get("etag"):
+            headers["ETag"] = entry.validators["etag"]
+        if entry.validators.get("http_last_modified"):
+            headers["Last-Modified"] = entry.validators["http_last_modified"]
+        headers["X-Cache"] = cache_status
+        response.headers = headers
+        return response
+
+
+class DiskResponseCache(ResponseCache):
+    """Content-addressed on-disk response store with TTL and LRU eviction.
+
+    Bodies live in ``objects/<aa>/<sha256>``, so identical responses (for
+    example the same page reached through two URLs) are stored once. The
+    URL index lives in ``index.json``. The directory can be saved and
+    restored between CI runs as-is.
+    """
+
+    def __init__(self, root: Path | str, *, max_bytes: int = 64 * 1024 * 1024) -> None:
+        """Initialize the cache.
+
+        Args:
+            root: Cache directory. Created on first write.
+            max_bytes: Total body size kept before least recently used
+                entries are evicted.
+        """
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = self._load_index()
+
+    @property
+    def _index_path(self) -> Path:
+        return self.root / "index.json"
+
+    def _object_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / digest
+
+    def _load_index(self) -> dict[str, CacheEntry]:
+        """Load the URL index, ignoring entries whose body has disappeared."""
+        try:
+            data = json.loads(self._index_path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+        entries = {}
+        for item in data.get("entries", []):
+            try:
+                entry = CacheEntry.from_dict(item)
+            except (KeyError, TypeError):
+                continue
+            if self._object_path(entry.digest).exists():
+                entries[entry.url] = entry
+        return entries
+
+    def _save_index(self) -> None:
+        """Atomically persist the URL index. Caller must hold the lock."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        payload = json.dumps(
+            {"entries": [entry.to_dict() for entry in self._entries.values()]}
+        )
+        fd, tmp_name = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        with os.fdopen(fd, "w") as tmp_file:
+            tmp_file.write(payload)
+        Path(tmp_name).replace(self._index_path)
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until under max_bytes.
+
+        Caller must hold the lock.
+        """
+        live: dict[str, int] = {}
+        for entry in self._entries.values():
+            live[entry.digest] = entry.size
+        total = sum(live.values())
+
+        for entry in sorted(self._entries.values(), key=lambda e: e.last_access):
+            if total <= self.max_bytes:
+                break
+            del self._entries[entry.url]
+            if not any(e.digest == entry.digest for e in self._entries.values()):
+                total -= entry.size
+                self._object_path(entry.digest).unlink(missing_ok=True)
+
+    def _commit(
+        self, url: str, tmp_path: Path, digest: str, size: int, validators: dict
+    ) -> CacheEntry:
+        """Move a written body into place and index it."""
+        object_path = self._object_path(digest)
+        object_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.replace(object_path)
+
+        entry = CacheEntry(url, digest, size, validators)
+        with self._lock:
+            previous = self._entries.get(url)
+            self._entries[url] = entry
+            if previous is not None and not any(
+                e.digest == previous.digest for e in self._entries.values()
+            ):
+                self._object_path(previous.digest).unlink(missing_ok=True)
+            self._evict()
+            self._save_index()
+        return entry
+
+    def _tmp_file(self) -> tuple[int, Path]:
+        """Create a temporary body file inside the cache directory."""
+        tmp_dir = self.root / "tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=tmp_dir)
+        return fd, Path(tmp_name)
+
+    def lookup(self, url: str) -> CacheEntry | None:
+        """Get the entry cached for a URL, if any."""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                entry.last_access = time.time()
+            return entry
+
+    def read_body(self, entry: CacheEntry) -> bytes:
+        """Read the body of a cached entry."""
+        return self._object_path(entry.digest).read_bytes()
+
+    def store(self, url: str, body: bytes, validators: dict[str, str]) -> CacheEntry:
+        """Cache a freshly downloaded body."""
+        fd, tmp_path = self._tmp_file()
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(body)
+        digest = hashlib.sha256(body).hexdigest()
+        return self._commit(url, tmp_path, digest, len(body), validators)
+
+    def store_stream(
+        self, url: str, chunks: Iterable[bytes], validators: dict[str, str]
+    ) -> Iterator[bytes]:
+        """Cache a body while passing its chunks through to the caller.
+
+        Chunks go straight to a temporary file and are hashed on the way, so
+        the body is never held in memory. A stream abandoned early is
+        discarded.
+        """
+        fd, tmp_path = self._tmp_file()
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                for chunk in chunks:
+                    tmp_file.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+                    yield chunk
+            self._commit(url, tmp_path, digest.hexdigest(), size, validators)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def refresh(self, url: str, validators: dict[str, str] | None = None) -> None:
+        """Mark a cached entry as revalidated by the server just now."""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return
+            entry.fetched_at = time.time()
+            if validators:
+                entry.validators = {**entry.validators, **validators}
+            self._save_index()
+
+    def evict(self, url: str) -> None:
+        """Drop the entry cached for a URL, e.g. after its body failed validation."""
+        with self._lock:
+            entry = self._entries.pop(url, None)
+            if entry is None:
+                return
+            if not any(e.digest == entry.digest for e in self._entries.values()):
+                self._object_path(entry.digest).unlink(missing_ok=True)
+            self._save_index()
+
+    def total_bytes(self) -> int:
+        """Get the total size of the cached bodies."""
+        with self._lock:
+            return sum({e.digest: e.size for e in self._entries.values()}.values())
+
+    def __repr__(self) -> str:
+        return f"DiskResponseCache(root={self.root}, entries={len(self._entries)})"
@@ -0,0 +1,167 @@
+"""Per-host circuit breakers for the documentation fetcher."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any
+from urllib.parse import urlparse
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+    def __init__(self, host: str, retry_in: float) -> None:
+        super().__init__(
+            f"Circuit open for {host} after repeated failures; "
+            f"next probe in {retry_in:.0f}s"
+        )
+        self.host = host
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Thread-safe circuit breaker for one host.
+
+    After ``threshold`` consecutive failures the circuit opens and every
+    request fails immediately. Once ``reset_timeout`` seconds have passed, a
+    single probe request is let through (half-open): its success closes the
+    circuit, its failure opens it again for another ``reset_timeout``.
+    """
+
+    def __init__(self, threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        """Initialize a closed circuit.
+
+        Args:
+            threshold: Consecutive failures that open the circuit.
+            reset_timeout: Seconds the circuit stays open before a probe.
+        """
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self.short_circuited = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self, *, probe: bool = True) -> float | None:
+        """Decide whether a request may be sent now.
+
+        Args:
+            probe: Claim the probe slot when the circuit is ready for one.
+                Without it, only a circuit still waiting out its timeout
+                refuses (e.g. to skip a back-off before a doomed retry).
+
+        Returns:
+            None if it may, otherwise the seconds until the next probe.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return None
+
+            remaining = self._opened_at + self.reset_timeout - time.monotonic()
+            if self.state == OPEN and remaining <= 0:
+                if not probe:
+                    return None
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._probing:
+                if probe:
+                    self._probing = True
+                return None
+
+            self.short_circuited += 1
+            return max(remaining, 0.0)
+
+    def record_success(self) -> None:
+        """Record a request the host answered (anything but a 5xx)."""
+        with self._lock:
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        """Record a connection error, timeout or 5xx response."""
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or (
+                self.state == CLOSED and self.consecutive_failures >= self.threshold
+            ):
+                self.state = OPEN
+                self.times_opened += 1
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def snapshot(self) -> dict[str, Any]:
+        """Get the state of the circuit for run results."""
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "times_opened": self.times_opened,
+                "short_circuited": self.short_circuited,
+            }
+
+
+class HostCircuitBreaker:
+    """Keeps one circuit breaker per origin host."""
+
+    def __init__(self, threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        """Initialize the per-host breakers.
+
+        Args:
+            threshold: Consecutive failures that open a host's circuit. Zero
+                disables the breakers.
+            reset_timeout: Seconds a circuit stays open before a probe.
+        """
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def breaker_for(self, url: str) -> CircuitBreaker:
+        """Get (or create) the breaker for the host of a URL."""
+        host = urlparse(url).netloc
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(self.threshold, self.reset_timeout)
+                self._breakers[host] = breaker
+            return breaker
+
+    def check(self, url: str, *, probe: bool = True) -> None:
+        """Make sure a request to the host of ``url`` may be sent.
+
+        Args:
+            url: URL about to be requested.
+            probe: Claim the half-open probe slot; see CircuitBreaker.allow.
+
+        Raises:
+            CircuitOpenError: If the host's circuit is open.
+        """
+        if self.threshold <= 0:
+            return
+        retry_in = self.breaker_for(url).allow(probe=probe)
+        if retry_in is not None:
+            raise CircuitOpenError(urlparse(url).netloc, retry_in)
+
+    def record(self, url: str, *, failed: bool) -> None:
+        """Feed the outcome of a request to the host's breaker."""
+        if self.threshold <= 0:
+            return
+        breaker = self.breaker_for(url)
+        if failed:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+    def states(self) -> dict[str, dict[str, Any]]:
+        """Get the state of every host seen so far."""
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {host: breaker.snapshot() for host, breaker in breakers.items()}
@@ -4,6 +4,10 @@ from __future__ import annotations
 
 from pathlib import Path
 
+from .digest import SUPPORTED_HASH_ALGORITHMS
+from .search import SEARCH_INDEX_FILE
+from .transport import supported_encodings
+
 
 class FetcherConfig:
     """Configuration for the Claude Code documentation fetcher."""
@@ -13,53 +17,233 @@ class FetcherConfig:
         *,
         docs_dir: Path | str | None = None,
         sitemap_urls: list[str] | None = None,
+        changelog_url: str = (
+            "https://raw.githubusercontent.com/anthropics/claude-code/main/CHANGELOG.md"
+        ),
         manifest_file: str = "docs_manifest.json",
+        search_index_file: str | None = SEARCH_INDEX_FILE,
         max_retries: int = 3,
         retry_delay: float = 2.0,
         max_retry_delay: float = 30.0,
         rate_limit_delay: float = 0.5,
         timeout: int = 30,
         user_agent: str = "Claude-Code-Docs-Fetcher/3.0",
+        accept_encoding: str | None = None,
+        max_workers: int = 4,
+        pool_maxsize: int | None = None,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False,
+        requests_per_second: float | None = None,
+        adaptive_rate_limit: bool = True,
+        min_requests_per_second: float = 0.2,
+        max_requests_per_second: float | None = None,
+        max_retry_after: float = 300.0,
+        circuit_breaker_threshold: int = 5,
+        circuit_breaker_reset_seconds: float = 30.0,
+        conditional_requests: bool = True,
+        cache_dir: Path | str | None = None,
+        generations_dir: Path | str | None = None,
+        keep_generations: int = 3,
+        incremental: bool = False,
+        full_sweep_interval_hours: float = 24.0,
+        use_response_cache: bool = True,
+        cache_ttl_seconds: float = 0.0,
+        cache_max_bytes: int = 64 * 1024 * 1024,
+        resume: bool = False,
+        stream_downloads: bool = True,
+        max_body_bytes: int = 10 * 1024 * 1024,
+        hash_algorithm: str = "sha256",
+        metrics_file: Path | str | None = None,
+        deadline_seconds: float | None = None,
     ) -> None:
         """Initialize fetcher configuration.
 
         Args:
             docs_dir: Directory to save documentation. Defaults to project root/docs.
             sitemap_urls: List of sitemap URLs to try. Defaults to common Anthropic URLs.
+            changelog_url: Raw URL of the Claude Code changelog.
             manifest_file: Name of the manifest file.
+            search_index_file: Name of the full-text search index built from
+                the fetched pages after each run, for ``/docs search``. None
+                builds no index.
             max_retries: Maximum number of retries for failed requests.
             retry_delay: Initial retry delay in seconds.
             max_retry_delay: Maximum retry delay in seconds.
             rate_limit_delay: Delay between requests in seconds.
             timeout: Request timeout in seconds.
             user_agent: User-Agent string for HTTP requests.
+            accept_encoding: Accept-Encoding sent with every request. Defaults
+                to the codings the transport can decode (zstd and br when
+                their codec is installed, then gzip and deflate).
+            max_workers: Number of pages fetched concurrently. 1 fetches serially.
+            pool_maxsize: Keep-alive connections pooled per host. Defaults to
+                max_workers so no worker waits for (or reopens) a connection.
+            keepalive_expiry: Seconds an idle HTTP/2 connection is kept open.
+            http2: Multiplex every request to a host over one HTTP/2
+                connection. Requires the optional httpx[http2] dependency.
+            requests_per_second: Request rate allowed per host. Defaults to
+                1 / rate_limit_delay (unlimited when the delay is 0). This is
+                the starting rate when adaptive_rate_limit is set.
+            adaptive_rate_limit: Raise the per-host rate while responses are
+                fast and healthy, and cut it on 429 / 5xx.
+            min_requests_per_second: Lowest rate the adaptive limiter backs
+                off to.
+            max_requests_per_second: Highest rate the adaptive limiter climbs
+                to. Defaults to four times requests_per_second.
+            max_retry_after: Longest pause, in seconds, honoured from a
+                Retry-After header.
+            circuit_breaker_threshold: Consecutive connection errors,
+                timeouts or 5xx replies from a host after which its remaining
+                requests fail immediately. 0 disables the circuit breaker.
+            circuit_breaker_reset_seconds: Seconds an open circuit waits
+                before letting a single probe request through.
+            conditional_requests: Revalidate pages and the changelog with
+                If-None-Match / If-Modified-Since instead of re-downloading them.
+            cache_dir: Directory for data reused between runs, such as the
+                HTTP response cache. Defaults to .<docs_dir name>-cache beside
+                docs_dir, outside the published tree, or generations_dir/.cache
+                when generations are enabled.
+            generations_dir: Write each run into a new generation directory
+                here and publish it by atomically repointing docs_dir, which
+                becomes a symlink. Disabled (files updated in place) when None.
+            keep_generations: Published generations kept by garbage collection.
+            incremental: Only fetch pages whose sitemap lastmod changed since
+                the last successful fetch.
+            full_sweep_interval_hours: In incremental mode, fetch every page
+                anyway once this many hours have passed since the last full sweep.
+            use_response_cache: Route sitemap, page and changelog requests
+                through the on-disk response cache in cache_dir/responses.
+            cache_ttl_seconds: Serve cached responses younger than this without
+                contacting the server. 0 always revalidates.
+            cache_max_bytes: Size of the response cache before least recently
+                used entries are evicted.
+            resume: Carry over the pages completed by an interrupted run, as
+                recorded in its journal in cache_dir, instead of fetching them
+                again.
+            stream_downloads: Stream page and changelog bodies to a temporary
+                file beside their destination, hashing them on the way,
+                instead of buffering them in memory.
+            max_body_bytes: Largest page or changelog body accepted. Larger
+                downloads are aborted as soon as the limit is crossed.
+            hash_algorithm: Digest of new manifest entries, one of
+                SUPPORTED_HASH_ALGORITHMS (e.g. "blake2b"). Entries keep
+                working when it changes: each records its own algorithm.
+            metrics_file: Also write the run's metrics here after each run: a
+                Prometheus textfile for a ``.prom`` path, JSON lines (one per
+                request, then the run summary) otherwise.
+            deadline_seconds: Time budget of a run. Once the time left cannot
+                cover a page fetch (the p95 of the run's request times so
+                far), the remaining pages and retries are skipped, keeping
+                their previous manifest entries. None runs to completion.
+
+        Raises:
+            ValueError: If max_workers, a request rate or deadline_seconds is
+                out of range, or hash_algorithm is not supported.
         """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if pool_maxsize is not None and pool_maxsize < 1:
+            raise ValueError("pool_maxsize must be at least 1")
+        if requests_per_second is not None and requests_per_second < 0:
+            raise ValueError("requests_per_second must be non-negative")
+        if min_requests_per_second <= 0:
+            raise ValueError("min_requests_per_second must be positive")
+        if (
+            max_requests_per_second is not None
+            and max_requests_per_second < min_requests_per_second
+        ):
+            raise ValueError(
+                "max_requests_per_second must be at least min_requests_per_second"
+            )
+        if full_sweep_interval_hours < 0:
+            raise ValueError("full_sweep_interval_hours must be non-negative")
+        if keep_generations < 1:
+            raise ValueError("keep_generations must be at least 1")
+        if max_body_bytes < 1:
+            raise ValueError("max_body_bytes must be positive")
+        if cache_ttl_seconds < 0:
+            raise ValueError("cache_ttl_seconds must be non-negative")
+        if circuit_breaker_threshold < 0:
+            raise ValueError("circuit_breaker_threshold must be non-negative")
+        if hash_algorithm not in SUPPORTED_HASH_ALGORITHMS:
+            raise ValueError(
+                f"hash_algorithm must be one of {', '.join(SUPPORTED_HASH_ALGORITHMS)}"
+            )
+        if deadline_seconds is not None and deadline_seconds <= 0:
+            raise ValueError("deadline_seconds must be positive")
+
         self.docs_dir = (
             Path(docs_dir)
             if docs_dir
             else Path(__file__).parent.parent.parent.parent / "docs"
         )
+        self.generations_dir = Path(generations_dir) if generations_dir else None
+        self.keep_generations = keep_generations
+        if cache_dir:
+            self.cache_dir = Path(cache_dir)
+        elif self.generations_dir is not None:
+            self.cache_dir = self.generations_dir / ".cache"
+        else:
+            self.cache_dir = self.docs_dir.parent / f".{self.docs_dir.name}-cache"
         self.sitemap_urls = sitemap_urls or [
             "https://docs.anthropic.com/sitemap.xml",
             "https://docs.anthropic.com/sitemap_index.xml",
             "https://anthropic.com/sitemap.xml",
         ]
+        self.changelog_url = changelog_url
         self.manifest_file = manifest_file
+        self.search_index_file = search_index_file
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         self.max_retry_delay = max_retry_delay
         self.rate_limit_delay = rate_limit_delay
         self.timeout = timeout
         self.user_agent = user_agent
+        self.max_workers = max_workers
+        self.pool_maxsize = pool_maxsize or max_workers
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2
+        self.accept_encoding = accept_encoding or ", ".join(
+            supported_encodings(http2=http2)
+        )
+        if requests_per_second is None:
+            requests_per_second = 1 / rate_limit_delay if rate_limit_delay > 0 else 0
+        self.requests_per_second = requests_per_second
+        self.adaptive_rate_limit = adaptive_rate_limit
+        self.min_requests_per_second = min_requests_per_second
+        self.max_requests_per_second = max_requests_per_second
+        self.max_retry_after = max_retry_after
+        self.circuit_breaker_threshold = circuit_breaker_threshold
+        self.circuit_breaker_reset_seconds = circuit_breaker_reset_seconds
+        self.conditional_requests = conditional_requests
+        self.incremental = incremental
+        self.full_sweep_interval_hours = full_sweep_interval_hours
+        self.use_response_cache = use_response_cache
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.cache_max_bytes = cache_max_bytes
+        self.resume = resume
+        self.stream_downloads = stream_downloads
+        self.max_body_bytes = max_body_bytes
+        self.hash_algorithm = hash_algorithm
+        self.metrics_file = Path(metrics_file) if metrics_file else None
+        self.deadline_seconds = deadline_seconds
 
         # Headers for HTTP requests
         self.headers = {
             "User-Agent": self.user_agent,
+            "Accept-Encoding": self.accept_encoding,
             "Cache-Control": "no-cache, no-store, must-revalidate",
             "Pragma": "no-cache",
             "Expires": "0",
         }
 
+        # Headers for revalidated requests: no-cache directives would defeat
+        # the If-None-Match / If-Modified-Since validators sent with them
+        self.conditional_headers = {
+            "User-Agent": self.user_agent,
+            "Accept-Encoding": self.accept_encoding,
+        }
+
         # Spanish documentation patterns
         self.spanish_patterns = ["/es/docs/claude-code/"]
 
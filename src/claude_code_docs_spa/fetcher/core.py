@@ -2,33 +2,187 @@
 
 from __future__ import annotations
 
-import hashlib
+import asyncio
+import contextlib
 import json
 import os
 import random
 import re
 import time
 import xml.etree.ElementTree as ET
+from collections.abc import Callable, Generator, Iterable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from pathlib import Path
+from typing import Any
 from urllib.parse import urlparse
 
 import requests
 import structlog
 
+from .cache import DiskResponseCache, ResponseCache
+from .circuit import HostCircuitBreaker
 from .config import FetcherConfig
+from .deadline import DeadlineExceededError, RunDeadline
+from .digest import digest_bytes, digest_file, entry_algorithm
+from .download import StagedBody, stage_body
+from .generations import GenerationStore
+from .journal import JOURNAL_FILENAME, RunJournal
+from .metrics import RunMetrics
+from .ratelimit import HostRateLimiter, parse_retry_after
+from .search import build_search_index, encode_search_index
+from .sitemap import SITEMAP_CHUNK_SIZE, iter_sitemap_entries
+from .transport import TransferLog, create_session
+
+# Sitemap indexes are followed at most this many levels deep
+MAX_SITEMAP_INDEX_DEPTH = 2
+
+# 429 replies tolerated per request; they don't count as failed attempts
+MAX_THROTTLED_RETRIES = 5
+
+# Prepended to the changelog to tell it apart from the documentation pages
+CHANGELOG_HEADER = """# Changelog de Claude Code
+
+> **Fuente**: https://github.com/anthropics/claude-code/blob/main/CHANGELOG.md
+>
+> Este es el changelog oficial de lanzamientos de Claude Code, obtenido automáticamente del repositorio de Claude Code. Para documentación, ver otros temas vía `/docs`.
+
+---
+
+""".encode()
+
+# Pages fetched when the sitemap cannot be used
+FALLBACK_PAGES = [
+    "/es/docs/claude-code/overview",
+    "/es/docs/claude-code/setup",
+    "/es/docs/claude-code/quickstart",
+    "/es/docs/claude-code/memory",
+    "/es/docs/claude-code/common-workflows",
+    "/es/docs/claude-code/ide-integrations",
+    "/es/docs/claude-code/mcp",
+    "/es/docs/claude-code/github-actions",
+    "/es/docs/claude-code/sdk",
+    "/es/docs/claude-code/troubleshooting",
+    "/es/docs/claude-code/security",
+    "/es/docs/claude-code/settings",
+    "/es/docs/claude-code/hooks",
+    "/es/docs/claude-code/costs",
+    "/es/docs/claude-code/monitoring-usage",
+]
+
+
+def _latest_lastmod(current: str | None, candidate: str | None) -> str | None:
+    """Pick the most recent of two W3C datetime lastmod values."""
+    if current is None or (candidate is not None and candidate > current):
+        return candidate
+    return current
+
+
+class FetchRun:
+    """Mutable state and statistics of a single documentation fetch run."""
+
+    def __init__(self) -> None:
+        """Initialize an empty run."""
+        self.start_time = datetime.now()
+        self.sitemap_url: str | None = None
+        self.base_url = "https://docs.anthropic.com"
+        self.pages: list[str] = []
+        self.lastmods: dict[str, str | None] = {}
+        self.pages_to_fetch: list[str] = []
+        self.full_sweep = True
+        self.fetch_changelog = True
+        self.journal: RunJournal | None = None
+        self.skipped = 0
+        self.resumed = 0
+        self.successful = 0
+        self.failed = 0
+        self.failed_pages: list[str] = []
+        self.deferred = 0
+        self.deferred_pages: list[str] = []
+        self.fetched_files: set[str] = set()
+        self.new_manifest: dict[str, Any] = {"files": {}}
+
+    def record_success(self, filename: str, entry: dict[str, Any]) -> None:
+        """Record a fetched file and its manifest entry."""
+        self.new_manifest["files"][filename] = entry
+        self.fetched_files.add(filename)
+        self.successful += 1
+
+    def record_skip(self, filename: str, entry: dict[str, Any]) -> None:
+        """Record a page carried over from the previous manifest unfetched."""
+        self.new_manifest["files"][filename] = entry
+        self.fetched_files.add(filename)
+        self.skipped += 1
+
+    def record_resume(self, filename: str, entry: dict[str, Any]) -> None:
+        """Record a page completed by the interrupted run being resumed."""
+        self.new_manifest["files"][filename] = entry
+        self.fetched_files.add(filename)
+        self.resumed += 1
+
+    def record_failure(
+        self,
+        page_path: str,
+        filename: str | None = None,
+        previous_entry: dict[str, Any] | None = None,
+    ) -> None:
+        """Record a page that could not be fetched.
+
+        Its previous manifest entry, if given, is kept so the file it
+        describes survives the run.
+        """
+        self.failed += 1
+        self.failed_pages.append(page_path)
+        self._keep_previous(filename, previous_entry)
+
+    def record_deferral(
+        self,
+        page_path: str,
+        filename: str | None = None,
+        previous_entry: dict[str, Any] | None = None,
+    ) -> None:
+        """Record a page left for a later run by the run deadline.
+
+        Like a failed page, it keeps its previous manifest entry, if given.
+        """
+        self.deferred += 1
+        self.deferred_pages.append(page_path)
+        self._keep_previous(filename, previous_entry)
+
+    def _keep_previous(
+        self, filename: str | None, previous_entry: dict[str, Any] | None
+    ) -> None:
+        """Carry a page's previous manifest entry over to the new manifest."""
+        if filename is not None and previous_entry is not None:
+            self.new_manifest["files"][filename] = previous_entry
+            self.fetched_files.add(filename)
 
 
 class ClaudeCodeFetcher:
     """Fetches Claude Code documentation from official sources."""
 
-    def __init__(self, config: FetcherConfig | None = None) -> None:
+    def __init__(
+        self,
+        config: FetcherConfig | None = None,
+        response_cache: ResponseCache | None = None,
+    ) -> None:
         """Initialize the fetcher with configuration.
 
         Args:
             config: Fetcher configuration. If None, uses default configuration.
+            response_cache: Cache consulted before every sitemap, page and
+                changelog request. Defaults to a DiskResponseCache under
+                config.cache_dir when config.use_response_cache is set.
         """
         self.config = config or FetcherConfig()
 
+        if response_cache is None and self.config.use_response_cache:
+            response_cache = DiskResponseCache(
+                self.config.cache_dir / "responses",
+                max_bytes=self.config.cache_max_bytes,
+            )
+        self.response_cache = response_cache
+
         # Configure structlog
         structlog.configure(
             processors=[
@@ -46,6 +200,182 @@ class ClaudeCodeFetcher:
 
         self.logger = structlog.get_logger("claude_code_fetcher")
 
+        # Bytes moved by each request of the current run, and its timings
+        self.transfer_log = TransferLog()
+        self.metrics = RunMetrics()
+
+        # Where the current run writes files: docs_dir itself, or a fresh
+        # generation published over docs_dir once the run completes
+        self.output_dir = self.config.docs_dir
+        self.generations = (
+            GenerationStore(
+                self.config.generations_dir,
+                self.config.docs_dir,
+                keep=self.config.keep_generations,
+            )
+            if self.config.generations_dir is not None
+            else None
+        )
+
+        # Shared by every worker and fetch path so concurrent fetches respect
+        # the host rate, which adapts to the server's responses
+        self.rate_limiter = HostRateLimiter(
+            self.config.requests_per_second,
+            capacity=self.config.max_workers,
+            adaptive=self.config.adaptive_rate_limit,
+            min_rate=self.config.min_requests_per_second,
+            max_rate=self.config.max_requests_per_second,
+        )
+
+        # Shared by every fetch path so a host that stopped answering fails
+        # the remaining requests at once instead of through retries
+        self.circuit_breakers = HostCircuitBreaker(
+            self.config.circuit_breaker_threshold,
+            self.config.circuit_breaker_reset_seconds,
+        )
+
+        # Time budget of the current run (restarted by every run)
+        self.deadline = RunDeadline()
+
+    def _get(
+        self,
+        session: requests.Session,
+        url: str,
+        *,
+        use_cache: bool = False,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """Issue a GET request once the per-host rate limiter allows it.
+
+        With use_cache, a cached response younger than cache_ttl_seconds is
+        served without a request. An older one is revalidated and served from
+        the cache on 304, unless the caller sent validators of its own copy
+        on disk: that 304 is returned as is, since the caller already has the
+        body. Cache-served responses carry an X-Cache header.
+
+        Raises:
+            CircuitOpenError: If the host's circuit breaker is open.
+            DeadlineExceededError: If the run deadline passed, or the rate
+                limiter (e.g. a Retry-After pause) would hold the request
+                past it. The limiter is then not waited for at all.
+            requests.exceptions.RequestException: If the request fails.
+        """
+        cache = self.response_cache if use_cache else None
+        entry = cache.lookup(url) if cache is not None else None
+
+        if cache is not None and entry is not None:
+            if entry.is_fresh(self.config.cache_ttl_seconds):
+                self.logger.debug("response_cache_hit", url=url)
+                cached = cache.as_response(entry, "HIT")
+                self._record_transfer(url, cached, entry.size)
+                return cached
+            headers = kwargs.get("headers") or {}
+            if "If-None-Match" in headers or "If-Modified-Since" in headers:
+                # The caller revalidates its own copy and handles the 304
+                entry = None
+            elif self.config.conditional_requests:
+                kwargs["headers"] = self._request_headers(entry.validators)
+
+        # Fail fast on an open circuit, but only claim its half-open probe
+        # once nothing else can stop the request from being sent
+        self.circuit_breakers.check(url, probe=False)
+        self.deadline.check(0.0, f"a request to {url}")
+        remaining = self.deadline.remaining()
+        waited = self.rate_limiter.acquire(url, max_wait=remaining)
+        if waited is None:
+            # A Retry-After pause or the pacing would outlast the budget
+            raise DeadlineExceededError(
+                f"a request to {url} (rate limited)", max(remaining, 0.0)
+            )
+        self.deadline.check(0.0, f"a request to {url}")
+        self.circuit_breakers.check(url)
+        if "timeout" in kwargs:
+            kwargs["timeout"] = self.deadline.cap(kwargs["timeout"])
+        started = time.monotonic()
+        try:
+            response = session.get(url, **kwargs)
+        except requests.exceptions.RequestException:
+            self.circuit_breakers.record(url, failed=True)
+            raise
+        self.circuit_breakers.record(url, failed=response.status_code >= 500)
+        timing = self.metrics.start_request(waited, started)
+        self._observe_response(url, response, timing["ttfb"])
+
+        if cache is not None and entry is not None and response.status_code == 304:
+            self.logger.debug("response_cache_revalidated", url=url)
+            response.close()
+            cache.refresh(url, self._response_validators(response))
+            cached = cache.as_response(entry, "REVALIDATED")
+            self._record_transfer(url, cached, entry.size, timing)
+            return cached
+
+        if not kwargs.get("stream"):
+            self._record_transfer(url, response, len(response.content), timing)
+        elif response.status_code != 200:
+            # Error, throttled and 304 replies are never read by the caller;
+            # release their connection to the pool now
+            response.close()
+            self._record_transfer(url, response, 0, timing)
+        else:
+            # Streamed bodies are accounted for by the caller once consumed
+            self.metrics.hold(response, timing)
+        return response
+
+    def _record_transfer(
+        self,
+        url: str,
+        response: requests.Response,
+        decoded_bytes: int,
+        timing: dict[str, float] | None = None,
+    ) -> None:
+        """Record a completed request in the transfer log and run metrics.
+
+        Without a timing, the one held for a streamed response is used.
+        """
+        transfer = self.transfer_log.record(url, response, decoded_bytes)
+        if timing is None:
+            timing = self.metrics.release(response)
+        self.metrics.record_request(transfer, timing)
+
+    def _expected_request_seconds(self) -> float:
+        """Estimate how long a page request takes: the run's p95 so far."""
+        return self.metrics.latency_percentile(95) or 0.0
+
+    def _observe_response(
+        self, url: str, response: requests.Response, latency: float
+    ) -> None:
+        """Feed a response to the rate limiter and honour its Retry-After.
+
+        A 429 or 503 pauses every request to the host, not just the retry of
+        this one, for as long as the server asked (delta-seconds or
+        HTTP-date). A 429 without Retry-After pauses for retry_delay.
+        """
+        status_code = response.status_code
+        self.rate_limiter.record(url, status_code, latency)
+        if status_code not in (429, 503):
+            return
+
+        wait = parse_retry_after(response.headers.get("Retry-After"))
+        if wait is None and status_code == 429:
+            wait = self.config.retry_delay
+        if wait:
+            wait = min(wait, self.config.max_retry_after)
+            self.logger.warning(
+                "rate_limited", url=url, status=status_code, wait_seconds=wait
+            )
+            self.rate_limiter.pause(url, wait)
+
+    def _cache_response(self, url: str, response: requests.Response) -> None:
+        """Store a validated response body in the response cache."""
+        if self.response_cache is None or response.headers.get("X-Cache"):
+            return
+        try:
+            self.response_cache.store(
+                url, response.content, self._response_validators(response)
+            )
+        except OSError as e:
+            self.logger.warning("response_cache_write_failed", url=url, error=str(e))
+
     def load_manifest(self) -> dict:
         """Load the manifest of previously fetched files."""
         manifest_path = self.config.docs_dir / self.config.manifest_file
@@ -61,7 +391,7 @@ class ClaudeCodeFetcher:
 
     def save_manifest(self, manifest: dict) -> None:
         """Save the manifest of fetched files."""
-        manifest_path = self.config.docs_dir / self.config.manifest_file
+        manifest_path = self.output_dir / self.config.manifest_file
         manifest["last_updated"] = datetime.now().isoformat()
 
         # Get GitHub repository from environment or use default
@@ -114,60 +444,317 @@ class ClaudeCodeFetcher:
             safe_name += ".md"
         return safe_name
 
+    def _sitemap_chunks(
+        self, session: requests.Session, sitemap_url: str
+    ) -> Generator[bytes, None, None]:
+        """Stream a sitemap body through the response cache.
+
+        A downloaded body is written to the cache while it is yielded and only
+        indexed once it has been read completely.
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails.
+        """
+        response = self._get(
+            session,
+            sitemap_url,
+            use_cache=True,
+            headers=self._request_headers(None),
+            timeout=self.config.timeout,
+            stream=True,
+        )
+
+        response.raise_for_status()
+        yield from self._iter_body(sitemap_url, response)
+
+    def _iter_body(
+        self, url: str, response: requests.Response
+    ) -> Generator[bytes, None, None]:
+        """Iterate over the body of a streamed response.
+
+        A downloaded body is written to the response cache while it is
+        yielded, and only indexed once it has been read completely. The
+        transfer is logged and the connection released when iteration ends,
+        even if the caller stops early.
+        """
+        if response.headers.get("X-Cache"):
+            # Served from the cache; already in memory and logged
+            yield response.content
+            return
+
+        decoded_bytes = 0
+        try:
+            with contextlib.closing(response):
+                chunks = response.iter_content(chunk_size=SITEMAP_CHUNK_SIZE)
+                if self.response_cache is not None:
+                    chunks = self.response_cache.store_stream(
+                        url, chunks, self._response_validators(response)
+                    )
+                for chunk in chunks:
+                    decoded_bytes += len(chunk)
+                    yield chunk
+        finally:
+            self._record_transfer(url, response, decoded_bytes)
+
+    def _read_body(
+        self,
+        url: str,
+        response: requests.Response,
+        filename: str,
+        prefix: bytes = b"",
+    ) -> tuple[bytes | StagedBody, bytes]:
+        """Read a page body, streaming it to disk when stream_downloads is set.
+
+        Args:
+            url: Requested URL.
+            response: Successful response whose body is still unread.
+            filename: Destination file name in the output directory.
+            prefix: Bytes prepended to the body.
+
+        Returns:
+            Tuple of (content, head) where content is the body in memory or
+            staged in a temporary file, and head is its start for validation.
+
+        Raises:
+            ValueError: If the body is HTML or larger than max_body_bytes.
+        """
+        if not self.config.stream_downloads:
+            content = prefix + response.content
+            if len(response.content) > self.config.max_body_bytes:
+                raise ValueError(
+                    f"Response body exceeds {self.config.max_body_bytes} bytes"
+                )
+            return content, content
+
+        chunks = self._iter_body(url, response)
+        try:
+            staged = stage_body(
+                chunks,
+                self.output_dir,
+                filename,
+                max_bytes=self.config.max_body_bytes,
+                prefix=prefix,
+                algorithm=self.config.hash_algorithm,
+            )
+        finally:
+            # Aborted downloads must not be indexed by the response cache
+            chunks.close()
+        return staged, staged.head
+
+    def _reject_body(self, url: str, content: bytes | StagedBody | None) -> None:
+        """Forget a body that failed validation."""
+        if isinstance(content, StagedBody):
+            content.discard()
+            if self.response_cache is not None:
+                self.response_cache.evict(url)
+
+    def fetch_sitemap(self, session: requests.Session, sitemap_url: str) -> bytes:
+        """Download a sitemap, revalidating the copy cached by the last run.
+
+        Args:
+            session: HTTP session to use.
+            sitemap_url: URL of the sitemap.
+
+        Returns:
+            Raw sitemap XML.
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails.
+        """
+        return b"".join(self._sitemap_chunks(session, sitemap_url))
+
+    def _page_path(self, url: str) -> str | None:
+        """Map a sitemap URL to a documentation page path, or None to skip it."""
+        # Check if URL matches Spanish pattern
+        if not any(pattern in url for pattern in self.config.spanish_patterns):
+            return None
+
+        path = urlparse(url).path
+
+        # Remove any file extensions
+        if path.endswith(".html"):
+            path = path[:-5]
+        elif path.endswith("/"):
+            path = path[:-1]
+
+        # Skip certain page types
+        if any(skip in path for skip in self.config.skip_patterns):
+            return None
+        return path
+
+    def filter_documentation_urls(self, urls: list[str]) -> list[str]:
+        """Keep the Spanish Claude Code documentation pages from sitemap URLs.
+
+        Args:
+            urls: Absolute URLs listed in the sitemap.
+
+        Returns:
+            Sorted, de-duplicated page paths without extension.
+        """
+        return sorted({path for url in urls if (path := self._page_path(url))})
+
+    def _scan_sitemap(
+        self,
+        session: requests.Session,
+        sitemap_url: str,
+        *,
+        stop_at_first_url: bool = False,
+        depth: int = 0,
+    ) -> tuple[str | None, dict[str, str | None], int]:
+        """Stream a sitemap (or sitemap index) and filter pages as they arrive.
+
+        Args:
+            session: HTTP session to use.
+            sitemap_url: URL of the sitemap or sitemap index.
+            stop_at_first_url: Stop reading as soon as one page URL is known.
+            depth: Current sitemap-index nesting level.
+
+        Returns:
+            Tuple of (first_url, {page_path: lastmod}, total_urls)
+        """
+        first_url = None
+        pages: dict[str, str | None] = {}
+        total_urls = 0
+        child_sitemaps = []
+
+        chunks = self._sitemap_chunks(session, sitemap_url)
+        entries = iter_sitemap_entries(chunks)
+        with contextlib.closing(chunks), contextlib.closing(entries):
+            for kind, loc, lastmod in entries:
+                if kind == "sitemap":
+                    child_sitemaps.append(loc)
+                    continue
+
+                total_urls += 1
+                if first_url is None:
+                    first_url = loc
+                    if stop_at_first_url:
+                        return first_url, pages, total_urls
+                if path := self._page_path(loc):
+                    pages[path] = _latest_lastmod(pages.get(path), lastmod)
+
+        if not child_sitemaps:
+            return first_url, pages, total_urls
+        if depth >= MAX_SITEMAP_INDEX_DEPTH:
+            self.logger.warning("sitemap_index_too_deep", url=sitemap_url)
+            return first_url, pages, total_urls
+
+        self.logger.info(
+            "following_sitemap_index", url=sitemap_url, children=len(child_sitemaps)
+        )
+
+        def scan_child(child_url: str) -> tuple[str | None, dict[str, str | None], int]:
+            try:
+                return self._scan_sitemap(
+                    session,
+                    child_url,
+                    stop_at_first_url=stop_at_first_url,
+                    depth=depth + 1,
+                )
+            except Exception as e:
+                self.logger.warning("child_sitemap_failed", url=child_url, error=str(e))
+                return None, {}, 0
+
+        if stop_at_first_url or self.config.max_workers == 1:
+            results: Iterable[tuple[str | None, dict[str, str | None], int]] = (
+                scan_child(child_url) for child_url in child_sitemaps
+            )
+        else:
+            executor = ThreadPoolExecutor(
+                max_workers=min(self.config.max_workers, len(child_sitemaps)),
+                thread_name_prefix="sitemap-fetch",
+            )
+            with executor:
+                results = list(executor.map(scan_child, child_sitemaps))
+
+        # Merge in index order so the base URL does not depend on timing
+        for child_first, child_pages, child_total in results:
+            if first_url is None:
+                first_url = child_first
+                if stop_at_first_url and first_url:
+                    break
+            for path, lastmod in child_pages.items():
+                pages[path] = _latest_lastmod(pages.get(path), lastmod)
+            total_urls += child_total
+
+        return first_url, pages, total_urls
+
+    def discover_documentation_pages(
+        self, session: requests.Session
+    ) -> tuple[str, str, list[tuple[str, str | None]]]:
+        """Find a usable sitemap and extract the documentation pages from it.
+
+        Each sitemap is downloaded and parsed once, streaming; the same pass
+        yields both the base URL and the filtered page paths. Sitemap indexes
+        are followed, in parallel when several workers are configured.
+
+        Returns:
+            Tuple of (sitemap_url, base_url, pages) where pages is a sorted list
+            of (page_path, lastmod) pairs; lastmod is None when not published.
+
+        Raises:
+            Exception: If none of the configured sitemaps is usable.
+        """
+        for sitemap_url in self.config.sitemap_urls:
+            try:
+                self.logger.info("trying_sitemap", url=sitemap_url)
+                first_url, pages, total_urls = self._scan_sitemap(session, sitemap_url)
+            except ET.ParseError as parse_error:
+                self.logger.warning("sitemap_xml_parse_error", error=str(parse_error))
+                continue
+            except Exception as e:
+                self.logger.warning(
+                    "sitemap_fetch_failed", url=sitemap_url, error=str(e)
+                )
+                continue
+
+            if not first_url:
+                continue
+
+            parsed = urlparse(first_url)
+            base_url = f"{parsed.scheme}://{parsed.netloc}"
+            self.logger.info("sitemap_found", sitemap=sitemap_url, base_url=base_url)
+            self.logger.info("total_urls_found", count=total_urls)
+            self.logger.info("claude_code_pages_found", count=len(pages))
+
+            return sitemap_url, base_url, sorted(pages.items())
+
+        raise Exception("No valid sitemap found")
+
     def discover_sitemap_and_base_url(
         self, session: requests.Session
     ) -> tuple[str, str]:
         """Discover sitemap URL and extract base URL from it.
 
+        Parsing stops at the first page URL, so only the head of the sitemap
+        is read.
+
         Returns:
             Tuple of (sitemap_url, base_url)
         """
         for sitemap_url in self.config.sitemap_urls:
             try:
                 self.logger.info("trying_sitemap", url=sitemap_url)
-                response = session.get(
-                    sitemap_url,
-                    headers=self.config.headers,
-                    timeout=self.config.timeout,
+                first_url, _, _ = self._scan_sitemap(
+                    session, sitemap_url, stop_at_first_url=True
                 )
-                if response.status_code == 200:
-                    try:
-                        root = ET.fromstring(response.content)
-                    except Exception as parse_error:
-                        self.logger.warning(
-                            "sitemap_xml_parse_error", error=str(parse_error)
-                        )
-                        continue
-
-                    # Try with namespace first
-                    namespace = {"ns": "http://www.sitemaps.org/schemas/sitemap/0.9"}
-                    first_url = None
-                    for url_elem in root.findall(".//ns:url", namespace):
-                        loc_elem = url_elem.find("ns:loc", namespace)
-                        if loc_elem is not None and loc_elem.text:
-                            first_url = loc_elem.text
-                            break
-
-                    # If no URLs found, try without namespace
-                    if not first_url:
-                        for loc_elem in root.findall(".//loc"):
-                            if loc_elem.text:
-                                first_url = loc_elem.text
-                                break
-
-                    if first_url:
-                        parsed = urlparse(first_url)
-                        base_url = f"{parsed.scheme}://{parsed.netloc}"
-                        self.logger.info(
-                            "sitemap_found", sitemap=sitemap_url, base_url=base_url
-                        )
-                        return sitemap_url, base_url
+            except ET.ParseError as parse_error:
+                self.logger.warning("sitemap_xml_parse_error", error=str(parse_error))
+                continue
             except Exception as e:
                 self.logger.warning(
                     "sitemap_fetch_failed", url=sitemap_url, error=str(e)
                 )
                 continue
 
+            if first_url:
+                parsed = urlparse(first_url)
+                base_url = f"{parsed.scheme}://{parsed.netloc}"
+                self.logger.info(
+                    "sitemap_found", sitemap=sitemap_url, base_url=base_url
+                )
+                return sitemap_url, base_url
+
         raise Exception("No valid sitemap found")
 
     def discover_claude_code_pages(
@@ -177,83 +764,18 @@ class ClaudeCodeFetcher:
         self.logger.info("discovering_pages_from_sitemap")
 
         try:
-            response = session.get(
-                sitemap_url, headers=self.config.headers, timeout=self.config.timeout
-            )
-            response.raise_for_status()
-
-            try:
-                root = ET.fromstring(response.content)
-            except Exception as parse_error:
-                self.logger.error("sitemap_xml_parse_error", error=str(parse_error))
-                raise
-
-            # Extract all URLs from sitemap
-            urls = []
+            _, pages, total_urls = self._scan_sitemap(session, sitemap_url)
+            self.logger.info("total_urls_found", count=total_urls)
+            self.logger.info("claude_code_pages_found", count=len(pages))
 
-            # Try with namespace first
-            namespace = {"ns": "http://www.sitemaps.org/schemas/sitemap/0.9"}
-            for url_elem in root.findall(".//ns:url", namespace):
-                loc_elem = url_elem.find("ns:loc", namespace)
-                if loc_elem is not None and loc_elem.text:
-                    urls.append(loc_elem.text)
-
-            # If no URLs found, try without namespace
-            if not urls:
-                for loc_elem in root.findall(".//loc"):
-                    if loc_elem.text:
-                        urls.append(loc_elem.text)
-
-            self.logger.info("total_urls_found", count=len(urls))
-
-            # Filter only Spanish Claude Code documentation pages
-            claude_code_pages = []
-
-            for url in urls:
-                # Check if URL matches Spanish pattern
-                if any(pattern in url for pattern in self.config.spanish_patterns):
-                    parsed = urlparse(url)
-                    path = parsed.path
-
-                    # Remove any file extensions
-                    if path.endswith(".html"):
-                        path = path[:-5]
-                    elif path.endswith("/"):
-                        path = path[:-1]
-
-                    # Skip certain page types
-                    if not any(skip in path for skip in self.config.skip_patterns):
-                        claude_code_pages.append(path)
-
-            # Remove duplicates and sort
-            claude_code_pages = sorted(list(set(claude_code_pages)))
-
-            self.logger.info("claude_code_pages_found", count=len(claude_code_pages))
-
-            return claude_code_pages
+            return sorted(pages)
 
         except Exception as e:
             self.logger.error("page_discovery_failed", error=str(e))
             self.logger.warning("using_fallback_pages")
 
             # Fallback list
-            return [
-                "/es/docs/claude-code/overview",
-                "/es/docs/claude-code/setup",
-                "/es/docs/claude-code/quickstart",
-                "/es/docs/claude-code/memory",
-                "/es/docs/claude-code/common-workflows",
-                "/es/docs/claude-code/ide-integrations",
-                "/es/docs/claude-code/mcp",
-                "/es/docs/claude-code/github-actions",
-                "/es/docs/claude-code/sdk",
-                "/es/docs/claude-code/troubleshooting",
-                "/es/docs/claude-code/security",
-                "/es/docs/claude-code/settings",
-                "/es/docs/claude-code/hooks",
-                "/es/docs/claude-code/costs",
-                "/es/docs/claude-code/monitoring-usage",
-            ]
+            return list(FALLBACK_PAGES)
 
     def validate_markdown_content(self, content: str, filename: str) -> None:
         """Validate that content is appropriate markdown."""
@@ -311,41 +833,123 @@ class ClaudeCodeFetcher:
         if not pattern_found:
             self.logger.warning("no_doc_patterns_found", filename=filename)
 
+    def _request_headers(self, validators: dict[str, str] | None) -> dict[str, str]:
+        """Build headers for a page request, adding conditional validators."""
+        if not self.config.conditional_requests:
+            return self.config.headers
+
+        headers = dict(self.config.conditional_headers)
+        if validators:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("http_last_modified"):
+                headers["If-Modified-Since"] = validators["http_last_modified"]
+        return headers
+
+    @staticmethod
+    def _response_validators(response: requests.Response) -> dict[str, str]:
+        """Extract the ETag / Last-Modified validators from a response."""
+        validators = {}
+        if response.headers.get("ETag"):
+            validators["etag"] = response.headers["ETag"]
+        if response.headers.get("Last-Modified"):
+            validators["http_last_modified"] = response.headers["Last-Modified"]
+        return validators
+
+    def _entry_validators(self, filename: str, entry: dict) -> dict[str, str] | None:
+        """Get validators from a manifest entry if the file can be revalidated.
+
+        Conditional headers are only sent when the previous copy is still on
+        disk, because a 304 reply carries no body to restore it from.
+        """
+        if not self.config.conditional_requests or not entry.get("hash"):
+            return None
+        if not (self.config.docs_dir / filename).exists():
+            return None
+        validators = {
+            key: entry[key] for key in ("etag", "http_last_modified") if entry.get(key)
+        }
+        return validators or None
+
     def fetch_markdown_content(
-        self, path: str, session: requests.Session, base_url: str
-    ) -> tuple[str, str]:
-        """Fetch markdown content with better error handling and validation."""
+        self,
+        path: str,
+        session: requests.Session,
+        base_url: str,
+        validators: dict[str, str] | None = None,
+    ) -> tuple[str, bytes | StagedBody | None, dict[str, str]]:
+        """Fetch markdown content with better error handling and validation.
+
+        Args:
+            path: Documentation page path.
+            session: HTTP session to use.
+            base_url: Base URL of the documentation site.
+            validators: ETag / Last-Modified of the copy already on disk.
+
+        Returns:
+            Tuple of (filename, content, validators). Content is the raw UTF-8
+            body (staged in a temporary file with stream_downloads), or None
+            when the server answered 304 Not Modified.
+        """
         markdown_url = f"{base_url}{path}.md"
         filename = self.url_to_safe_filename(path)
 
         self.logger.info("fetching_page", url=markdown_url, filename=filename)
 
-        for attempt in range(self.config.max_retries):
+        attempt = 0
+        throttled = 0
+        while attempt < self.config.max_retries:
             try:
-                response = session.get(
+                response = self._get(
+                    session,
                     markdown_url,
-                    headers=self.config.headers,
+                    use_cache=True,
+                    headers=self._request_headers(validators),
                     timeout=self.config.timeout,
                     allow_redirects=True,
+                    stream=self.config.stream_downloads,
                 )
 
-                # Handle specific HTTP errors
+                # Handle specific HTTP errors. The limiter already paused the
+                # host for Retry-After, so a 429 retry doesn't use an attempt
                 if response.status_code == 429:  # Rate limit
-                    wait_time = int(response.headers.get("Retry-After", 60))
-                    self.logger.warning("rate_limited", wait_seconds=wait_time)
-                    time.sleep(wait_time)
+                    throttled += 1
+                    self.metrics.record_retry("throttled")
+                    if throttled > MAX_THROTTLED_RETRIES:
+                        raise Exception(
+                            f"Failed to fetch {filename}: still rate limited "
+                            f"after {MAX_THROTTLED_RETRIES} retries"
+                        )
                     continue
 
+                if response.status_code == 304 and validators:
+                    self.logger.info("content_not_modified", filename=filename)
+                    return (
+                        filename,
+                        None,
+                        {**validators, **self._response_validators(response)},
+                    )
+
                 response.raise_for_status()
 
-                # Get and validate content
-                content = response.text
-                self.validate_markdown_content(content, filename)
+                # Keep the raw body; only its head is decoded (always as
+                # UTF-8, never sniffed) for validation
+                content, head = self._read_body(markdown_url, response, filename)
+                try:
+                    with self.metrics.phase("validation"):
+                        self.validate_markdown_content(
+                            head.decode("utf-8", errors="replace"), filename
+                        )
+                except ValueError:
+                    self._reject_body(markdown_url, content)
+                    raise
 
                 self.logger.info(
                     "content_fetched_validated", filename=filename, bytes=len(content)
                 )
-                return filename, content
+                if isinstance(content, bytes):
+                    self._cache_response(markdown_url, response)
+                return filename, content, self._response_validators(response)
 
             except requests.exceptions.RequestException as e:
                 self.logger.warning(
@@ -355,16 +959,25 @@ class ClaudeCodeFetcher:
                     filename=filename,
                     error=str(e),
                 )
-                if attempt < self.config.max_retries - 1:
+                attempt += 1
+                if attempt < self.config.max_retries:
+                    # Don't back off before a retry the open circuit would refuse
+                    self.circuit_breakers.check(markdown_url, probe=False)
                     # Exponential backoff with jitter
                     delay = min(
-                        self.config.retry_delay * (2**attempt),
+                        self.config.retry_delay * (2 ** (attempt - 1)),
                         self.config.max_retry_delay,
                     )
                     jittered_delay = delay * random.uniform(0.5, 1.0)
+                    # Don't sleep for a retry that could not finish in time
+                    self.deadline.check(
+                        jittered_delay + self._expected_request_seconds(),
+                        f"a retry of {filename}",
+                    )
                     self.logger.info(
                         "retrying_in_seconds", seconds=round(jittered_delay, 1)
                     )
+                    self.metrics.record_retry("failed", jittered_delay)
                     time.sleep(jittered_delay)
                 else:
                     raise Exception(
@@ -377,59 +990,167 @@ class ClaudeCodeFetcher:
                 )
                 raise
 
-    def content_has_changed(self, content: str, old_hash: str) -> bool:
+    def content_hash(self, content: bytes | str, algorithm: str | None = None) -> str:
+        """Hash content the way it is stored on disk (UTF-8).
+
+        Args:
+            content: Body to hash.
+            algorithm: Digest algorithm. Defaults to config.hash_algorithm.
+        """
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        return digest_bytes(content, algorithm or self.config.hash_algorithm)
+
+    def content_has_changed(
+        self, content: bytes | str, old_hash: str, algorithm: str | None = None
+    ) -> bool:
         """Check if content has changed based on hash."""
-        new_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
-        return new_hash != old_hash
+        return self.content_hash(content, algorithm) != old_hash
 
-    def fetch_changelog(self, session: requests.Session) -> tuple[str, str]:
-        """Fetch Claude Code changelog from GitHub repository."""
-        changelog_url = (
-            "https://raw.githubusercontent.com/anthropics/claude-code/main/CHANGELOG.md"
-        )
+    def _store_body(
+        self,
+        filename: str,
+        content: bytes | StagedBody | None,
+        old_entry: dict[str, Any],
+    ) -> tuple[str, str, bool]:
+        """Save a fetched body if it changed, hashing it at most once.
+
+        A body with the old hash is still written if its file has gone
+        missing. A 304 reply (content None) means it has not changed.
+
+        When the old entry was hashed with another algorithm (e.g. a SHA-256
+        manifest after switching to blake2b), the body is hashed once more
+        with the old algorithm to compare it, so switching algorithms does
+        not rewrite every file. The entry then moves to the new algorithm.
+
+        Returns:
+            Tuple of (content_hash, hash_algorithm, changed)
+        """
+        old_hash = old_entry.get("hash", "")
+        old_algorithm = entry_algorithm(old_entry)
+        if content is None:
+            return old_hash, old_algorithm, False
+
+        algorithm = self.config.hash_algorithm
+        if isinstance(content, StagedBody):
+            new_hash = content.digest
+        else:
+            new_hash = self.content_hash(content)
+
+        if old_algorithm == algorithm:
+            changed = new_hash != old_hash
+        elif not old_hash:
+            changed = True
+        elif isinstance(content, StagedBody):
+            changed = digest_file(content.path, old_algorithm) != old_hash
+        else:
+            changed = self.content_has_changed(content, old_hash, old_algorithm)
+
+        if changed or not (self.config.docs_dir / filename).exists():
+            self.save_markdown_file(filename, content, new_hash)
+        elif isinstance(content, StagedBody):
+            content.discard()
+        return new_hash, algorithm, changed
+
+    def verify_files(self, manifest: dict[str, Any] | None = None) -> list[str]:
+        """Check the files of the docs directory against their manifest hashes.
+
+        Each file is read in chunks and hashed with the algorithm recorded in
+        its entry, so manifests mixing algorithms verify correctly.
+
+        Args:
+            manifest: Manifest to check against. Defaults to the saved one.
+
+        Returns:
+            Names of the files that are missing or whose content does not
+            match their hash.
+        """
+        if manifest is None:
+            manifest = self.load_manifest()
+
+        mismatched = []
+        for filename, entry in sorted(manifest.get("files", {}).items()):
+            file_path = self.config.docs_dir / filename
+            if not file_path.is_file() or digest_file(
+                file_path, entry_algorithm(entry)
+            ) != entry.get("hash"):
+                mismatched.append(filename)
+        if mismatched:
+            self.logger.warning("files_failed_verification", files=mismatched)
+        return mismatched
+
+    def fetch_changelog(
+        self,
+        session: requests.Session,
+        validators: dict[str, str] | None = None,
+    ) -> tuple[str, bytes | StagedBody | None, dict[str, str]]:
+        """Fetch Claude Code changelog from GitHub repository.
+
+        Args:
+            session: HTTP session to use.
+            validators: ETag / Last-Modified of the copy already on disk.
+
+        Returns:
+            Tuple of (filename, content, validators). Content is the raw UTF-8
+            body with its header (staged in a temporary file with
+            stream_downloads), or None when the server answered 304 Not
+            Modified.
+        """
+        changelog_url = self.config.changelog_url
         filename = "changelog.md"
 
         self.logger.info("fetching_changelog", url=changelog_url)
 
-        for attempt in range(self.config.max_retries):
+        attempt = 0
+        throttled = 0
+        while attempt < self.config.max_retries:
             try:
-                response = session.get(
+                response = self._get(
+                    session,
                     changelog_url,
-                    headers=self.config.headers,
+                    use_cache=True,
+                    headers=self._request_headers(validators),
                     timeout=self.config.timeout,
                     allow_redirects=True,
+                    stream=self.config.stream_downloads,
                 )
 
                 if response.status_code == 429:  # Rate limit
-                    wait_time = int(response.headers.get("Retry-After", 60))
-                    self.logger.warning("rate_limited", wait_seconds=wait_time)
-                    time.sleep(wait_time)
+                    throttled += 1
+                    self.metrics.record_retry("throttled")
+                    if throttled > MAX_THROTTLED_RETRIES:
+                        raise Exception(
+                            "Failed to fetch changelog: still rate limited "
+                            f"after {MAX_THROTTLED_RETRIES} retries"
+                        )
                     continue
 
-                response.raise_for_status()
+                if response.status_code == 304 and validators:
+                    self.logger.info("changelog_not_modified")
+                    return (
+                        filename,
+                        None,
+                        {**validators, **self._response_validators(response)},
+                    )
 
-                content = response.text
+                response.raise_for_status()
 
                 # Add header to indicate this is from Claude Code repo, not docs site
-                header = """# Changelog de Claude Code
-
-> **Fuente**: https://github.com/anthropics/claude-code/blob/main/CHANGELOG.md
->
-> Este es el changelog oficial de lanzamientos de Claude Code, obtenido automáticamente del repositorio de Claude Code. Para documentación, ver otros temas vía `/docs`.
-
----
-
-"""
-                content = header + content
+                content, head = self._read_body(
+                    changelog_url, response, filename, prefix=CHANGELOG_HEADER
+                )
 
                 # Basic validation
-                if len(content.strip()) < 100:
+                if len(head.strip()) < 100:
+                    self._reject_body(changelog_url, content)
                     raise ValueError(
                         f"Changelog content too short ({len(content)} bytes)"
                     )
 
                 self.logger.info("changelog_fetched", bytes=len(content))
-                return filename, content
+                if isinstance(content, bytes):
+                    self._cache_response(changelog_url, response)
+                return filename, content, self._response_validators(response)
 
             except requests.exceptions.RequestException as e:
                 self.logger.warning(
@@ -438,15 +1159,23 @@ class ClaudeCodeFetcher:
                     max_attempts=self.config.max_retries,
                     error=str(e),
                 )
-                if attempt < self.config.max_retries - 1:
+                attempt += 1
+                if attempt < self.config.max_retries:
+                    self.circuit_breakers.check(changelog_url, probe=False)
                     delay = min(
-                        self.config.retry_delay * (2**attempt),
+                        self.config.retry_delay * (2 ** (attempt - 1)),
                         self.config.max_retry_delay,
                     )
                     jittered_delay = delay * random.uniform(0.5, 1.0)
+                    # Don't sleep for a retry that could not finish in time
+                    self.deadline.check(
+                        jittered_delay + self._expected_request_seconds(),
+                        f"a retry of {filename}",
+                    )
                     self.logger.info(
                         "retrying_in_seconds", seconds=round(jittered_delay, 1)
                     )
+                    self.metrics.record_retry("failed", jittered_delay)
                     time.sleep(jittered_delay)
                 else:
                     raise Exception(
@@ -457,13 +1186,36 @@ class ClaudeCodeFetcher:
                 self.logger.error("changelog_validation_failed", error=str(e))
                 raise
 
-    def save_markdown_file(self, filename: str, content: str) -> str:
-        """Save markdown content and return its hash."""
-        file_path = self.config.docs_dir / filename
+    def save_markdown_file(
+        self,
+        filename: str,
+        content: bytes | str | StagedBody,
+        content_hash: str | None = None,
+    ) -> str:
+        """Save markdown content and return its hash.
+
+        Args:
+            filename: File name inside the output directory.
+            content: Raw UTF-8 body (or text, which is encoded once). A staged
+                body is moved into place instead of being copied.
+            content_hash: Hash already computed for content, to avoid hashing
+                it again.
+
+        Returns:
+            Hash of the saved bytes, with config.hash_algorithm.
+        """
+        file_path = self.output_dir / filename
+        if isinstance(content, str):
+            content = content.encode("utf-8")
 
         try:
-            file_path.write_text(content, encoding="utf-8")
-            content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+            if isinstance(content, StagedBody):
+                content.promote(file_path)
+                # Hashed while it was staged
+                content_hash = content.digest
+            else:
+                file_path.write_bytes(content)
+                content_hash = content_hash or self.content_hash(content)
             self.logger.info("file_saved", filename=filename)
             return content_hash
         except Exception as e:
@@ -484,202 +1236,662 @@ class ClaudeCodeFetcher:
                 self.logger.info("removing_old_file", filename=filename)
                 file_path.unlink()
 
-    def fetch_all_documentation(self) -> dict[str, any]:
-        """Fetch all Claude Code documentation."""
-        start_time = datetime.now()
-        self.logger.info("starting_documentation_fetch")
+    def _process_page(
+        self,
+        page_path: str,
+        session: requests.Session,
+        base_url: str,
+        manifest: dict,
+        lastmod: str | None = None,
+    ) -> tuple[str, dict[str, Any]]:
+        """Fetch one page, save it if it changed and build its manifest entry.
 
-        # Log configuration
-        github_repo = os.environ.get(
-            "GITHUB_REPOSITORY", "jhonma82/claude-code-docs-spa"
+        Args:
+            page_path: Documentation page path.
+            session: HTTP session to use.
+            base_url: Base URL of the documentation site.
+            manifest: Manifest of the previous run.
+            lastmod: Sitemap lastmod of the page, remembered for incremental runs.
+
+        Returns:
+            Tuple of (filename, manifest_entry)
+        """
+        self.deadline.check(self._expected_request_seconds(), f"fetching {page_path}")
+        filename = self.url_to_safe_filename(page_path)
+        old_entry = manifest.get("files", {}).get(filename, {})
+
+        filename, content, validators = self.fetch_markdown_content(
+            page_path,
+            session,
+            base_url,
+            validators=self._entry_validators(filename, old_entry),
         )
-        self.logger.info("github_repo", repo=github_repo)
 
-        # Load manifest
-        manifest = self.load_manifest()
+        # Check if content has changed (a 304 reply means it has not)
+        with self.metrics.phase("writes"):
+            content_hash, hash_algorithm, changed = self._store_body(
+                filename, content, old_entry
+            )
+        if changed:
+            self.logger.info("content_updated", filename=filename)
+            # Only update timestamp when content actually changes
+            last_updated = datetime.now().isoformat()
+        else:
+            self.logger.info("content_unchanged", filename=filename)
+            # Keep existing timestamp for unchanged files
+            last_updated = old_entry.get("last_updated", datetime.now().isoformat())
+
+        entry = {
+            "original_url": f"{base_url}{page_path}",
+            "original_md_url": f"{base_url}{page_path}.md",
+            "hash": content_hash,
+            "hash_algorithm": hash_algorithm,
+            "last_updated": last_updated,
+            **validators,
+        }
+        if lastmod:
+            entry["sitemap_lastmod"] = lastmod
+        return filename, entry
 
-        # Statistics
-        successful = 0
-        failed = 0
-        failed_pages = []
-        fetched_files = set()
-        new_manifest = {"files": {}}
+    def _process_changelog(
+        self, session: requests.Session, manifest: dict
+    ) -> tuple[str, dict[str, Any]]:
+        """Fetch the changelog, save it if it changed and build its manifest entry.
 
-        # Create session for connection pooling
-        sitemap_url = None
-        with requests.Session() as session:
-            # Discover sitemap and base URL
-            try:
-                sitemap_url, base_url = self.discover_sitemap_and_base_url(session)
-            except Exception as e:
-                self.logger.error("sitemap_discovery_failed", error=str(e))
-                self.logger.info("using_fallback_config")
-                base_url = "https://docs.anthropic.com"
-                sitemap_url = None
-
-            # Discover documentation pages dynamically
-            if sitemap_url:
-                documentation_pages = self.discover_claude_code_pages(
-                    session, sitemap_url
-                )
+        Returns:
+            Tuple of (filename, manifest_entry)
+        """
+        self.deadline.check(self._expected_request_seconds(), "fetching the changelog")
+        old_entry = manifest.get("files", {}).get("changelog.md", {})
+
+        filename, content, validators = self.fetch_changelog(
+            session, validators=self._entry_validators("changelog.md", old_entry)
+        )
+
+        # Check if content has changed (a 304 reply means it has not)
+        with self.metrics.phase("writes"):
+            content_hash, hash_algorithm, changed = self._store_body(
+                filename, content, old_entry
+            )
+        if changed:
+            self.logger.info("changelog_updated", filename=filename)
+            last_updated = datetime.now().isoformat()
+        else:
+            self.logger.info("changelog_unchanged", filename=filename)
+            last_updated = old_entry.get("last_updated", datetime.now().isoformat())
+
+        return filename, {
+            "original_url": "https://github.com/anthropics/claude-code/blob/main/CHANGELOG.md",
+            "original_raw_url": self.config.changelog_url,
+            "hash": content_hash,
+            "hash_algorithm": hash_algorithm,
+            "last_updated": last_updated,
+            "source": "claude-code-repository",
+            **validators,
+        }
+
+    def _discover_documentation(self, session: requests.Session, run: FetchRun) -> None:
+        """Discover the sitemap, base URL and documentation pages for a run."""
+        # Discover sitemap, base URL and pages from a single sitemap download
+        try:
+            run.sitemap_url, run.base_url, pages = self.discover_documentation_pages(
+                session
+            )
+            run.pages = [path for path, _ in pages]
+            run.lastmods = dict(pages)
+        except DeadlineExceededError:
+            # The fallback list would drop every other page from the manifest
+            raise
+        except Exception as e:
+            self.logger.error("sitemap_discovery_failed", error=str(e))
+            self.logger.info("using_fallback_config")
+            run.base_url = "https://docs.anthropic.com"
+            run.sitemap_url = None
+            # Use fallback pages if sitemap discovery failed
+            run.pages = list(FALLBACK_PAGES)
+
+        if not run.pages:
+            self.logger.error("no_documentation_pages_found")
+            raise RuntimeError("No documentation pages discovered")
+
+    def _full_sweep_due(self, manifest: dict) -> bool:
+        """Check whether this run must fetch every page regardless of lastmod."""
+        if not self.config.incremental:
+            return True
+
+        last_full_sweep = manifest.get("fetch_metadata", {}).get("last_full_sweep")
+        if not last_full_sweep:
+            return True
+        try:
+            elapsed = datetime.now() - datetime.fromisoformat(last_full_sweep)
+        except ValueError:
+            return True
+        return elapsed.total_seconds() >= self.config.full_sweep_interval_hours * 3600
+
+    def _plan_pages(self, run: FetchRun, manifest: dict) -> None:
+        """Decide which discovered pages need a request in this run.
+
+        In incremental mode a page is carried over from the previous manifest
+        when the sitemap reports the same lastmod as the last successful fetch
+        and the file is still on disk.
+        """
+        run.full_sweep = self._full_sweep_due(manifest)
+        if run.full_sweep:
+            run.pages_to_fetch = list(run.pages)
+            return
+
+        previous_files = manifest.get("files", {})
+        for page_path in run.pages:
+            filename = self.url_to_safe_filename(page_path)
+            old_entry = previous_files.get(filename, {})
+            lastmod = run.lastmods.get(page_path)
+            if (
+                lastmod
+                and old_entry.get("sitemap_lastmod") == lastmod
+                and (self.config.docs_dir / filename).exists()
+            ):
+                run.record_skip(filename, old_entry)
             else:
-                # Use fallback pages if sitemap discovery failed
-                documentation_pages = [
-                    "/es/docs/claude-code/overview",
-                    "/es/docs/claude-code/setup",
-                    "/es/docs/claude-code/quickstart",
-                    "/es/docs/claude-code/memory",
-                    "/es/docs/claude-code/common-workflows",
-                    "/es/docs/claude-code/ide-integrations",
-                    "/es/docs/claude-code/mcp",
-                    "/es/docs/claude-code/github-actions",
-                    "/es/docs/claude-code/sdk",
-                    "/es/docs/claude-code/troubleshooting",
-                    "/es/docs/claude-code/security",
-                    "/es/docs/claude-code/settings",
-                    "/es/docs/claude-code/hooks",
-                    "/es/docs/claude-code/costs",
-                    "/es/docs/claude-code/monitoring-usage",
-                ]
+                run.pages_to_fetch.append(page_path)
 
-            if not documentation_pages:
-                self.logger.error("no_documentation_pages_found")
-                raise RuntimeError("No documentation pages discovered")
+        self.logger.info(
+            "incremental_sync_planned",
+            to_fetch=len(run.pages_to_fetch),
+            unchanged=run.skipped,
+        )
 
-            # Fetch each discovered page
-            for i, page_path in enumerate(documentation_pages, 1):
+    def _open_journal(self, run: FetchRun) -> None:
+        """Start checkpointing the run, resuming an interrupted one if asked.
+
+        With config.resume, pages recorded in the journal of an interrupted
+        run against the same base URL are carried over instead of fetched
+        again, as long as their file is still on disk.
+        """
+        journal = RunJournal(self.config.cache_dir / JOURNAL_FILENAME)
+        resuming = False
+        header: dict[str, Any] = {}
+
+        if self.config.resume:
+            header, completed = journal.load()
+            if completed and header.get("base_url") == run.base_url:
+                resuming = True
+                self._open_output_dir(header.get("output_dir"))
+                remaining = []
+                for page_path in [*run.pages_to_fetch, "changelog"]:
+                    done = completed.get(page_path)
+                    if done and self._has_file(done[0]):
+                        run.record_resume(*done)
+                        if page_path == "changelog":
+                            run.fetch_changelog = False
+                    elif page_path != "changelog":
+                        remaining.append(page_path)
+                run.pages_to_fetch = remaining
                 self.logger.info(
-                    "processing_page",
-                    current=i,
-                    total=len(documentation_pages),
-                    page=page_path,
+                    "resuming_interrupted_run",
+                    started_at=header.get("started_at"),
+                    resumed=run.resumed,
+                    remaining=len(remaining),
                 )
+            elif completed:
+                self.logger.warning(
+                    "journal_not_resumable",
+                    journal_base_url=header.get("base_url"),
+                    base_url=run.base_url,
+                )
+            else:
+                self.logger.info("no_interrupted_run_to_resume")
+
+        if not resuming:
+            self._open_output_dir(None)
+        journal.start(
+            {
+                "started_at": run.start_time.isoformat(),
+                "base_url": run.base_url,
+                "output_dir": str(self.output_dir),
+            },
+            append=resuming,
+        )
+        run.journal = journal
 
-                try:
-                    filename, content = self.fetch_markdown_content(
-                        page_path, session, base_url
-                    )
-
-                    # Check if content has changed
-                    old_hash = (
-                        manifest.get("files", {}).get(filename, {}).get("hash", "")
-                    )
-                    old_entry = manifest.get("files", {}).get(filename, {})
-
-                    if self.content_has_changed(content, old_hash):
-                        content_hash = self.save_markdown_file(filename, content)
-                        self.logger.info("content_updated", filename=filename)
-                        # Only update timestamp when content actually changes
-                        last_updated = datetime.now().isoformat()
-                    else:
-                        content_hash = old_hash
-                        self.logger.info("content_unchanged", filename=filename)
-                        # Keep existing timestamp for unchanged files
-                        last_updated = old_entry.get(
-                            "last_updated", datetime.now().isoformat()
-                        )
+    def _open_output_dir(self, resumed_dir: str | None) -> None:
+        """Choose the directory this run writes into.
 
-                    new_manifest["files"][filename] = {
-                        "original_url": f"{base_url}{page_path}",
-                        "original_md_url": f"{base_url}{page_path}.md",
-                        "hash": content_hash,
-                        "last_updated": last_updated,
-                    }
+        With generations, that is a new generation directory, or the
+        unpublished one of the interrupted run being resumed.
+        """
+        if self.generations is None:
+            self.output_dir = self.config.docs_dir
+        elif resumed_dir and Path(resumed_dir).is_dir():
+            self.output_dir = Path(resumed_dir)
+        else:
+            self.output_dir = self.generations.create()
+        self.logger.info("output_dir", path=str(self.output_dir))
 
-                    fetched_files.add(filename)
-                    successful += 1
+    def _has_file(self, filename: str) -> bool:
+        """Check whether a file exists in this run's output or the published tree."""
+        return (self.output_dir / filename).exists() or (
+            self.config.docs_dir / filename
+        ).exists()
 
-                    # Rate limiting
-                    if i < len(documentation_pages):
-                        time.sleep(self.config.rate_limit_delay)
+    def _publish(self, run: FetchRun, manifest: dict) -> None:
+        """Save the manifest and make the run's files visible to readers.
 
-                except Exception as e:
-                    self.logger.error(
-                        "page_processing_failed", page=page_path, error=str(e)
-                    )
-                    failed += 1
-                    failed_pages.append(page_path)
+        In place, stale files are deleted after the new ones were written.
+        With generations, files the run did not rewrite are linked from the
+        published tree and the whole generation is swapped in at once.
+        """
+        if self.generations is None:
+            # Clean up old files (only those we previously fetched)
+            self.cleanup_old_files(run.fetched_files, manifest)
+            self._write_search_index(run)
+            self.save_manifest(run.new_manifest)
+            return
+
+        generation = self.output_dir
+        previous = set(manifest.get("files", {})) | {
+            self.config.manifest_file,
+            self.config.search_index_file,
+        }
+        published = (
+            self.config.docs_dir.iterdir() if self.config.docs_dir.is_dir() else []
+        )
+        unmanaged = {
+            path.name
+            for path in published
+            if path.is_file()
+            and path.name not in previous
+            and not path.name.startswith(".")
+        }
+        carried = self.generations.carry_over(generation, run.fetched_files | unmanaged)
+        self._write_search_index(run)
+        self.save_manifest(run.new_manifest)
+        self.generations.publish(generation)
+        self.output_dir = self.config.docs_dir
+        self.generations.collect_garbage()
+        self.logger.info("unchanged_files_linked", count=carried)
+
+    def _write_search_index(self, run: FetchRun) -> None:
+        """Index the run's pages for ``/docs search`` and record it in the manifest.
+
+        The index is written beside the pages before the manifest, so with
+        generations it is published together with the files it describes.
+        A failure only costs the index: the run is still published.
+        """
+        index_file = self.config.search_index_file
+        if not index_file:
+            return
+
+        with self.metrics.phase("indexing"):
+            filenames = [
+                filename
+                for filename in run.new_manifest["files"]
+                if (self.output_dir / filename).is_file()
+            ]
+            try:
+                index = build_search_index(self.output_dir, filenames)
+                content = encode_search_index(index)
+                index_path = self.output_dir / index_file
+                tmp_path = index_path.with_name(f".{index_file}.tmp")
+                tmp_path.write_bytes(content)
+                tmp_path.replace(index_path)
+            except (OSError, UnicodeDecodeError) as e:
+                self.logger.warning("search_index_failed", error=str(e))
+                return
+
+        run.new_manifest["search_index"] = {
+            "file": index_file,
+            "hash": digest_bytes(content, self.config.hash_algorithm),
+            "hash_algorithm": self.config.hash_algorithm,
+            "size": len(content),
+            "sections": len(index["sections"]),
+            "tokens": len(index["postings"]),
+        }
+        self.logger.info(
+            "search_index_written",
+            sections=len(index["sections"]),
+            tokens=len(index["postings"]),
+            bytes=len(content),
+        )
 
-        # Fetch Claude Code changelog
-        self.logger.info("fetching_changelog")
-        try:
-            filename, content = self.fetch_changelog(session)
+    def _checkpointed(
+        self,
+        run: FetchRun,
+        label: str,
+        func: Callable[..., tuple[str, dict[str, Any]]],
+        *args: Any,
+    ) -> tuple[str, dict[str, Any]]:
+        """Run one page stage and checkpoint its result to the run journal."""
+        filename, entry = func(*args)
+        if run.journal is not None:
+            try:
+                run.journal.record(label, filename, entry)
+            except OSError as e:
+                self.logger.warning("journal_write_failed", page=label, error=str(e))
+        return filename, entry
+
+    def _record_page_result(
+        self,
+        run: FetchRun,
+        page_path: str,
+        result: tuple[str, dict[str, Any]] | BaseException,
+        manifest: dict,
+    ) -> None:
+        """Account for the outcome of one page in the run statistics.
+
+        A page that failed, or that the run deadline left for later, keeps
+        its previous manifest entry and file, if the file is still there.
+        """
+        if isinstance(result, BaseException):
+            if page_path == "changelog":
+                filename = "changelog.md"
+            else:
+                filename = self.url_to_safe_filename(page_path)
+            previous_entry = manifest.get("files", {}).get(filename)
+            if previous_entry is not None and not self._has_file(filename):
+                previous_entry = None
+
+            if isinstance(result, DeadlineExceededError):
+                self.logger.info("page_deferred", page=page_path, reason=str(result))
+                run.record_deferral(page_path, filename, previous_entry)
+            elif page_path == "changelog":
+                self.logger.error("changelog_fetch_failed", error=str(result))
+                run.record_failure(page_path, filename, previous_entry)
+            else:
+                self.logger.error(
+                    "page_processing_failed", page=page_path, error=str(result)
+                )
+                run.record_failure(page_path, filename, previous_entry)
+            return
 
-            # Check if content has changed
-            old_hash = manifest.get("files", {}).get(filename, {}).get("hash", "")
-            old_entry = manifest.get("files", {}).get(filename, {})
+        filename, entry = result
+        run.record_success(filename, entry)
+        self.logger.info(
+            "page_processed",
+            current=run.successful + run.failed,
+            total=len(run.pages) + 1,
+            page=page_path,
+        )
 
-            if self.content_has_changed(content, old_hash):
-                content_hash = self.save_markdown_file(filename, content)
-                self.logger.info("changelog_updated", filename=filename)
-                last_updated = datetime.now().isoformat()
-            else:
-                content_hash = old_hash
-                self.logger.info("changelog_unchanged", filename=filename)
-                last_updated = old_entry.get("last_updated", datetime.now().isoformat())
+    def _finalize_run(self, run: FetchRun, manifest: dict) -> dict[str, Any]:
+        """Publish and summarize the run, always closing its journal.
 
-            new_manifest["files"][filename] = {
-                "original_url": "https://github.com/anthropics/claude-code/blob/main/CHANGELOG.md",
-                "original_raw_url": "https://raw.githubusercontent.com/anthropics/claude-code/main/CHANGELOG.md",
-                "hash": content_hash,
-                "last_updated": last_updated,
-                "source": "claude-code-repository",
-            }
+        A journal left behind by a run that failed here stays on disk for a
+        later resume, but its file handle is released.
 
-            fetched_files.add(filename)
-            successful += 1
+        Raises:
+            RuntimeError: If no page was fetched.
+        """
+        try:
+            return self._publish_run(run, manifest)
+        finally:
+            if run.journal is not None:
+                run.journal.close()
 
-        except Exception as e:
-            self.logger.error("changelog_fetch_failed", error=str(e))
-            failed += 1
-            failed_pages.append("changelog")
+    def _publish_run(self, run: FetchRun, manifest: dict) -> dict[str, Any]:
+        """Clean up stale files, save the manifest and summarize the run.
 
-        # Clean up old files (only those we previously fetched)
-        self.cleanup_old_files(fetched_files, manifest)
+        Raises:
+            RuntimeError: If no page was fetched. The previous documentation
+                and manifest are then left untouched.
+        """
+        if run.successful + run.skipped + run.resumed == 0:
+            self.logger.error(
+                "no_pages_fetched_successfully",
+                failed=run.failed,
+                circuit_breakers=self.circuit_breakers.states(),
+            )
+            if self.generations is not None:
+                self.generations.discard(self.output_dir)
+                self.output_dir = self.config.docs_dir
+            raise RuntimeError(
+                "No pages fetched successfully; previous documentation kept"
+            )
 
         # Add metadata to manifest
-        duration = datetime.now() - start_time
-        new_manifest["fetch_metadata"] = {
+        duration = datetime.now() - run.start_time
+        transfer = self.transfer_log.summary()
+        run.new_manifest["fetch_metadata"] = {
             "last_fetch_completed": datetime.now().isoformat(),
             "fetch_duration_seconds": duration.total_seconds(),
-            "total_pages_discovered": len(documentation_pages),
-            "pages_fetched_successfully": successful,
-            "pages_failed": failed,
-            "failed_pages": failed_pages,
-            "sitemap_url": sitemap_url,
-            "base_url": base_url,
-            "total_files": len(fetched_files),
+            "total_pages_discovered": len(run.pages),
+            "pages_fetched_successfully": run.successful,
+            "pages_failed": run.failed,
+            "failed_pages": run.failed_pages,
+            "pages_skipped_unchanged": run.skipped,
+            "pages_resumed": run.resumed,
+            "pages_deferred": run.deferred,
+            "deferred_pages": run.deferred_pages,
+            "deadline_seconds": self.config.deadline_seconds,
+            "incremental": not run.full_sweep,
+            "last_full_sweep": (
+                run.start_time.isoformat()
+                if run.full_sweep
+                else manifest.get("fetch_metadata", {}).get("last_full_sweep")
+            ),
+            "sitemap_url": run.sitemap_url,
+            "base_url": run.base_url,
+            "total_files": len(run.fetched_files),
+            "max_workers": self.config.max_workers,
+            "accept_encoding": self.config.accept_encoding,
+            "hash_algorithm": self.config.hash_algorithm,
+            "transfer": transfer,
+            "rate_limit": {
+                "adaptive": self.config.adaptive_rate_limit,
+                "requests_per_second": {
+                    host: round(rate, 3)
+                    for host, rate in self.rate_limiter.current_rates().items()
+                },
+            },
+            "generation": (
+                self.output_dir.name if self.generations is not None else None
+            ),
+            "circuit_breakers": self.circuit_breakers.states(),
+            "metrics": self.metrics.summary(),
             "fetch_tool_version": "3.0",
         }
 
-        # Save new manifest
-        self.save_manifest(new_manifest)
+        # Save new manifest; the run is complete, so its journal is obsolete
+        with self.metrics.phase("cleanup"):
+            self._publish(run, manifest)
+        if run.journal is not None:
+            run.journal.discard()
+
+        metrics = self.metrics.summary()
+        if self.config.metrics_file is not None:
+            try:
+                self.metrics.write(self.config.metrics_file, metrics)
+            except OSError as e:
+                self.logger.warning(
+                    "metrics_write_failed",
+                    path=str(self.config.metrics_file),
+                    error=str(e),
+                )
 
         # Summary
         self.logger.info("fetch_completed", duration_seconds=duration.total_seconds())
-        self.logger.info("pages_discovered", count=len(documentation_pages))
+        self.logger.info("fetch_timings", **metrics["time_seconds"])
+        self.logger.info("pages_discovered", count=len(run.pages))
         self.logger.info(
             "fetch_results",
-            successful=successful,
-            total=len(documentation_pages),
-            failed=failed,
+            successful=run.successful,
+            total=len(run.pages),
+            failed=run.failed,
         )
 
-        if failed_pages:
-            self.logger.warning("failed_pages", pages=failed_pages)
+        if run.deferred_pages:
+            self.logger.warning(
+                "run_deadline_reached",
+                deadline_seconds=self.config.deadline_seconds,
+                deferred=run.deferred,
+            )
+        if run.failed_pages:
             # Don't exit with error - partial success is acceptable
-            if successful == 0:
-                self.logger.error("no_pages_fetched_successfully")
-                raise RuntimeError("No pages fetched successfully")
+            self.logger.warning("failed_pages", pages=run.failed_pages)
         else:
             self.logger.info("all_pages_fetched_successfully")
 
         return {
             "success": True,
-            "pages_discovered": len(documentation_pages),
-            "pages_fetched": successful,
-            "pages_failed": failed,
-            "failed_pages": failed_pages,
+            "pages_discovered": len(run.pages),
+            "pages_fetched": run.successful,
+            "pages_skipped": run.skipped,
+            "pages_resumed": run.resumed,
+            "pages_failed": run.failed,
+            "failed_pages": run.failed_pages,
+            "pages_deferred": run.deferred,
+            "deferred_pages": run.deferred_pages,
             "duration_seconds": duration.total_seconds(),
+            "requests_per_second": self.rate_limiter.current_rates(),
+            "wire_bytes": transfer["wire_bytes"],
+            "decoded_bytes": transfer["decoded_bytes"],
+            "time_seconds": metrics["time_seconds"],
+            "circuit_breakers": self.circuit_breakers.states(),
+            "search_index": run.new_manifest.get("search_index"),
             "docs_dir": str(self.config.docs_dir),
         }
+
+    def _start_run(self) -> tuple[FetchRun, dict]:
+        """Log the run configuration and load the previous manifest."""
+        self.logger.info("starting_documentation_fetch")
+
+        # Log configuration
+        github_repo = os.environ.get(
+            "GITHUB_REPOSITORY", "jhonma82/claude-code-docs-spa"
+        )
+        self.logger.info("github_repo", repo=github_repo)
+
+        self.transfer_log = TransferLog()
+        self.metrics = RunMetrics()
+        self.deadline = RunDeadline(self.config.deadline_seconds)
+        return FetchRun(), self.load_manifest()
+
+    def fetch_all_documentation(self) -> dict[str, Any]:
+        """Fetch all Claude Code documentation."""
+        run, manifest = self._start_run()
+
+        # Shared session whose pool holds a keep-alive connection per worker
+        with create_session(self.config) as session:
+            with self.metrics.phase("discovery"):
+                self._discover_documentation(session, run)
+                self._plan_pages(run, manifest)
+                self._open_journal(run)
+
+            # Fetch discovered pages concurrently; the per-host rate limiter
+            # paces request starts instead of a fixed sleep between pages
+            self.logger.info(
+                "fetching_pages",
+                total=len(run.pages_to_fetch),
+                workers=self.config.max_workers,
+            )
+            with (
+                self.metrics.phase("fetching"),
+                ThreadPoolExecutor(
+                    max_workers=self.config.max_workers,
+                    thread_name_prefix="docs-fetch",
+                ) as executor,
+            ):
+                futures = [
+                    executor.submit(
+                        self._checkpointed,
+                        run,
+                        page_path,
+                        self._process_page,
+                        page_path,
+                        session,
+                        run.base_url,
+                        manifest,
+                        run.lastmods.get(page_path),
+                    )
+                    for page_path in run.pages_to_fetch
+                ]
+
+                # Collect in discovery order so the manifest stays deterministic
+                for page_path, future in zip(run.pages_to_fetch, futures, strict=True):
+                    try:
+                        result: tuple[str, dict[str, Any]] | BaseException = (
+                            future.result()
+                        )
+                    except Exception as e:
+                        result = e
+                    self._record_page_result(run, page_path, result, manifest)
+
+            # Fetch Claude Code changelog
+            if run.fetch_changelog:
+                self.logger.info("fetching_changelog")
+                try:
+                    with self.metrics.phase("fetching"):
+                        result = self._checkpointed(
+                            run, "changelog", self._process_changelog, session, manifest
+                        )
+                except Exception as e:
+                    result = e
+                self._record_page_result(run, "changelog", result, manifest)
+
+        return self._finalize_run(run, manifest)
+
+    async def afetch_all_documentation(self) -> dict[str, Any]:
+        """Fetch all Claude Code documentation without blocking the event loop.
+
+        Discovery, page fetches, the changelog and file writes run as
+        coroutines, at most ``max_workers`` at a time. Each blocking HTTP or
+        disk step is offloaded to a worker thread, so the calling event loop
+        stays responsive for the whole sync.
+
+        Returns:
+            Dictionary with the same run summary as fetch_all_documentation.
+        """
+        run, manifest = await asyncio.to_thread(self._start_run)
+        semaphore = asyncio.Semaphore(self.config.max_workers)
+
+        async def bounded(
+            func: Callable[..., tuple[str, dict[str, Any]]], *args: Any
+        ) -> tuple[str, dict[str, Any]]:
+            async with semaphore:
+                return await asyncio.to_thread(func, *args)
+
+        with create_session(self.config) as session:
+            with self.metrics.phase("discovery"):
+                await asyncio.to_thread(self._discover_documentation, session, run)
+                await asyncio.to_thread(self._plan_pages, run, manifest)
+                await asyncio.to_thread(self._open_journal, run)
+
+            self.logger.info(
+                "fetching_pages",
+                total=len(run.pages_to_fetch),
+                workers=self.config.max_workers,
+            )
+            stages = [
+                bounded(
+                    self._checkpointed,
+                    run,
+                    page_path,
+                    self._process_page,
+                    page_path,
+                    session,
+                    run.base_url,
+                    manifest,
+                    run.lastmods.get(page_path),
+                )
+                for page_path in run.pages_to_fetch
+            ]
+            labels = list(run.pages_to_fetch)
+            if run.fetch_changelog:
+                stages.append(
+                    bounded(
+                        self._checkpointed,
+                        run,
+                        "changelog",
+                        self._process_changelog,
+                        session,
+                        manifest,
+                    )
+                )
+                labels.append("changelog")
+            with self.metrics.phase("fetching"):
+                results = await asyncio.gather(*stages, return_exceptions=True)
+
+        # Gather preserves submission order, keeping the manifest deterministic
+        for label, result in zip(labels, results, strict=True):
+            self._record_page_result(run, label, result, manifest)
+
+        return await asyncio.to_thread(self._finalize_run, run, manifest)
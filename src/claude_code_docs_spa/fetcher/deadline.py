@@ -0,0 +1,60 @@
+"""Time budget of a documentation fetch run."""
+
+from __future__ import annotations
+
+import math
+import time
+
+
+class DeadlineExceededError(Exception):
+    """Raised instead of starting work the run's time budget cannot cover."""
+
+    def __init__(self, what: str, remaining: float) -> None:
+        super().__init__(
+            f"Run deadline reached: {remaining:.1f}s left, not enough for {what}"
+        )
+        self.what = what
+        self.remaining = remaining
+
+
+class RunDeadline:
+    """Monotonic deadline of one run, or no deadline at all.
+
+    Pages are only started, and retries only scheduled, while the remaining
+    budget covers the time they are expected to take, so a run stopped by
+    its deadline still has time left to save a consistent manifest.
+    """
+
+    def __init__(self, seconds: float | None = None) -> None:
+        """Start the budget now.
+
+        Args:
+            seconds: Length of the budget. None means no deadline.
+        """
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds if seconds is not None else None
+
+    def remaining(self) -> float:
+        """Get the seconds left (infinite without a deadline)."""
+        if self.expires_at is None:
+            return math.inf
+        return self.expires_at - time.monotonic()
+
+    def check(self, needed: float, what: str) -> None:
+        """Make sure there is time left for work expected to take ``needed``.
+
+        Args:
+            needed: Seconds the work is expected to take.
+            what: Description of the work, for the error message.
+
+        Raises:
+            DeadlineExceededError: If less than ``needed`` seconds (or no time at
+                all) are left.
+        """
+        remaining = self.remaining()
+        if remaining <= 0 or remaining < needed:
+            raise DeadlineExceededError(what, max(remaining, 0.0))
+
+    def cap(self, timeout: float) -> float:
+        """Shorten a request timeout so the request cannot outlive the budget."""
+        return max(min(timeout, self.remaining()), 0.001)
@@ -0,0 +1,46 @@
+"""Content digests recorded in the documentation manifest."""
+
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from typing import Any
+
+# Algorithm of manifest entries written before entries were tagged
+DEFAULT_HASH_ALGORITHM = "sha256"
+
+# Algorithms accepted for FetcherConfig.hash_algorithm. blake2b is usually
+# the fastest on 64-bit CPUs without SHA extensions.
+SUPPORTED_HASH_ALGORITHMS = ("sha256", "blake2b", "blake2s", "sha512", "sha3_256")
+
+
+def new_hasher(algorithm: str = DEFAULT_HASH_ALGORITHM) -> Any:
+    """Create an incremental hasher for one of the supported algorithms.
+
+    Raises:
+        ValueError: If the algorithm is not supported.
+    """
+    if algorithm not in SUPPORTED_HASH_ALGORITHMS:
+        raise ValueError(
+            f"Unsupported hash algorithm {algorithm!r}; "
+            f"choose one of {', '.join(SUPPORTED_HASH_ALGORITHMS)}"
+        )
+    return hashlib.new(algorithm)
+
+
+def digest_bytes(data: bytes, algorithm: str = DEFAULT_HASH_ALGORITHM) -> str:
+    """Get the hex digest of a buffer."""
+    hasher = new_hasher(algorithm)
+    hasher.update(data)
+    return str(hasher.hexdigest())
+
+
+def digest_file(path: Path, algorithm: str = DEFAULT_HASH_ALGORITHM) -> str:
+    """Get the hex digest of a file, reading it in chunks."""
+    with path.open("rb") as f:
+        return str(hashlib.file_digest(f, lambda: new_hasher(algorithm)).hexdigest())
+
+
+def entry_algorithm(entry: dict[str, Any]) -> str:
+    """Get the algorithm of a manifest entry's hash (untagged means SHA-256)."""
+    return str(entry.get("hash_algorithm", DEFAULT_HASH_ALGORITHM))
@@ -0,0 +1,125 @@
+"""Streaming downloads of page bodies to disk for the documentation fetcher."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from collections.abc import Iterable
+from pathlib import Path
+
+from .digest import DEFAULT_HASH_ALGORITHM, new_hasher
+
+# Bytes at the start of a body kept in memory for markdown validation
+VALIDATION_HEAD_BYTES = 64 * 1024
+
+# Bytes inspected for an HTML signature before the download is aborted
+HTML_SNIFF_BYTES = 512
+
+
+def looks_like_html(head: bytes | bytearray) -> bool:
+    """Check the start of a body for an HTML document signature."""
+    start = head[:HTML_SNIFF_BYTES].lstrip().lower()
+    return start.startswith(b"<!doctype") or b"<html" in start[:100]
+
+
+class StagedBody:
+    """A downloaded body waiting in a temporary file beside its destination."""
+
+    def __init__(self, path: Path, digest: str, size: int, head: bytes) -> None:
+        """Initialize the staged body.
+
+        Args:
+            path: Temporary file holding the body.
+            digest: Hex digest of the body, computed while it was written.
+            size: Body size in bytes.
+            head: First VALIDATION_HEAD_BYTES of the body.
+        """
+        self.path = path
+        self.digest = digest
+        self.size = size
+        self.head = head
+
+    def read_bytes(self) -> bytes:
+        """Read the whole body into memory."""
+        return self.path.read_bytes()
+
+    def promote(self, target: Path) -> None:
+        """Atomically move the body to its destination."""
+        self.path.replace(target)
+
+    def discard(self) -> None:
+        """Delete the temporary file."""
+        self.path.unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __repr__(self) -> str:
+        return f"StagedBody(path={self.path}, size={self.size})"
+
+
+def stage_body(
+    chunks: Iterable[bytes],
+    directory: Path,
+    name: str,
+    *,
+    max_bytes: int,
+    prefix: bytes = b"",
+    algorithm: str = DEFAULT_HASH_ALGORITHM,
+) -> StagedBody:
+    """Write a streamed body to a temporary file, hashing it on the way.
+
+    Peak memory stays at one chunk plus the validation head. The download
+    is aborted as soon as the body turns out to be an HTML document or
+    grows past max_bytes, without reading the rest of it.
+
+    Args:
+        chunks: Body chunks, e.g. from Response.iter_content.
+        directory: Directory of the final file, so promotion is a rename.
+        name: Final file name, used to name the temporary file.
+        max_bytes: Largest body accepted, not counting prefix.
+        prefix: Bytes written before the body (e.g. a header).
+        algorithm: Digest algorithm of the returned body's hash.
+
+    Returns:
+        The staged body.
+
+    Raises:
+        ValueError: If the body is HTML or larger than max_bytes.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix=".part")
+    tmp_path = Path(tmp_name)
+    digest = new_hasher(algorithm)
+    digest.update(prefix)
+    head = bytearray(prefix[:VALIDATION_HEAD_BYTES])
+    body_start = bytearray()
+    size = 0
+
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(prefix)
+            for chunk in chunks:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ValueError(f"Response body exceeds {max_bytes} bytes")
+
+                if len(body_start) < HTML_SNIFF_BYTES:
+                    body_start += chunk[: HTML_SNIFF_BYTES - len(body_start)]
+                    if len(body_start) >= HTML_SNIFF_BYTES and looks_like_html(
+                        body_start
+                    ):
+                        raise ValueError("Received HTML instead of markdown")
+                if len(head) < VALIDATION_HEAD_BYTES:
+                    head += chunk[: VALIDATION_HEAD_BYTES - len(head)]
+
+                digest.update(chunk)
+                tmp_file.write(chunk)
+
+        if looks_like_html(body_start):
+            raise ValueError("Received HTML instead of markdown")
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    return StagedBody(tmp_path, digest.hexdigest(), len(prefix) + size, bytes(head))
@@ -0,0 +1,136 @@
+"""Generation directories published by atomic symlink swap."""
+
+from __future__ import annotations
+
+import os
+import shutil
+from collections.abc import Iterable
+from datetime import datetime
+from pathlib import Path
+
+import structlog
+
+# Prefix of every generation directory name; names sort by creation time
+GENERATION_PREFIX = "gen-"
+
+# Name given to a plain docs directory replaced by the first published generation
+LEGACY_GENERATION = f"{GENERATION_PREFIX}00000000T000000000000-legacy"
+
+
+class GenerationStore:
+    """Directory of complete docs trees, one of which is published at a time.
+
+    Each fetch run writes into a fresh generation directory. Unchanged files
+    are hard-linked from the published generation, so a generation costs
+    only the files that changed. Publishing repoints the ``publish_path``
+    symlink with a single atomic rename, so readers see either the old or
+    the new tree (files and manifest together), never a mix.
+    """
+
+    def __init__(
+        self, root: Path | str, publish_path: Path | str, *, keep: int = 3
+    ) -> None:
+        """Initialize the store.
+
+        Args:
+            root: Directory holding the generation directories.
+            publish_path: Symlink readers use, pointing at the published
+                generation (e.g. the docs directory).
+            keep: Published generations kept, including the current one.
+        """
+        self.root = Path(root)
+        self.publish_path = Path(publish_path)
+        self.keep = max(keep, 1)
+        self.logger = structlog.get_logger("claude_code_fetcher")
+
+    def current(self) -> Path | None:
+        """Get the published generation, if publish_path is a symlink."""
+        if not self.publish_path.is_symlink():
+            return None
+        return self.publish_path.resolve()
+
+    def create(self) -> Path:
+        """Create an empty generation directory for a new run."""
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        generation = self.root / f"{GENERATION_PREFIX}{stamp}-{os.getpid()}"
+        generation.mkdir(parents=True)
+        return generation
+
+    def carry_over(self, generation: Path, filenames: Iterable[str]) -> int:
+        """Link files the run did not rewrite from the published tree.
+
+        Files are hard-linked, falling back to a copy when the published tree
+        is on another filesystem. Files already in the generation or missing
+        from the published tree are left alone.
+
+        Returns:
+            Number of files carried over.
+        """
+        carried = 0
+        for filename in filenames:
+            source = self.publish_path / filename
+            target = generation / filename
+            if target.exists() or not source.is_file():
+                continue
+            try:
+                os.link(source, target)
+            except OSError:
+                shutil.copy2(source, target)
+            carried += 1
+        return carried
+
+    def publish(self, generation: Path) -> None:
+        """Atomically make a generation the published tree.
+
+        A plain directory at publish_path (from before generations were
+        enabled) is first moved into the store; that one-time migration is
+        the only moment readers can find publish_path missing.
+        """
+        if self.publish_path.exists() and not self.publish_path.is_symlink():
+            legacy = self.root / LEGACY_GENERATION
+            shutil.rmtree(legacy, ignore_errors=True)
+            self.publish_path.rename(legacy)
+            self.logger.warning(
+                "docs_dir_migrated_to_generations", moved_to=str(legacy)
+            )
+
+        target = os.path.relpath(generation, self.publish_path.parent)
+        swap = self.publish_path.with_name(f".{self.publish_path.name}.swap")
+        swap.unlink(missing_ok=True)
+        swap.symlink_to(target, target_is_directory=True)
+        swap.replace(self.publish_path)
+        self.logger.info("generation_published", generation=generation.name)
+
+    def discard(self, generation: Path) -> None:
+        """Delete an unpublished generation."""
+        shutil.rmtree(generation, ignore_errors=True)
+
+    def collect_garbage(self) -> list[Path]:
+        """Delete generations older than the ``keep`` most recent published ones.
+
+        Generations newer than the published one (runs still in progress or
+        waiting to be resumed) are never deleted.
+
+        Returns:
+            The deleted generation directories.
+        """
+        current = self.current()
+        if current is None or not self.root.is_dir():
+            return []
+
+        older = sorted(
+            path
+            for path in self.root.iterdir()
+            if path.is_dir()
+            and path.name.startswith(GENERATION_PREFIX)
+            and path.name < current.name
+        )
+        removed = older[: max(len(older) - (self.keep - 1), 0)]
+        for path in removed:
+            shutil.rmtree(path, ignore_errors=True)
+        if removed:
+            self.logger.info("generations_collected", removed=len(removed))
+        return removed
+
+    def __repr__(self) -> str:
+        return f"GenerationStore(root={self.root}, publish_path={self.publish_path})"
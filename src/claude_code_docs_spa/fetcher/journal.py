@@ -0,0 +1,114 @@
+"""Checkpoint journal for resumable documentation fetch runs."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+# Name of the journal file inside the fetcher cache directory
+JOURNAL_FILENAME = "fetch_journal.jsonl"
+
+
+class RunJournal:
+    """Append-only JSON Lines log of the pages completed by a fetch run.
+
+    The first line is a header describing the run; every following line is
+    one completed page with its manifest entry. Each record is flushed and
+    fsynced as soon as it is written, so an interrupted run (Ctrl+C, CI
+    timeout, crash) loses at most the pages that were still in flight. A
+    truncated last line is ignored when the journal is read back.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        """Initialize the journal.
+
+        Args:
+            path: Journal file. Created when the run starts.
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._file: Any = None
+
+    def load(self) -> tuple[dict[str, Any], dict[str, tuple[str, dict[str, Any]]]]:
+        """Read back the journal of an interrupted run.
+
+        Returns:
+            Tuple of (header, completed) where completed maps each page label
+            to its (filename, manifest_entry). Both are empty when there is no
+            readable journal.
+        """
+        header: dict[str, Any] = {}
+        completed: dict[str, tuple[str, dict[str, Any]]] = {}
+        try:
+            lines = self.path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            return header, completed
+
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Partially written record from the interrupted run
+                continue
+            if "header" in record:
+                header = record["header"]
+            elif {"page", "filename", "entry"} <= record.keys():
+                completed[record["page"]] = (record["filename"], record["entry"])
+        return header, completed
+
+    def start(self, header: dict[str, Any], *, append: bool = False) -> None:
+        """Open the journal for a run.
+
+        Args:
+            header: Run description written as the first record.
+            append: Keep the records already in the journal (when resuming)
+                instead of starting a new one.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            if append:
+                self._drop_partial_record()
+            self._file = self.path.open("a" if append else "w", encoding="utf-8")
+            if not append:
+                self._write({"header": header})
+
+    def _drop_partial_record(self) -> None:
+        """Cut off a partially written last record before appending to it."""
+        try:
+            with self.path.open("r+b") as f:
+                data = f.read()
+                end = data.rfind(b"\n") + 1
+                if end < len(data):
+                    f.truncate(end)
+        except FileNotFoundError:
+            pass
+
+    def record(self, page: str, filename: str, entry: dict[str, Any]) -> None:
+        """Checkpoint one completed page."""
+        with self._lock:
+            if self._file is not None:
+                self._write({"page": page, "filename": filename, "entry": entry})
+
+    def _write(self, record: dict[str, Any]) -> None:
+        """Durably append one record. Caller must hold the lock."""
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        """Close the journal, keeping it on disk for a later resume."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def discard(self) -> None:
+        """Close and delete the journal once its run has completed."""
+        self.close()
+        self.path.unlink(missing_ok=True)
+
+    def __repr__(self) -> str:
+        return f"RunJournal(path={self.path})"
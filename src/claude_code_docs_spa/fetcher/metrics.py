@@ -0,0 +1,261 @@
+"""Per-request timings and run metrics for the documentation fetcher."""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import math
+import os
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+from typing import Any
+
+# Phases timed by a fetch run. Validation and writes happen inside fetching
+# and are summed over every worker, so they can exceed its wall time;
+# indexing happens inside cleanup.
+PHASES = ("discovery", "fetching", "validation", "writes", "cleanup", "indexing")
+
+# Quantiles reported for request latencies
+QUANTILES = (50, 95, 99)
+
+# Prefix of every metric in the Prometheus textfile
+PROMETHEUS_PREFIX = "claude_code_docs_fetch"
+
+
+def percentile(values: Sequence[float], q: float) -> float | None:
+    """Get the q-th percentile of values, interpolating between ranks.
+
+    Returns:
+        The percentile, or None when there are no values.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _distribution(values: Sequence[float]) -> dict[str, float | None]:
+    """Summarize latencies as rounded percentiles and maximum."""
+    summary: dict[str, float | None] = {}
+    for q in QUANTILES:
+        value = percentile(values, q)
+        summary[f"p{q}"] = round(value, 4) if value is not None else None
+    summary["max"] = round(max(values), 4) if values else None
+    return summary
+
+
+class RunMetrics:
+    """Thread-safe timings of one fetch run.
+
+    Every request is recorded with the time it waited for the rate limiter,
+    its time to first byte (response headers, including connection setup
+    when a new connection was opened) and its total time until the body was
+    read. Together with retry back-off sleeps and phase timings this tells
+    slow origins apart from the fetcher's own pacing.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty metrics."""
+        self._requests: list[dict[str, Any]] = []
+        self._pending: dict[int, dict[str, float]] = {}
+        self._phases: dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self._sleeps = {"rate_limit": 0.0, "retry_backoff": 0.0}
+        self._retries = {"throttled": 0, "failed": 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def start_request(rate_limit_wait: float, started: float) -> dict[str, float]:
+        """Build the timing of a request whose response headers just arrived.
+
+        Args:
+            rate_limit_wait: Seconds the request waited for the rate limiter.
+            started: time.monotonic() when the request was sent.
+        """
+        return {
+            "started": started,
+            "rate_limit_wait": rate_limit_wait,
+            "ttfb": time.monotonic() - started,
+        }
+
+    def hold(self, response: object, timing: dict[str, float]) -> None:
+        """Keep the timing of a streamed response until its body is read."""
+        with self._lock:
+            self._pending[id(response)] = timing
+
+    def release(self, response: object) -> dict[str, float] | None:
+        """Take back the timing held for a streamed response."""
+        with self._lock:
+            return self._pending.pop(id(response), None)
+
+    def record_request(
+        self, transfer: dict[str, Any], timing: dict[str, float] | None
+    ) -> None:
+        """Record a completed request.
+
+        Args:
+            transfer: Its TransferLog record (url, status, bytes, cache).
+            timing: Its timing from start_request, or None when it was served
+                from the response cache without a request.
+        """
+        record = dict(transfer)
+        if timing is not None:
+            record["rate_limit_wait"] = round(timing["rate_limit_wait"], 4)
+            record["ttfb"] = round(timing["ttfb"], 4)
+            record["total"] = round(time.monotonic() - timing["started"], 4)
+        with self._lock:
+            self._requests.append(record)
+            self._sleeps["rate_limit"] += record.get("rate_limit_wait", 0.0)
+
+    def record_retry(self, reason: str, backoff: float = 0.0) -> None:
+        """Count a retried request and the back-off slept before it.
+
+        Args:
+            reason: "throttled" (429) or "failed" (network or HTTP error).
+            backoff: Seconds slept before the retry.
+        """
+        with self._lock:
+            self._retries[reason] = self._retries.get(reason, 0) + 1
+            self._sleeps["retry_backoff"] += backoff
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Add the time spent in the with block to a phase."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            with self._lock:
+                self._phases[name] = self._phases.get(name, 0.0) + elapsed
+
+    def requests(self) -> list[dict[str, Any]]:
+        """Get the record of every request so far."""
+        with self._lock:
+            return list(self._requests)
+
+    def latency_percentile(self, q: float, key: str = "total") -> float | None:
+        """Get the q-th percentile of a request timing recorded so far.
+
+        Returns:
+            The percentile, or None before the first network request.
+        """
+        with self._lock:
+            values = [r[key] for r in self._requests if key in r]
+        return percentile(values, q)
+
+    def summary(self) -> dict[str, Any]:
+        """Aggregate the run's metrics for fetch_metadata."""
+        with self._lock:
+            records = list(self._requests)
+            phases = dict(self._phases)
+            sleeps = dict(self._sleeps)
+            retries = dict(self._retries)
+
+        timed = [r for r in records if "total" in r]
+        return {
+            "requests": len(records),
+            "network_requests": len(timed),
+            "status_codes": dict(
+                sorted(Counter(str(r["status"]) for r in records).items())
+            ),
+            "retries": retries,
+            "latency_seconds": {
+                "ttfb": _distribution([r["ttfb"] for r in timed]),
+                "total": _distribution([r["total"] for r in timed]),
+            },
+            "time_seconds": {
+                "network": round(sum(r["total"] for r in timed), 4),
+                "rate_limit_sleep": round(sleeps["rate_limit"], 4),
+                "retry_backoff_sleep": round(sleeps["retry_backoff"], 4),
+            },
+            "phases_seconds": {name: round(value, 4) for name, value in phases.items()},
+            "wire_bytes": sum(r.get("wire_bytes") or 0 for r in records),
+            "decoded_bytes": sum(r.get("decoded_bytes") or 0 for r in records),
+        }
+
+    def to_prometheus(self, summary: dict[str, Any] | None = None) -> str:
+        """Render the run summary in the Prometheus text exposition format."""
+        summary = summary or self.summary()
+        with self._lock:
+            timed = [r for r in self._requests if "total" in r]
+
+        lines: list[str] = []
+
+        def metric(name: str, kind: str, help_text: str) -> str:
+            full_name = f"{PROMETHEUS_PREFIX}_{name}"
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            return full_name
+
+        for key, help_text in (
+            ("ttfb", "Time to first byte of fetch requests."),
+            ("total", "Total time of fetch requests, body included."),
+        ):
+            name = metric(f"request_{key}_seconds", "summary", help_text)
+            values = [r[key] for r in timed]
+            for q in QUANTILES:
+                value = percentile(values, q)
+                lines.append(
+                    f'{name}{{quantile="{q / 100}"}} '
+                    f"{value if value is not None else 'NaN'}"
+                )
+            lines.append(f"{name}_sum {sum(values)}")
+            lines.append(f"{name}_count {len(values)}")
+
+        name = metric("responses", "gauge", "Responses of the last run by status.")
+        for status, count in summary["status_codes"].items():
+            lines.append(f'{name}{{status="{status}"}} {count}')
+
+        name = metric("retries", "gauge", "Retried requests of the last run.")
+        for reason, count in summary["retries"].items():
+            lines.append(f'{name}{{reason="{reason}"}} {count}')
+
+        name = metric("time_seconds", "gauge", "Time spent by activity.")
+        for activity, seconds in summary["time_seconds"].items():
+            lines.append(f'{name}{{activity="{activity}"}} {seconds}')
+
+        name = metric("phase_seconds", "gauge", "Time spent in each run phase.")
+        for phase, seconds in summary["phases_seconds"].items():
+            lines.append(f'{name}{{phase="{phase}"}} {seconds}')
+
+        name = metric("bytes", "gauge", "Body bytes transferred by the last run.")
+        lines.append(f'{name}{{encoding="wire"}} {summary["wire_bytes"]}')
+        lines.append(f'{name}{{encoding="decoded"}} {summary["decoded_bytes"]}')
+
+        name = metric(
+            "last_run_timestamp_seconds", "gauge", "When the last run finished."
+        )
+        lines.append(f"{name} {time.time()}")
+        return "\n".join(lines) + "\n"
+
+    def to_json_lines(self, summary: dict[str, Any] | None = None) -> str:
+        """Render one JSON line per request followed by the run summary."""
+        summary = summary or self.summary()
+        lines = [
+            json.dumps({"type": "request", **record}, ensure_ascii=False)
+            for record in self.requests()
+        ]
+        lines.append(json.dumps({"type": "run", **summary}, ensure_ascii=False))
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Path, summary: dict[str, Any] | None = None) -> None:
+        """Atomically write the metrics to a file.
+
+        A ``.prom`` file gets the Prometheus text format (for the node
+        exporter textfile collector); any other file gets JSON lines.
+        """
+        text = (
+            self.to_prometheus(summary)
+            if path.suffix == ".prom"
+            else self.to_json_lines(summary)
+        )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(text, encoding="utf-8")
+        tmp_path.replace(path)
@@ -0,0 +1,236 @@
+"""Rate limiting primitives for the Claude Code documentation fetcher."""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+# Responses slower than this (in seconds) stop the adaptive rate from growing
+DEFAULT_TARGET_LATENCY = 2.0
+
+
+def parse_retry_after(value: str | None, now: datetime | None = None) -> float | None:
+    """Parse a Retry-After header value.
+
+    Args:
+        value: Header value, either delta-seconds ("120") or an HTTP-date
+            ("Wed, 21 Oct 2015 07:28:00 GMT").
+        now: Current time, for HTTP-dates. Defaults to the current UTC time.
+
+    Returns:
+        Seconds to wait (never negative), or None if the value is missing or
+        cannot be parsed.
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=UTC)
+    now = now or datetime.now(UTC)
+    return max(0.0, (retry_at - now).total_seconds())
+
+
+class TokenBucket:
+    """Thread-safe token bucket that paces request starts to a steady rate."""
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        """Initialize the token bucket.
+
+        Args:
+            rate: Tokens added per second. Zero or negative disables limiting.
+            capacity: Maximum number of tokens that can accumulate (burst size).
+        """
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self, max_wait: float) -> float | None:
+        """Take one token, returning how long the caller must wait for it.
+
+        Returns None, without taking the token, if that wait exceeds max_wait.
+        """
+        with self._lock:
+            now = time.monotonic()
+            paused = max(0.0, self._paused_until - now)
+            if self.rate <= 0:
+                return paused if paused <= max_wait else None
+
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            wait = max(paused, (1.0 - self._tokens) / self.rate)
+            if wait > max_wait:
+                return None
+            self._tokens -= 1.0
+            return wait
+
+    def acquire(self, max_wait: float = math.inf) -> float | None:
+        """Block until a token is available.
+
+        Args:
+            max_wait: Longest wait accepted, in seconds.
+
+        Returns:
+            Number of seconds spent waiting, or None, without waiting or
+            taking a token, if the wait (e.g. a Retry-After pause) would be
+            longer than max_wait.
+        """
+        wait = self._reserve(max_wait)
+        if wait is not None and wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every request start for the given number of seconds."""
+        with self._lock:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + seconds)
+            # Don't let tokens accumulated before the pause burst out after it
+            self._tokens = min(self._tokens, 1.0)
+
+
+class AdaptiveTokenBucket(TokenBucket):
+    """Token bucket whose rate follows the health of the server (AIMD).
+
+    Healthy, fast responses raise the rate additively up to max_rate; 429 and
+    5xx responses cut it multiplicatively down to min_rate.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float = 1.0,
+        *,
+        min_rate: float = 0.2,
+        max_rate: float | None = None,
+        increase: float | None = None,
+        decrease_factor: float = 0.5,
+        target_latency: float = DEFAULT_TARGET_LATENCY,
+    ) -> None:
+        """Initialize the adaptive token bucket.
+
+        Args:
+            rate: Initial tokens added per second. Zero or negative disables
+                limiting, and adaptation with it.
+            capacity: Maximum number of tokens that can accumulate (burst size).
+            min_rate: Floor of the rate after back-offs.
+            max_rate: Ceiling of the rate. Defaults to four times the initial
+                rate.
+            increase: Rate added after each healthy response. Defaults to a
+                tenth of the initial rate.
+            decrease_factor: Factor applied to the rate on 429 / 5xx.
+            target_latency: Responses slower than this (in seconds) hold the
+                rate instead of raising it.
+        """
+        super().__init__(rate, capacity)
+        self.min_rate = min(min_rate, rate) if rate > 0 else min_rate
+        self.max_rate = max_rate if max_rate is not None else rate * 4
+        self.increase = increase if increase is not None else rate / 10
+        self.decrease_factor = decrease_factor
+        self.target_latency = target_latency
+
+    def record(self, status_code: int, latency: float) -> None:
+        """Adjust the rate from the outcome of one request.
+
+        Args:
+            status_code: HTTP status of the response.
+            latency: Seconds between sending the request and the response.
+        """
+        with self._lock:
+            if self.rate <= 0:
+                return
+            if status_code == 429 or status_code >= 500:
+                self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            elif latency <= self.target_latency:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+
+
+class HostRateLimiter:
+    """Keeps one token bucket per origin host."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float = 1.0,
+        *,
+        adaptive: bool = False,
+        min_rate: float = 0.2,
+        max_rate: float | None = None,
+    ) -> None:
+        """Initialize the per-host limiter.
+
+        Args:
+            rate: Requests per second allowed for each host (initial rate when
+                adaptive).
+            capacity: Burst size for each host.
+            adaptive: Use AdaptiveTokenBucket so each host's rate follows its
+                response statuses and latency.
+            min_rate: Lowest adaptive rate per host.
+            max_rate: Highest adaptive rate per host. Defaults to four times
+                the initial rate.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.adaptive = adaptive
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket_for(self, url: str) -> TokenBucket:
+        """Get (or create) the token bucket for the host of a URL."""
+        host = urlparse(url).netloc
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                if self.adaptive:
+                    bucket = AdaptiveTokenBucket(
+                        self.rate,
+                        self.capacity,
+                        min_rate=self.min_rate,
+                        max_rate=self.max_rate,
+                    )
+                else:
+                    bucket = TokenBucket(self.rate, self.capacity)
+                self._buckets[host] = bucket
+            return bucket
+
+    def acquire(self, url: str, max_wait: float = math.inf) -> float | None:
+        """Block until a request to the host of ``url`` may start.
+
+        Returns:
+            Number of seconds spent waiting, or None if that would have taken
+            longer than max_wait; see TokenBucket.acquire.
+        """
+        return self.bucket_for(url).acquire(max_wait)
+
+    def record(self, url: str, status_code: int, latency: float) -> None:
+        """Feed the outcome of a request to the host's bucket, if adaptive."""
+        bucket = self.bucket_for(url)
+        if isinstance(bucket, AdaptiveTokenBucket):
+            bucket.record(status_code, latency)
+
+    def pause(self, url: str, seconds: float) -> None:
+        """Hold back every request to the host of ``url`` (e.g. Retry-After)."""
+        self.bucket_for(url).pause(seconds)
+
+    def current_rates(self) -> dict[str, float]:
+        """Get the current requests-per-second of every host seen so far."""
+        with self._lock:
+            return {host: bucket.rate for host, bucket in self._buckets.items()}
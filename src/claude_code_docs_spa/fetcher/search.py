@@ -0,0 +1,132 @@
+"""Inverted index of the documentation for the /docs search command.
+
+The index maps every token to the sections (the text under one markdown
+heading) that contain it, with its frequency in each, plus the length of
+every section, which is all BM25 needs. The helper script scores a query
+from the index alone and only opens the files of the top results to cut
+their snippets, so a search never scans the whole mirror.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import unicodedata
+from collections import Counter
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+# Name of the index file, written beside the pages and the manifest
+SEARCH_INDEX_FILE = "search_index.json"
+
+# Format of the index file; readers ignore an index with another version
+SEARCH_INDEX_VERSION = 1
+
+# Words of two or more letters or digits. Underscores, dots and hyphens split
+# words, so CLAUDE_CODE_USE_BEDROCK and settings.json are found by their parts.
+TOKEN_PATTERN = r"[^\W_]{2,}"  # noqa: S105
+
+# BM25 parameters (term frequency saturation and length normalization)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# A heading's words count this many times towards its section's frequencies
+HEADING_WEIGHT = 3
+
+_TOKEN_RE = re.compile(TOKEN_PATTERN)
+_HEADING_RE = re.compile(r"^#{1,6}\s+(.+?)\s*#*\s*$")
+_FENCE_RE = re.compile(r"^\s*(```|~~~)")
+
+
+def fold(text: str) -> str:
+    """Case-fold text and strip its accents ("Configuración" -> "configuracion")."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into the tokens stored in the index."""
+    return _TOKEN_RE.findall(fold(text))
+
+
+def split_sections(text: str) -> list[tuple[str, int, int]]:
+    """Split markdown into the sections under each heading.
+
+    Headings inside fenced code blocks are not section breaks.
+
+    Returns:
+        Tuples of (heading, first line, end line), with 0-based line numbers
+        and the end excluded. Text before the first heading has an empty
+        heading.
+    """
+    lines = text.splitlines()
+    sections: list[tuple[str, int, int]] = []
+    heading, start = "", 0
+    in_fence = False
+    for number, line in enumerate(lines):
+        if _FENCE_RE.match(line):
+            in_fence = not in_fence
+            continue
+        match = None if in_fence else _HEADING_RE.match(line)
+        if match is None:
+            continue
+        if number > start:
+            sections.append((heading, start, number))
+        heading, start = match.group(1), number
+    if len(lines) > start:
+        sections.append((heading, start, len(lines)))
+    return sections
+
+
+def build_search_index(docs_dir: Path, filenames: Iterable[str]) -> dict[str, Any]:
+    """Index the sections of the markdown files in a docs directory.
+
+    Args:
+        docs_dir: Directory holding the files.
+        filenames: Files to index; anything but ``.md`` files is skipped.
+
+    Returns:
+        The index: the indexed files, one ``[file, heading, first line, end
+        line, length]`` row per section, the average section length and,
+        for every token, a flat ``[section, frequency, ...]`` postings list.
+    """
+    files: list[str] = []
+    sections: list[list[Any]] = []
+    postings: dict[str, list[int]] = {}
+    total_length = 0
+
+    for filename in sorted(name for name in filenames if name.endswith(".md")):
+        text = (docs_dir / filename).read_text(encoding="utf-8")
+        lines = text.splitlines()
+        file_number = len(files)
+        files.append(filename)
+        for heading, start, end in split_sections(text):
+            body_start = start + 1 if heading else start
+            counts = Counter(tokenize("\n".join(lines[body_start:end])))
+            for token in tokenize(heading):
+                counts[token] += HEADING_WEIGHT
+            length = sum(counts.values())
+            if not length:
+                continue
+            section = len(sections)
+            sections.append([file_number, heading, start, end, length])
+            total_length += length
+            for token, frequency in counts.items():
+                postings.setdefault(token, []).extend((section, frequency))
+
+    return {
+        "version": SEARCH_INDEX_VERSION,
+        "token_pattern": TOKEN_PATTERN,
+        "k1": BM25_K1,
+        "b": BM25_B,
+        "files": files,
+        "sections": sections,
+        "average_length": round(total_length / len(sections), 3) if sections else 0,
+        "postings": dict(sorted(postings.items())),
+    }
+
+
+def encode_search_index(index: dict[str, Any]) -> bytes:
+    """Serialize an index as compact JSON."""
+    return json.dumps(index, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
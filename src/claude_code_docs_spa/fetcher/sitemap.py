@@ -0,0 +1,77 @@
+"""Streaming sitemap parser for the Claude Code documentation fetcher."""
+
+from __future__ import annotations
+
+import xml.etree.ElementTree as ET
+from collections.abc import Generator, Iterable
+
+# Size of the chunks read from the network or the on-disk cache
+SITEMAP_CHUNK_SIZE = 64 * 1024
+
+# Element local names that carry a <loc> in <urlset> and <sitemapindex>
+_ENTRY_TAGS = frozenset({"url", "sitemap"})
+
+
+def _local_name(tag: str) -> str:
+    """Strip the XML namespace from an element tag."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _child_text(elem: ET.Element, name: str) -> str | None:
+    """Get the stripped text of the first child with the given local name."""
+    for child in elem:
+        if _local_name(child.tag) == name:
+            return child.text.strip() if child.text else None
+    return None
+
+
+def iter_sitemap_entries(
+    chunks: Iterable[bytes],
+) -> Generator[tuple[str, str, str | None], None, None]:
+    """Incrementally parse sitemap XML as it arrives.
+
+    Works for both ``<urlset>`` and ``<sitemapindex>`` documents, with or
+    without the sitemaps.org namespace. Each entry is released as soon as it
+    has been yielded, so memory stays flat however large the sitemap is, and
+    callers can stop consuming early.
+
+    Args:
+        chunks: Raw XML byte chunks, e.g. from ``Response.iter_content``.
+
+    Yields:
+        Tuples of (kind, loc, lastmod) where kind is "url" for pages and
+        "sitemap" for child sitemaps of an index.
+
+    Raises:
+        xml.etree.ElementTree.ParseError: If the XML is malformed.
+    """
+    parser: ET.XMLPullParser = ET.XMLPullParser(events=("start", "end"))
+    root: ET.Element | None = None
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        parser.feed(chunk)
+        for item in parser.read_events():
+            # Only start/end events were requested, which carry elements
+            event, elem = item[0], item[-1]
+            if not isinstance(elem, ET.Element):
+                continue
+            if event == "start":
+                if root is None:
+                    root = elem
+                continue
+
+            kind = _local_name(elem.tag)
+            if kind not in _ENTRY_TAGS:
+                continue
+
+            loc = _child_text(elem, "loc")
+            lastmod = _child_text(elem, "lastmod")
+            # Drop finished entries so the tree never grows past one element
+            if root is not None:
+                root.clear()
+            if loc:
+                yield kind, loc, lastmod
+
+    parser.close()
@@ -0,0 +1,322 @@
+"""HTTP transport (sessions and connection pools) for the documentation fetcher."""
+
+from __future__ import annotations
+
+import importlib.util
+import io
+import threading
+from typing import TYPE_CHECKING, Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.request import ACCEPT_ENCODING
+
+if TYPE_CHECKING:
+    import httpx
+
+    from .config import FetcherConfig
+
+# Optional codec packages, in order of preference, for each content coding
+_CODEC_MODULES = {
+    "zstd": ("zstandard",),
+    "br": ("brotli", "brotlicffi"),
+}
+
+
+def supported_encodings(*, http2: bool = False) -> list[str]:
+    """List the content codings the selected transport can decode.
+
+    gzip and deflate are always available through the standard library's
+    zlib. br and zstd are only offered when their codec is installed, so a
+    missing package falls back to gzip instead of undecodable responses.
+
+    Args:
+        http2: Whether the httpx HTTP/2 transport is used.
+
+    Returns:
+        Content codings for the Accept-Encoding header, best first.
+    """
+    if http2:
+        available = {"gzip", "deflate"}
+        for coding, modules in _CODEC_MODULES.items():
+            if any(importlib.util.find_spec(module) for module in modules):
+                available.add(coding)
+    else:
+        # urllib3 advertises exactly the codings it can decode
+        available = {coding.strip() for coding in ACCEPT_ENCODING.split(",")}
+
+    return [
+        coding for coding in ("zstd", "br", "gzip", "deflate") if coding in available
+    ]
+
+
+def wire_size(response: requests.Response) -> int | None:
+    """Get the number of body bytes a response took on the wire.
+
+    Uses the byte count of the underlying stream, which is taken before any
+    content decoding, and falls back to Content-Length.
+
+    Returns:
+        Compressed body size, or None when it cannot be determined.
+    """
+    tell = getattr(response.raw, "tell", None)
+    if callable(tell):
+        try:
+            size = tell()
+        except (OSError, ValueError):
+            size = None
+        if isinstance(size, int) and size > 0:
+            return size
+
+    content_length = response.headers.get("Content-Length")
+    if isinstance(content_length, str) and content_length.isdigit():
+        return int(content_length)
+    return None
+
+
+class TransferLog:
+    """Thread-safe record of the bytes transferred by each request of a run."""
+
+    def __init__(self) -> None:
+        """Initialize an empty log."""
+        self._records: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        url: str,
+        response: requests.Response,
+        decoded_bytes: int,
+        wire_bytes: int | None = None,
+    ) -> dict[str, Any]:
+        """Record one completed request.
+
+        Args:
+            url: Requested URL.
+            response: Its response, once the body has been read.
+            decoded_bytes: Body size after content decoding.
+            wire_bytes: Body size on the wire. Measured from the response
+                when omitted.
+
+        Returns:
+            The record added to the log.
+        """
+        cache_status = response.headers.get("X-Cache")
+        if wire_bytes is None:
+            # Cache hits and 304 replies carry no body on the wire
+            wire_bytes = (
+                0
+                if cache_status or response.status_code == 304
+                else wire_size(response)
+            )
+
+        record = {
+            "url": url,
+            "status": response.status_code,
+            "content_encoding": response.headers.get("Content-Encoding", "identity"),
+            "wire_bytes": wire_bytes,
+            "decoded_bytes": decoded_bytes,
+        }
+        if cache_status:
+            record["cache"] = cache_status
+        with self._lock:
+            self._records.append(record)
+        return record
+
+    def summary(self) -> dict[str, Any]:
+        """Summarize the run's transfers for fetch_metadata."""
+        with self._lock:
+            records = list(self._records)
+
+        measured = [r for r in records if r["wire_bytes"] is not None]
+        wire_bytes = sum(r["wire_bytes"] for r in measured)
+        decoded_bytes = sum(r["decoded_bytes"] for r in measured)
+        downloaded = [r for r in measured if r["wire_bytes"]]
+        downloaded_wire = sum(r["wire_bytes"] for r in downloaded)
+        downloaded_decoded = sum(r["decoded_bytes"] for r in downloaded)
+        return {
+            "requests": len(records),
+            "wire_bytes": wire_bytes,
+            "decoded_bytes": decoded_bytes,
+            "compression_ratio": (
+                round(downloaded_decoded / downloaded_wire, 2)
+                if downloaded_wire
+                else None
+            ),
+            "per_request": records,
+        }
+
+
+def create_session(config: FetcherConfig) -> requests.Session:
+    """Create the HTTP session shared by every request of a fetch run.
+
+    Args:
+        config: Fetcher configuration.
+
+    Returns:
+        An HTTP2Session when config.http2 is set, otherwise a requests.Session
+        whose connection pool is sized for config.pool_maxsize concurrent
+        requests per host.
+    """
+    if config.http2:
+        return HTTP2Session(config)
+
+    session = requests.Session()
+    # Retries are handled by the fetcher, which knows about 304 and 429
+    adapter = HTTPAdapter(pool_maxsize=config.pool_maxsize, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Connection"] = "keep-alive"
+    return session
+
+
+class _StreamedBody:
+    """File-like view of an httpx body, as requests expects in ``raw``."""
+
+    def __init__(self, response: httpx.Response) -> None:
+        self._response = response
+        self._chunks = response.iter_bytes()
+        self._buffer = b""
+
+    def read(self, amt: int | None = None) -> bytes:
+        """Read up to ``amt`` bytes (everything when None)."""
+        while amt is None or len(self._buffer) < amt:
+            try:
+                self._buffer += next(self._chunks)
+            except StopIteration:
+                break
+        if amt is None:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:amt], self._buffer[amt:]
+        return data
+
+    def tell(self) -> int:
+        """Get the number of (still encoded) bytes downloaded so far."""
+        return self._response.num_bytes_downloaded
+
+    def close(self) -> None:
+        """Close the underlying stream, returning the connection to the pool."""
+        self._response.close()
+
+    def release_conn(self) -> None:
+        """Release the connection (requests calls this on Response.close())."""
+        self.close()
+
+
+class _BufferedBody(io.BytesIO):
+    """Body httpx already read, replayed from memory like a cached one."""
+
+    def __init__(self, response: httpx.Response) -> None:
+        super().__init__(response.content)
+        self._wire_bytes = response.num_bytes_downloaded
+
+    def tell(self) -> int:
+        """Get the number of (still encoded) bytes downloaded for the body."""
+        return self._wire_bytes
+
+
+class HTTP2Session(requests.Session):
+    """requests.Session that sends its requests over HTTP/2 with httpx.
+
+    Requests to a host are multiplexed over one connection. Responses are
+    converted to requests.Response objects and transport errors to requests
+    exceptions, so retry and validation code is shared with the default
+    transport.
+
+    Requires the optional ``httpx[http2]`` dependency.
+    """
+
+    def __init__(self, config: FetcherConfig) -> None:
+        """Initialize the session.
+
+        Args:
+            config: Fetcher configuration.
+
+        Raises:
+            ImportError: If httpx or its HTTP/2 support (h2) is not installed.
+        """
+        try:
+            import h2  # noqa: F401
+            import httpx
+        except ImportError as e:
+            raise ImportError(
+                "HTTP/2 support requires httpx with the http2 extra: "
+                "pip install 'httpx[http2]'"
+            ) from e
+
+        super().__init__()
+        self._httpx = httpx
+        self._client = httpx.Client(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=config.pool_maxsize,
+                max_keepalive_connections=config.pool_maxsize,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+        )
+
+    def request(  # type: ignore[override]
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        timeout: float | None = None,
+        allow_redirects: bool = True,
+        stream: bool = False,
+    ) -> requests.Response:
+        """Send a request.
+
+        Args:
+            method: HTTP method.
+            url: URL to fetch.
+            headers: Request headers.
+            timeout: Timeout in seconds.
+            allow_redirects: Follow redirects.
+            stream: Return before the body is read; it is then read through
+                Response.iter_content.
+
+        Returns:
+            The response, as a requests.Response.
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails.
+        """
+        merged: dict[str, str] = {
+            name: value if isinstance(value, str) else value.decode("latin-1")
+            for name, value in self.headers.items()
+        }
+        merged.update(headers or {})
+        request = self._client.build_request(
+            method, url, headers=merged, timeout=timeout
+        )
+        try:
+            response = self._client.send(
+                request, stream=stream, follow_redirects=allow_redirects
+            )
+        except self._httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e)) from e
+        except self._httpx.HTTPError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+        return self._to_requests_response(response, stream=stream)
+
+    @staticmethod
+    def _to_requests_response(
+        response: httpx.Response, *, stream: bool
+    ) -> requests.Response:
+        """Convert an httpx response to a requests.Response."""
+        converted = requests.Response()
+        converted.status_code = response.status_code
+        converted.reason = response.reason_phrase
+        converted.url = str(response.url)
+        converted.headers = CaseInsensitiveDict(response.headers)
+        converted.encoding = response.encoding
+        converted.raw = _StreamedBody(response) if stream else _BufferedBody(response)
+        return converted
+
+    def close(self) -> None:
+        """Close every pooled connection."""
+        self._client.close()
+        super().close()
@@ -2,8 +2,15 @@
 
 from __future__ import annotations
 
-from .config import InstallerConfig
+from .config import HOOK_SCOPES, InstallerConfig
 from .core import ClaudeCodeInstaller
 from .helper import HelperScriptGenerator
+from .update import ManifestUpdater
 
-__all__ = ["ClaudeCodeInstaller", "InstallerConfig", "HelperScriptGenerator"]
+__all__ = [
+    "HOOK_SCOPES",
+    "ClaudeCodeInstaller",
+    "InstallerConfig",
+    "HelperScriptGenerator",
+    "ManifestUpdater",
+]
@@ -5,6 +5,13 @@ from __future__ import annotations
 import sys
 from pathlib import Path
 
+# Ways the installed mirror can be updated
+UPDATE_MODES = ("manifest", "git")
+
+# When Claude Code runs the update hook: once per session, before reads of
+# the docs mirror, or before every Read tool call
+HOOK_SCOPES = ("session", "docs", "read")
+
 
 class InstallerConfig:
     """Configuration for the Claude Code documentation installer."""
@@ -19,6 +26,10 @@ class InstallerConfig:
         settings_file: Path | str | None = None,
         helper_script_name: str = "claude-docs-helper.py",
         command_file_name: str = "docs.md",
+        hook_module_name: str = "claude_docs_hook",
+        hook_scope: str = "docs",
+        update_ttl_seconds: int = 3600,
+        update_mode: str = "manifest",
     ) -> None:
         """Initialize installer configuration.
 
@@ -30,6 +41,17 @@ class InstallerConfig:
             settings_file: Path to Claude Code settings file. Defaults to ~/.claude/settings.json.
             helper_script_name: Name of the helper script file.
             command_file_name: Name of the command file.
+            hook_module_name: Module name of the update hook script.
+            hook_scope: When the update hook runs, one of HOOK_SCOPES:
+                "session" on SessionStart, "docs" before Read calls whose
+                payload points into the docs mirror (other reads exit at
+                once), "read" before every Read call. Defaults to "docs",
+                which keeps the Read trigger of older installs, narrowed.
+            update_ttl_seconds: Seconds between two update checks of the
+                installed helper, which runs them in the background.
+            update_mode: How the installed mirror is updated: "manifest"
+                downloads only the files whose hash changed in the published
+                manifest, "git" pulls the repository.
         """
         self.repo_url = repo_url
         self.repo_zip_url = f"{repo_url}/archive/refs/heads/main.zip"
@@ -47,6 +69,10 @@ class InstallerConfig:
         )
         self.helper_script_name = helper_script_name
         self.command_file_name = command_file_name
+        self.hook_module_name = hook_module_name
+        self.hook_scope = hook_scope
+        self.update_ttl_seconds = update_ttl_seconds
+        self.update_mode = update_mode
 
         # Set up encoding for Windows
         if sys.platform == "win32":
@@ -64,11 +90,33 @@ class InstallerConfig:
         if not self.version:
             raise ValueError("Version cannot be empty")
 
+        if self.update_ttl_seconds < 0:
+            raise ValueError("update_ttl_seconds must be non-negative")
+
+        if not self.hook_module_name.isidentifier():
+            raise ValueError(f"Invalid hook module name: {self.hook_module_name}")
+
+        if self.hook_scope not in HOOK_SCOPES:
+            raise ValueError(f"hook_scope must be one of {', '.join(HOOK_SCOPES)}")
+
+        if self.update_mode not in UPDATE_MODES:
+            raise ValueError(f"update_mode must be one of {', '.join(UPDATE_MODES)}")
+
     @property
     def helper_script_path(self) -> Path:
         """Get the path to the helper script."""
         return self.install_dir / self.helper_script_name
 
+    @property
+    def hook_script_path(self) -> Path:
+        """Get the path to the hook script."""
+        return self.install_dir / f"{self.hook_module_name}.py"
+
+    @property
+    def update_stamp_path(self) -> Path:
+        """Get the path to the stamp of the last update check."""
+        return self.install_dir / ".docs-update-stamp"
+
     @property
     def command_file_path(self) -> Path:
         """Get the path to the command file."""
@@ -84,5 +132,15 @@ class InstallerConfig:
         """Get the path to the manifest file."""
         return self.docs_dir / "docs_manifest.json"
 
+    @property
+    def manifest_url(self) -> str:
+        """Get the URL of the manifest published in the repository."""
+        raw_url = self.repo_url.replace(
+            "https://github.com/", "https://raw.githubusercontent.com/", 1
+        )
+        if raw_url == self.repo_url:
+            return f"{self.repo_url}/raw/main/docs/docs_manifest.json"
+        return f"{raw_url}/main/docs/docs_manifest.json"
+
     def __repr__(self) -> str:
         return f"InstallerConfig(repo_url={self.repo_url}, version={self.version}, install_dir={self.install_dir})"
@@ -18,6 +18,10 @@ import structlog
 
 from .config import InstallerConfig
 from .helper import HelperScriptGenerator
+from .update import ManifestUpdater
+
+# Settings events the update hook may have been registered under
+HOOK_EVENTS = ("PreToolUse", "SessionStart")
 
 
 class ClaudeCodeInstaller:
@@ -255,33 +259,12 @@ class ClaudeCodeInstaller:
                 except json.JSONDecodeError:
                     settings = {}
 
-            # Ensure hooks structure exists
-            if "hooks" not in settings:
-                settings["hooks"] = {}
-            if "PreToolUse" not in settings["hooks"]:
-                settings["hooks"]["PreToolUse"] = []
-
-            # Remove old hooks that point to claude-code-docs-spa
-            hooks = settings["hooks"]["PreToolUse"]
-            hooks = [
-                hook
-                for hook in hooks
-                if not isinstance(hook.get("hooks", [{}])[0].get("command", ""), str)
-                or "claude-code-docs-spa" not in hook["hooks"][0]["command"]
-            ]
+            # Remove old hooks, whatever scope they were installed with
+            self._remove_docs_hooks(settings)
 
             # Add new hook
-            new_hook = {
-                "matcher": "Read",
-                "hooks": [
-                    {
-                        "type": "command",
-                        "command": f'python "{self.config.helper_script_path}" hook-check',
-                    }
-                ],
-            }
-            hooks.append(new_hook)
-            settings["hooks"]["PreToolUse"] = hooks
+            event, new_hook = self.helper_generator.generate_hook_settings()
+            settings.setdefault("hooks", {}).setdefault(event, []).append(new_hook)
 
             # Save configuration
             self.config.settings_file.parent.mkdir(parents=True, exist_ok=True)
@@ -293,6 +276,62 @@ class ClaudeCodeInstaller:
             self.print_status(f"ERROR: Failed to configure auto-updates: {e}", "❌")
             raise
 
+    def _is_docs_hook(self, entry: Any) -> bool:
+        """Check whether a settings hook entry runs this mirror's hook or helper.
+
+        A command matches when it is the hook command this version writes,
+        the helper command of older versions, or names the hook module or
+        the helper script together with this install directory. A user hook
+        that merely mentions those file names is left alone.
+        """
+        if not isinstance(entry, dict) or not isinstance(entry.get("hooks"), list):
+            return False
+        known_commands = {
+            self.helper_generator.generate_hook_command(),
+            f'python "{self.config.helper_script_path}" hook-check',
+        }
+        install_dirs = (
+            str(self.config.install_dir),
+            self.config.install_dir.as_posix(),
+        )
+        file_names = (self.config.hook_module_name, self.config.helper_script_name)
+
+        def is_docs_command(command: str) -> bool:
+            return command in known_commands or (
+                any(directory in command for directory in install_dirs)
+                and any(name in command for name in file_names)
+            )
+
+        return any(
+            isinstance(hook, dict)
+            and isinstance(hook.get("command"), str)
+            and is_docs_command(hook["command"])
+            for hook in entry["hooks"]
+        )
+
+    def _remove_docs_hooks(self, settings: dict[str, Any]) -> int:
+        """Remove this mirror's hooks from every event it may use.
+
+        Matches the helper hook of older versions (PreToolUse on every Read)
+        as well as the hook module in any scope.
+
+        Returns:
+            Number of hook entries removed.
+        """
+        hooks = settings.get("hooks")
+        if not isinstance(hooks, dict):
+            return 0
+
+        removed = 0
+        for event in HOOK_EVENTS:
+            entries = hooks.get(event)
+            if not isinstance(entries, list):
+                continue
+            kept = [entry for entry in entries if not self._is_docs_hook(entry)]
+            removed += len(entries) - len(kept)
+            hooks[event] = kept
+        return removed
+
     def show_available_topics(self) -> None:
         """Show available topics."""
         print()
@@ -329,6 +368,7 @@ class ClaudeCodeInstaller:
         # Create helper script
         try:
             helper_path = self.helper_generator.create_helper_script()
+            self.helper_generator.create_hook_script()
             self.print_status("SUCCESS: Helper script created", "✓")
         except Exception as e:
             self.print_status(f"ERROR: Failed to create helper script: {e}", "❌")
@@ -354,7 +394,7 @@ class ClaudeCodeInstaller:
         print("  /docs -t           # Check sync status")
         print("  /docs what's new  # See recent changes")
         print()
-        print("Auto-updates: Enabled")
+        print(f"Auto-updates: Enabled (hook scope: {self.config.hook_scope})")
         print()
 
         self.show_available_topics()
@@ -369,6 +409,45 @@ class ClaudeCodeInstaller:
             "command_file": str(self.config.command_file_path),
         }
 
+    def update(self, force: bool = False) -> dict[str, Any]:
+        """Update the installed documentation from the published manifest.
+
+        Args:
+            force: Compare every file with the manifest even if the manifest
+                did not change since the last update.
+
+        Raises:
+            RuntimeError: If the documentation is not installed.
+        """
+        if not self.config.docs_dir.exists():
+            raise RuntimeError(
+                f"Documentation not installed in {self.config.install_dir}"
+            )
+
+        self.print_status("Checking for documentation updates...", "🔄")
+        result = ManifestUpdater(self.config).update(force=force)
+
+        if result["files_failed"]:
+            self.print_status(
+                f"WARNING: {len(result['files_failed'])} files could not be "
+                "updated; run the update again",
+                "⚠️",
+            )
+        elif result["up_to_date"]:
+            self.print_status("SUCCESS: Documentation is up to date", "✓")
+        else:
+            self.print_status(
+                f"SUCCESS: {len(result['files_updated'])} files updated, "
+                f"{len(result['files_removed'])} removed",
+                "✓",
+            )
+
+        return {
+            "success": not result["files_failed"],
+            "install_dir": str(self.config.install_dir),
+            **result,
+        }
+
     def _safe_remove_file(self, file_path: Path, description: str = "file") -> bool:
         """Safely remove a file with error handling."""
         try:
@@ -498,29 +577,13 @@ class ClaudeCodeInstaller:
                 with open(self.config.settings_file, encoding="utf-8") as f:
                     settings = json.load(f)
 
-                if "hooks" in settings and "PreToolUse" in settings["hooks"]:
-                    hooks = settings["hooks"]["PreToolUse"]
-                    original_count = len(hooks)
-                    hooks = [
-                        hook
-                        for hook in hooks
-                        if not isinstance(
-                            hook.get("hooks", [{}])[0].get("command", ""), str
-                        )
-                        or "claude-code-docs-spa" not in hook["hooks"][0]["command"]
-                    ]
-
-                    if len(hooks) < original_count:
-                        settings["hooks"]["PreToolUse"] = hooks
-                        with open(
-                            self.config.settings_file, "w", encoding="utf-8"
-                        ) as f:
-                            json.dump(settings, f, indent=2)
-                        self.print_status("SUCCESS: Hooks removed", "✓")
-                        results["hooks_removed"] = True
-                    else:
-                        self.print_status("INFO: No hooks to remove", "✓")
-                        results["hooks_removed"] = True
+                if self._remove_docs_hooks(settings):
+                    with open(self.config.settings_file, "w", encoding="utf-8") as f:
+                        json.dump(settings, f, indent=2)
+                    self.print_status("SUCCESS: Hooks removed", "✓")
+                else:
+                    self.print_status("INFO: No hooks to remove", "✓")
+                results["hooks_removed"] = True
             except Exception as e:
                 self.print_status(f"WARNING: Error removing hooks: {e}", "⚠️")
 
@@ -2,6 +2,14 @@
 
 from __future__ import annotations
 
+import json
+import os
+import py_compile
+import shlex
+import subprocess
+from pathlib import Path
+from typing import Any
+
 from .config import InstallerConfig
 
 
@@ -28,6 +36,7 @@ import os
 import sys
 import json
 import subprocess
+import time
 import urllib.request
 from pathlib import Path
 import re
@@ -38,10 +47,31 @@ if sys.platform == "win32":
     sys.stderr.reconfigure(encoding='utf-8', errors='replace')
 
 # Configuración
-DOCS_PATH = Path.home() / ".claude-code-docs-spa"
+DOCS_PATH = Path({str(self.config.install_dir)!r})
 MANIFEST_FILE = DOCS_PATH / "docs" / "docs_manifest.json"
+SEARCH_INDEX_FILE = DOCS_PATH / "docs" / "search_index.json"
 SCRIPT_VERSION = "{self.config.version}"
 
+# Comprobación de actualizaciones en segundo plano, como mucho una vez por TTL
+try:
+    UPDATE_TTL_SECONDS = int(
+        os.environ.get("CLAUDE_DOCS_UPDATE_TTL", "{self.config.update_ttl_seconds}")
+    )
+except ValueError:
+    # Un valor no numérico no debe romper cada llamada a /docs
+    UPDATE_TTL_SECONDS = {self.config.update_ttl_seconds}
+UPDATE_STAMP = DOCS_PATH / ".docs-update-stamp"
+UPDATE_LOCK = DOCS_PATH / ".docs-update.lock"
+# Un bloqueo más antiguo es de una actualización que murió sin liberarlo
+UPDATE_LOCK_STALE_SECONDS = 600
+
+# "manifest" descarga solo los archivos cuyo hash cambió; "git" hace pull
+UPDATE_MODE = os.environ.get("CLAUDE_DOCS_UPDATE_MODE", "{self.config.update_mode}")
+MANIFEST_URL = "{self.config.manifest_url}"
+MANIFEST_ETAG = DOCS_PATH / ".docs-manifest-etag"
+# Archivos cambiados por la última actualización que cambió alguno (/docs -t)
+MANIFEST_CHANGES = DOCS_PATH / ".docs-manifest-changes.json"
+
 '''
 
         content += '''
@@ -60,31 +90,256 @@ def print_doc_header():
         print("BOOK OFFICIAL DOCS: https://docs.anthropic.com/en/docs/claude-code")
     print()
 
+def update_check_due():
+    """Indica si pasó el TTL desde la última comprobación de actualizaciones"""
+    try:
+        checked_at = UPDATE_STAMP.stat().st_mtime
+    except OSError:
+        return True
+    return time.time() - checked_at >= UPDATE_TTL_SECONDS
+
+def acquire_update_lock():
+    """Toma el bloqueo de actualización; False si otra ya está en curso"""
+    for _ in range(2):
+        try:
+            fd = os.open(UPDATE_LOCK, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if time.time() - UPDATE_LOCK.stat().st_mtime < UPDATE_LOCK_STALE_SECONDS:
+                    return False
+                UPDATE_LOCK.unlink()
+            except OSError:
+                pass
+            continue
+        except OSError:
+            return False
+        os.write(fd, str(os.getpid()).encode())
+        os.close(fd)
+        return True
+    return False
+
+def release_update_lock():
+    """Libera el bloqueo de actualización"""
+    try:
+        UPDATE_LOCK.unlink()
+    except OSError:
+        pass
+
 def auto_update():
-    """Actualiza la documentación si es necesario"""
-    if not DOCS_PATH.exists():
+    """Lanza la actualización en segundo plano si toca comprobarla
+
+    No espera a la red: el comando actual usa la copia local y el proceso
+    desacoplado trae los cambios para la próxima llamada.
+    """
+    if not DOCS_PATH.exists() or not update_check_due():
+        return False
+    if not acquire_update_lock():
         return False
 
     try:
-        os.chdir(DOCS_PATH)
+        UPDATE_STAMP.touch()
+        options = {}
+        if sys.platform == "win32":
+            options["creationflags"] = (
+                subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+            )
+        else:
+            options["start_new_session"] = True
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "background-update"],
+            cwd=DOCS_PATH,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            close_fds=True,
+            **options,
+        )
+        return True
+    except Exception:
+        release_update_lock()
+        return False
 
-        # Obtener cambios remotos
-        result = subprocess.run(["git", "fetch", "origin"], capture_output=True)
-        if result.returncode != 0:
-            return False
+def git_update():
+    """Actualiza el repositorio con git fetch/pull"""
+    os.chdir(DOCS_PATH)
 
-        # Verificar si hay actualizaciones
-        result = subprocess.run(["git", "rev-list", "HEAD..origin/main", "--count"],
-                              capture_output=True, text=True)
-        behind = int(result.stdout.strip())
+    # Obtener cambios remotos
+    result = subprocess.run(["git", "fetch", "origin"], capture_output=True)
+    if result.returncode != 0:
+        return False
 
-        if behind > 0:
-            print("🔄 Actualizando documentación...", file=sys.stderr)
-            subprocess.run(["git", "pull", "origin", "main"], capture_output=True)
+    # Verificar si hay actualizaciones
+    result = subprocess.run(["git", "rev-list", "HEAD..origin/main", "--count"],
+                          capture_output=True, text=True)
+    behind = int(result.stdout.strip())
 
-        return True
+    if behind > 0:
+        subprocess.run(["git", "pull", "origin", "main"], capture_output=True)
+
+    return True
+
+def is_safe_filename(filename):
+    """Acepta solo nombres de archivo planos dentro del directorio docs"""
+    return (bool(filename) and not filename.startswith(".")
+            and "/" not in filename and "\\\\" not in filename)
+
+def write_atomic(path, data):
+    """Reemplaza un archivo sin que los lectores vean uno a medio escribir"""
+    import tempfile
+    # Un temporal propio por escritor: el CLI y la actualización en segundo
+    # plano pueden escribir a la vez
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=".{}.".format(path.name))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_name, path)
+    except BaseException:
+        if os.path.exists(temp_name):
+            os.unlink(temp_name)
+        raise
+
+def open_url(url, headers=None):
+    """Abre una URL con el User-Agent del helper"""
+    request_headers = {"User-Agent": "claude-docs-helper/{}".format(SCRIPT_VERSION)}
+    request_headers.update(headers or {})
+    request = urllib.request.Request(url, headers=request_headers)
+    return urllib.request.urlopen(request, timeout=30)
+
+def manifest_entries(manifest):
+    """Archivos descritos por un manifiesto: las páginas y el índice de búsqueda"""
+    entries = dict(manifest.get("files", {}))
+    search_index = manifest.get("search_index")
+    if isinstance(search_index, dict) and search_index.get("file"):
+        entries[search_index["file"]] = search_index
+    return entries
+
+def manifest_update(force=False):
+    """Descarga solo los archivos cuyo hash cambió en el manifiesto publicado
+
+    Devuelve un dict con los archivos updated, removed y failed, o None si
+    el manifiesto no cambió desde la última actualización (ETag).
+    """
+    import hashlib
+    import urllib.error
+    from concurrent.futures import ThreadPoolExecutor
+
+    headers = {}
+    if not force and MANIFEST_ETAG.exists():
+        headers["If-None-Match"] = MANIFEST_ETAG.read_text().strip()
+    try:
+        with open_url(MANIFEST_URL, headers) as response:
+            remote = json.loads(response.read())
+            etag = response.headers.get("ETag")
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None
+        raise
+
+    docs_dir = MANIFEST_FILE.parent
+    files = manifest_entries(remote)
+
+    def file_hash(path, algorithm):
+        digest = hashlib.new(algorithm)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(65536), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    changed = []
+    for filename, entry in files.items():
+        if not is_safe_filename(filename):
+            continue
+        try:
+            local_hash = file_hash(docs_dir / filename, entry.get("hash_algorithm", "sha256"))
+        except (OSError, ValueError):
+            local_hash = None
+        if local_hash != entry.get("hash"):
+            changed.append(filename)
+
+    base_url = remote.get("base_url") or MANIFEST_URL.rsplit("/", 1)[0]
+    if not base_url.endswith("/"):
+        base_url += "/"
+
+    def download(filename):
+        entry = files[filename]
+        with open_url(base_url + filename) as response:
+            content = response.read()
+        algorithm = entry.get("hash_algorithm", "sha256")
+        if hashlib.new(algorithm, content).hexdigest() != entry.get("hash"):
+            raise ValueError("{} does not match its manifest hash".format(filename))
+        write_atomic(docs_dir / filename, content)
+
+    docs_dir.mkdir(parents=True, exist_ok=True)
+    result = {"updated": [], "removed": [], "failed": []}
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [(name, executor.submit(download, name)) for name in changed]
+        for filename, future in futures:
+            try:
+                future.result()
+                result["updated"].append(filename)
+            except Exception:
+                result["failed"].append(filename)
+    if result["failed"]:
+        # Se conservan el manifiesto y el ETag para reintentarlo la próxima vez
+        return result
+
+    try:
+        with open(MANIFEST_FILE, "r", encoding="utf-8") as f:
+            local_files = manifest_entries(json.load(f))
+    except (OSError, ValueError):
+        local_files = {}
+    for filename in local_files:
+        path = docs_dir / filename
+        if filename not in files and is_safe_filename(filename) and path.exists():
+            path.unlink()
+            result["removed"].append(filename)
+
+    write_atomic(MANIFEST_FILE, json.dumps(remote, indent=2).encode("utf-8"))
+    if etag:
+        MANIFEST_ETAG.write_text(etag)
+    if result["updated"] or result["removed"]:
+        changes = {
+            "last_updated": remote.get("last_updated"),
+            "updated": sorted(result["updated"]),
+            "removed": sorted(result["removed"]),
+        }
+        write_atomic(MANIFEST_CHANGES, json.dumps(changes).encode("utf-8"))
+    return result
+
+def run_update():
+    """Trae los cambios remotos (proceso lanzado por auto_update)"""
+    try:
+        if UPDATE_MODE == "manifest":
+            manifest_update()
+            return True
+        return git_update()
     except Exception:
         return False
+    finally:
+        release_update_lock()
+
+def update_now(force=False):
+    """Actualiza en primer plano e informa del resultado (/docs --update)"""
+    if not acquire_update_lock():
+        print("An update is already running")
+        return
+    try:
+        UPDATE_STAMP.touch()
+        if UPDATE_MODE != "manifest":
+            print("SUCCESS: Repository updated" if git_update() else "ERROR: git update failed")
+            return
+        result = manifest_update(force)
+        if result is None:
+            print("SUCCESS: Documentation is up to date")
+        elif result["failed"]:
+            print("WARNING: Could not update: {}".format(", ".join(result["failed"])))
+        else:
+            print("SUCCESS: {} files updated, {} removed".format(
+                len(result["updated"]), len(result["removed"])))
+    except Exception as e:
+        print("ERROR: Update failed: {}".format(e))
+    finally:
+        release_update_lock()
 
 def list_docs():
     """Lista toda la documentación disponible"""
@@ -157,8 +412,107 @@ def read_doc(topic_param):
             else:
                 print("No documentation files found.")
 
+        print()
+        print("Tip: Use /docs to see all available topics, or /docs search <words>")
+
+def fold(text):
+    """Minúsculas y sin acentos, igual que al construir el índice"""
+    import unicodedata
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+def load_search_index():
+    """Carga el índice de búsqueda, o None si falta o tiene otro formato"""
+    try:
+        with open(SEARCH_INDEX_FILE, "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return index if index.get("version") == 1 else None
+
+def search_sections(index, terms, limit=5):
+    """Puntúa con BM25 las secciones que contienen algún término
+
+    Devuelve hasta limit pares (sección, puntuación), de mayor a menor.
+    """
+    import math
+    sections = index["sections"]
+    k1, b = index["k1"], index["b"]
+    average = index["average_length"] or 1
+    scores = {}
+    for term in terms:
+        postings = index["postings"].get(term)
+        if not postings:
+            continue
+        frequency = len(postings) // 2
+        idf = math.log(1 + (len(sections) - frequency + 0.5) / (frequency + 0.5))
+        for i in range(0, len(postings), 2):
+            section, tf = postings[i], postings[i + 1]
+            norm = k1 * (1 - b + b * sections[section][4] / average)
+            scores[section] = scores.get(section, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+    return ranked[:limit]
+
+def section_snippet(lines, terms, pattern, width=220):
+    """Recorta el fragmento de la sección que contiene más términos"""
+    best, best_hits = 0, 0
+    for number, line in enumerate(lines):
+        hits = len(terms.intersection(re.findall(pattern, fold(line))))
+        if hits > best_hits:
+            best, best_hits = number, hits
+    text = " ".join(" ".join(lines[best:best + 4]).split())
+    return text if len(text) <= width else text[:width].rsplit(" ", 1)[0] + " ..."
+
+def search_docs(query):
+    """Busca en la documentación con el índice invertido (/docs search)"""
+    print_doc_header()
+
+    # Auto-actualizar
+    auto_update()
+
+    index = load_search_index()
+    if index is None:
+        print("ERROR: Search index not found. Run /docs --update to download it")
+        return
+
+    pattern = index["token_pattern"]
+    terms = set(re.findall(pattern, fold(query)))
+    if not terms:
+        print("Usage: /docs search <words>")
+        return
+
+    results = search_sections(index, terms)
+    if not results:
+        print("No results for '{}'".format(query))
         print()
         print("Tip: Use /docs to see all available topics")
+        return
+
+    print("Results for '{}':".format(query))
+    print()
+    docs_dir = SEARCH_INDEX_FILE.parent
+    file_lines = {}
+    for rank, (section, score) in enumerate(results, 1):
+        file_number, heading, start, end, length = index["sections"][section]
+        filename = index["files"][file_number]
+        if filename not in file_lines:
+            try:
+                with open(docs_dir / filename, "r", encoding="utf-8") as f:
+                    file_lines[filename] = f.read().splitlines()
+            except OSError:
+                file_lines[filename] = []
+        topic = filename.removesuffix(".md")
+        title = "{} > {}".format(topic, heading) if heading else topic
+        print("{}. {} (line {})".format(rank, title, start + 1))
+        lines = file_lines[filename][start:end]
+        if heading:
+            lines = lines[1:]
+        snippet = section_snippet(lines, terms, pattern)
+        if snippet:
+            print("   {}".format(snippet))
+        print()
+
+    print("Read a topic with /docs <topic>")
 
 def show_freshness():
     """Muestra el estado de sincronización"""
@@ -174,27 +528,74 @@ def show_freshness():
         # Auto-actualizar
         auto_update()
 
-        # Obtener estado del repositorio
-        result = subprocess.run(["git", "rev-list", "HEAD..origin/main", "--count"],
-                              capture_output=True, text=True)
-        behind = int(result.stdout.strip()) if result.stdout.strip() else 0
-
-        result = subprocess.run(["git", "rev-list", "origin/main..HEAD", "--count"],
-                              capture_output=True, text=True)
-        ahead = int(result.stdout.strip()) if result.stdout.strip() else 0
-
-        if behind > 0:
-            print("WARNING: Local version is behind GitHub by {} commit(s)".format(behind))
-        elif ahead > 0:
-            print("WARNING: Local version is ahead of GitHub by {} commit(s)".format(ahead))
+        if UPDATE_MODE == "manifest":
+            with open(MANIFEST_FILE, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            print("Documentation last updated: {}".format(
+                manifest.get("last_updated", "unknown")))
         else:
-            print("SUCCESS: You have the latest documentation")
+            # Obtener estado del repositorio
+            result = subprocess.run(["git", "rev-list", "HEAD..origin/main", "--count"],
+                                  capture_output=True, text=True)
+            behind = int(result.stdout.strip()) if result.stdout.strip() else 0
+
+            result = subprocess.run(["git", "rev-list", "origin/main..HEAD", "--count"],
+                                  capture_output=True, text=True)
+            ahead = int(result.stdout.strip()) if result.stdout.strip() else 0
+
+            if behind > 0:
+                print("WARNING: Local version is behind GitHub by {} commit(s)".format(behind))
+            elif ahead > 0:
+                print("WARNING: Local version is ahead of GitHub by {} commit(s)".format(ahead))
+            else:
+                print("SUCCESS: You have the latest documentation")
 
         print("Version: {}".format(SCRIPT_VERSION))
+        try:
+            checked = time.time() - UPDATE_STAMP.stat().st_mtime
+            print("Last update check: {} min ago".format(int(checked // 60)))
+        except OSError:
+            pass
 
     except Exception as e:
         print("WARNING: Could not check sync status: {}".format(e))
 
+def show_manifest_changes():
+    """Muestra los archivos que cambió la última actualización por manifiesto"""
+    try:
+        with open(MANIFEST_CHANGES, "r", encoding="utf-8") as f:
+            changes = json.load(f)
+    except (OSError, ValueError):
+        changes = {}
+
+    updated = [name for name in changes.get("updated", []) if name.endswith(".md")]
+    removed = [name for name in changes.get("removed", []) if name.endswith(".md")]
+    if not updated and not removed:
+        print("No recent documentation updates found.")
+        return
+
+    print("Last update: {}".format(changes.get("last_updated") or "unknown"))
+    for name in updated:
+        print("• {}".format(name[:-3]))
+    for name in removed:
+        print("• {} (removed)".format(name[:-3]))
+
+def show_git_changes():
+    """Muestra los commits recientes del repositorio clonado"""
+    result = subprocess.run([
+        "git", "log", "--oneline", "-10", "--", "docs/*.md"
+    ], capture_output=True, text=True)
+
+    if result.stdout.strip():
+        commits = result.stdout.strip().splitlines()[:5]
+        for commit in commits:
+            if 'Merge' not in commit:
+                hash_part = commit.split()[0]
+                print("• {}".format(hash_part))
+                print("  https://github.com/jhonma82/claude-code-docs-spa/commit/{}".format(hash_part))
+    else:
+        print("No recent documentation updates found.")
+
 def whats_new():
     """Muestra los cambios recientes"""
     print_doc_header()
@@ -211,20 +612,11 @@ def whats_new():
         print("Recent documentation updates:")
         print()
 
-        # Obtener commits recientes
-        result = subprocess.run([
-            "git", "log", "--oneline", "-10", "--", "docs/*.md"
-        ], capture_output=True, text=True)
-
-        if result.stdout.strip():
-            commits = result.stdout.strip().split("\\\\n")[:5]
-            for commit in commits:
-                if 'Merge' not in commit:
-                    hash_part = commit.split()[0]
-                    print("• {}".format(hash_part))
-                    print("  https://github.com/jhonma82/claude-code-docs-spa/commit/{}".format(hash_part))
+        if UPDATE_MODE == "manifest":
+            # Sin historial de git: se muestran los cambios de la última actualización
+            show_manifest_changes()
         else:
-            print("No recent documentation updates found.")
+            show_git_changes()
 
         print()
         print("Full changelog: https://github.com/jhonma82/claude-code-docs-spa/commits/main/docs")
@@ -254,6 +646,14 @@ def main():
     elif command == "hook-check":
         # Hook para auto-actualización
         auto_update()
+    elif command in ["-u", "--update"]:
+        print_doc_header()
+        update_now(force="--force" in sys.argv[2:])
+    elif command in ["search", "-s", "--search"]:
+        search_docs(' '.join(sys.argv[2:]))
+    elif command == "background-update":
+        # Proceso desacoplado lanzado por auto_update
+        run_update()
     elif command == "uninstall":
         print_doc_header()
         print("To uninstall Claude Code Documentation Mirror")
@@ -277,11 +677,134 @@ def main():
         topic = ' '.join(sys.argv[1:])
         read_doc(topic)
 
+def run_profiled():
+    """Ejecuta main() bajo cProfile (activado con CLAUDE_DOCS_PROFILE=1)"""
+    import cProfile
+    import pstats
+    import time
+
+    profile_dir = Path(
+        os.environ.get("CLAUDE_DOCS_PROFILE_DIR")
+        or MANIFEST_FILE.parent / ".cache" / "profiles"
+    )
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    base = profile_dir / "profile-helper-{}".format(time.strftime("%Y%m%dT%H%M%S"))
+
+    profile = cProfile.Profile()
+    try:
+        profile.runcall(main)
+    finally:
+        profile.dump_stats(str(base) + ".prof")
+        with open(str(base) + ".txt", "w", encoding="utf-8") as f:
+            stats = pstats.Stats(profile, stream=f)
+            stats.sort_stats("cumulative").print_stats(25)
+        print("Profile: {}.prof".format(base), file=sys.stderr)
+
 if __name__ == "__main__":
-    main()
+    if os.environ.get("CLAUDE_DOCS_PROFILE", "") not in ("", "0"):
+        run_profiled()
+    else:
+        main()
 '''
         return content
 
+    def generate_hook_script_content(self) -> str:
+        """Generate the content of the update hook script.
+
+        The hook may run before tool calls, so it only imports os, sys and
+        time, checks the update stamp and returns. Only when an update check
+        is due does it run the helper's hook-check, which does the rest.
+        With the "docs" scope it first looks for the docs directory in the
+        tool payload on stdin, as it appears JSON-escaped (with non-ASCII
+        characters raw, as Claude Code sends them, or as \\u escapes),
+        without parsing it, and exits if it is not there.
+        """
+        docs_dir = self.config.docs_dir
+        docs_dir_needles = tuple(
+            dict.fromkeys(
+                json.dumps(path, ensure_ascii=ensure_ascii)[1:-1]
+                for path in (str(docs_dir), docs_dir.as_posix())
+                for ensure_ascii in (False, True)
+            )
+        )
+        return f'''"""
+Claude Code Documentation Hook v{self.config.version}
+Comprueba el sello de la última actualización y solo llama al helper si toca
+"""
+
+import os
+import sys
+import time
+
+UPDATE_STAMP = {str(self.config.update_stamp_path)!r}
+HELPER_SCRIPT = {str(self.config.helper_script_path)!r}
+UPDATE_TTL_SECONDS = {self.config.update_ttl_seconds}
+HOOK_SCOPE = {self.config.hook_scope!r}
+DOCS_DIR_NEEDLES = {docs_dir_needles!r}
+
+
+def main():
+    if HOOK_SCOPE == "docs":
+        # La carga llega en UTF-8, sea cual sea la codificación local
+        payload = sys.stdin.buffer.read().decode("utf-8", "replace")
+        if not any(needle in payload for needle in DOCS_DIR_NEEDLES):
+            return
+    try:
+        ttl = int(os.environ.get("CLAUDE_DOCS_UPDATE_TTL", UPDATE_TTL_SECONDS))
+    except ValueError:
+        ttl = UPDATE_TTL_SECONDS
+    try:
+        checked_at = os.stat(UPDATE_STAMP).st_mtime
+    except OSError:
+        checked_at = 0.0
+    if time.time() - checked_at < ttl:
+        return
+
+    import subprocess
+
+    subprocess.call(
+        [sys.executable, HELPER_SCRIPT, "hook-check"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+# Imported, not run as a script, so the bytecode compiled at install is used
+main()
+'''
+
+    def generate_hook_settings(self) -> tuple[str, dict[str, Any]]:
+        """Generate the settings.json hook entry for the configured scope.
+
+        Returns:
+            Tuple of (hook event, hook entry).
+        """
+        entry: dict[str, Any] = {
+            "hooks": [{"type": "command", "command": self.generate_hook_command()}]
+        }
+        if self.config.hook_scope == "session":
+            return "SessionStart", entry
+        return "PreToolUse", {"matcher": "Read", **entry}
+
+    def generate_hook_command(self) -> str:
+        """Generate the command Claude Code runs for the update hook.
+
+        The hook module is imported rather than run as a script so Python
+        loads its compiled bytecode; -S and -E skip site-packages and the
+        PYTHON* environment, the largest parts of interpreter startup. The
+        install directory is passed as an argument, quoted for the shell, so
+        no character of its path can break or alter the command.
+        """
+        code = (
+            "import sys; sys.path.insert(0, sys.argv[1]); "
+            f"import {self.config.hook_module_name}"
+        )
+        args = ["python", "-S", "-E", "-c", code, self.config.install_dir.as_posix()]
+        if os.name == "nt":
+            return subprocess.list2cmdline(args)
+        return shlex.join(args)
+
     def generate_command_file_content(self) -> str:
         """Generate the content for the command file."""
         return f"""Execute the Claude Code Docs helper script at {self.config.install_dir}/{self.config.helper_script_name}
@@ -292,6 +815,8 @@ Usage:
 - /docs -t - Check sync status without reading a doc
 - /docs -t <topic> - Check freshness then read documentation
 - /docs whats new - Show recent documentation changes
+- /docs --update - Update now (only files whose hash changed are downloaded)
+- /docs search <words> - Find the sections that mention the words, best matches first
 
 Examples of expected output:
 
@@ -316,7 +841,8 @@ When showing what's new:
 📎 Full changelog: https://github.com/jhonma82/claude-code-docs-spa/commits/main/docs
 📚 COMMUNITY MIRROR - NOT AFFILIATED WITH ANTHROPIC
 
-Every request checks for the latest documentation from GitHub (takes ~0.4s).
+Updates are checked in the background at most once every {self.config.update_ttl_seconds} seconds
+(CLAUDE_DOCS_UPDATE_TTL overrides it), so requests never wait for the network.
 The helper script handles all functionality including auto-updates.
 
 Execute: python "{self.config.install_dir}/{self.config.helper_script_name}" "$ARGUMENTS"
@@ -338,6 +864,14 @@ Execute: python "{self.config.install_dir}/{self.config.helper_script_name}" "$A
 
         return helper_path
 
+    def create_hook_script(self) -> Path:
+        """Create the hook script and compile it to bytecode."""
+        hook_path = self.config.hook_script_path
+        self.config.install_dir.mkdir(parents=True, exist_ok=True)
+        hook_path.write_text(self.generate_hook_script_content(), encoding="utf-8")
+        py_compile.compile(str(hook_path), doraise=True)
+        return hook_path
+
     def create_command_file(self) -> Path:
         """Create the command file."""
         command_content = self.generate_command_file_content()
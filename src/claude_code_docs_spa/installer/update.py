@@ -0,0 +1,245 @@
+"""Manifest-driven delta updates of an installed documentation mirror."""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import structlog
+
+from ..fetcher.digest import digest_bytes, digest_file, entry_algorithm
+from .config import InstallerConfig
+
+# ETag of the last remote manifest applied, kept beside the docs directory
+ETAG_FILE = ".docs-manifest-etag"
+
+# Files changed by the last update that changed any, shown by /docs -t
+CHANGES_FILE = ".docs-manifest-changes.json"
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Replace a file so readers see either the old or the new content.
+
+    Each writer gets its own temporary file, so concurrent updates (the CLI
+    and the helper's background update) cannot clobber each other's.
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(data)
+        Path(tmp_name).replace(path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def _is_safe_filename(filename: str) -> bool:
+    """Check that a manifest key names a plain file inside the docs directory."""
+    return (
+        bool(filename)
+        and not filename.startswith(".")
+        and "/" not in filename
+        and "\\" not in filename
+    )
+
+
+def _manifest_entries(manifest: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    """Get every file a manifest describes: the pages and the search index."""
+    entries = dict(manifest.get("files", {}))
+    search_index = manifest.get("search_index")
+    if isinstance(search_index, dict) and search_index.get("file"):
+        entries[search_index["file"]] = search_index
+    return entries
+
+
+class ManifestUpdater:
+    """Brings an installed mirror up to date from the published manifest.
+
+    Only the remote manifest is downloaded (conditionally, with the ETag of
+    the last one applied). Files whose hash differs from the local copy are
+    downloaded in parallel, verified against the manifest and written
+    atomically; files the manifest dropped are removed. The local manifest
+    is replaced last, and only when every file was updated, so an
+    interrupted update is simply repeated. Neither git nor its history is
+    needed, which also suits mirrors installed from the ZIP archive.
+    """
+
+    def __init__(
+        self,
+        config: InstallerConfig,
+        *,
+        max_workers: int = 8,
+        timeout: float = 30.0,
+    ) -> None:
+        """Initialize the updater.
+
+        Args:
+            config: Installer configuration.
+            max_workers: Files downloaded concurrently.
+            timeout: Timeout of each request, in seconds.
+        """
+        self.config = config
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.etag_path = config.install_dir / ETAG_FILE
+        self.changes_path = config.install_dir / CHANGES_FILE
+        self.logger = structlog.get_logger("claude_code_installer")
+
+    def _open(self, url: str, headers: dict[str, str] | None = None) -> Any:
+        request = urllib.request.Request(  # noqa: S310
+            url,
+            headers={"User-Agent": f"claude-code-docs-spa/{self.config.version}"}
+            | (headers or {}),
+        )
+        return urllib.request.urlopen(request, timeout=self.timeout)  # noqa: S310
+
+    def fetch_remote_manifest(
+        self, *, force: bool = False
+    ) -> tuple[dict[str, Any] | None, str | None]:
+        """Download the published manifest.
+
+        Args:
+            force: Download it even if it did not change since the last update.
+
+        Returns:
+            Tuple of (manifest, etag). The manifest is None when the server
+            answered 304 Not Modified.
+        """
+        headers = {}
+        if not force and self.etag_path.exists():
+            headers["If-None-Match"] = self.etag_path.read_text().strip()
+        try:
+            with self._open(self.config.manifest_url, headers) as response:
+                body = response.read()
+                etag = response.headers.get("ETag")
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return None, None
+            raise
+        return dict(json.loads(body)), etag
+
+    def plan(self, remote: dict[str, Any]) -> tuple[list[str], list[str]]:
+        """Compare the remote manifest with the files on disk.
+
+        Returns:
+            Tuple of (files to download, files to remove).
+        """
+        docs_dir = self.config.docs_dir
+        remote_files = _manifest_entries(remote)
+        to_fetch = []
+        for filename, entry in remote_files.items():
+            if not _is_safe_filename(filename):
+                self.logger.warning("unsafe_manifest_entry", filename=filename)
+                continue
+            path = docs_dir / filename
+            try:
+                local_hash = digest_file(path, entry_algorithm(entry))
+            except (OSError, ValueError):
+                local_hash = None
+            if local_hash != entry.get("hash"):
+                to_fetch.append(filename)
+
+        try:
+            local = json.loads(self.config.manifest_file_path.read_text())
+        except (OSError, ValueError):
+            # Missing or corrupt; files are compared by hash anyway, so this
+            # only means no file is known to be stale
+            local = {}
+        to_remove = [
+            filename
+            for filename in _manifest_entries(local)
+            if filename not in remote_files
+            and _is_safe_filename(filename)
+            and (docs_dir / filename).exists()
+        ]
+        return to_fetch, to_remove
+
+    def download_file(
+        self, base_url: str, filename: str, entry: dict[str, Any]
+    ) -> None:
+        """Download one file, verify its hash and write it atomically.
+
+        Raises:
+            ValueError: If the downloaded content does not match the manifest.
+        """
+        with self._open(f"{base_url}{filename}") as response:
+            content = response.read()
+        if digest_bytes(content, entry_algorithm(entry)) != entry.get("hash"):
+            raise ValueError(f"{filename} does not match its manifest hash")
+        _write_atomic(self.config.docs_dir / filename, content)
+
+    def update(self, *, force: bool = False) -> dict[str, Any]:
+        """Apply the published manifest to the installed mirror.
+
+        Args:
+            force: Compare every file even if the manifest has not changed.
+
+        Returns:
+            Dictionary with up_to_date and the files updated, removed and failed.
+        """
+        result: dict[str, Any] = {
+            "up_to_date": False,
+            "files_updated": [],
+            "files_removed": [],
+            "files_failed": [],
+            "manifest_url": self.config.manifest_url,
+        }
+
+        remote, etag = self.fetch_remote_manifest(force=force)
+        if remote is None:
+            self.logger.info("manifest_not_modified")
+            result["up_to_date"] = True
+            return result
+
+        to_fetch, to_remove = self.plan(remote)
+        entries = _manifest_entries(remote)
+        base_url = remote.get("base_url") or self.config.manifest_url.rsplit("/", 1)[0]
+        base_url = base_url if base_url.endswith("/") else f"{base_url}/"
+        self.config.docs_dir.mkdir(parents=True, exist_ok=True)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                filename: executor.submit(
+                    self.download_file, base_url, filename, entries[filename]
+                )
+                for filename in to_fetch
+            }
+            for filename, future in futures.items():
+                try:
+                    future.result()
+                    result["files_updated"].append(filename)
+                except Exception as e:
+                    self.logger.warning(
+                        "file_update_failed", filename=filename, error=str(e)
+                    )
+                    result["files_failed"].append(filename)
+
+        if result["files_failed"]:
+            # Keep the old manifest and ETag so the next update tries again
+            return result
+
+        for filename in to_remove:
+            (self.config.docs_dir / filename).unlink(missing_ok=True)
+            result["files_removed"].append(filename)
+
+        _write_atomic(
+            self.config.manifest_file_path,
+            json.dumps(remote, indent=2).encode("utf-8"),
+        )
+        if etag:
+            self.etag_path.write_text(etag)
+        result["up_to_date"] = not (to_fetch or to_remove)
+        if not result["up_to_date"]:
+            changes = {
+                "last_updated": remote.get("last_updated"),
+                "updated": sorted(result["files_updated"]),
+                "removed": sorted(result["files_removed"]),
+            }
+            _write_atomic(self.changes_path, json.dumps(changes).encode("utf-8"))
+        return result
@@ -8,8 +8,14 @@ import sys
 from pathlib import Path
 from typing import Any
 
-from .fetcher import ClaudeCodeFetcher, FetcherConfig
-from .installer import ClaudeCodeInstaller, InstallerConfig
+from .fetcher import (
+    SEARCH_INDEX_FILE,
+    SUPPORTED_HASH_ALGORITHMS,
+    ClaudeCodeFetcher,
+    FetcherConfig,
+)
+from .installer import HOOK_SCOPES, ClaudeCodeInstaller, InstallerConfig
+from .profiling import PROFILERS, CommandProfiler
 
 
 async def main(args: list[str] | None = None) -> dict[str, Any]:
@@ -30,6 +36,13 @@ Examples:
   %(prog)s --docs-dir ./docs            # Save to specific directory
   %(prog)s --max-retries 5              # Increase retry attempts
   %(prog)s --rate-limit-delay 1.0       # Slower rate limiting
+  %(prog)s --max-workers 8              # Fetch more pages in parallel
+  %(prog)s --incremental                # Only fetch pages whose lastmod changed
+  %(prog)s --cache-ttl 3600             # Reuse responses cached in the last hour
+  %(prog)s --resume                     # Continue an interrupted fetch
+  %(prog)s --deadline 300               # Stop starting pages after 5 minutes
+  %(prog)s --profile                    # Profile the fetch (written to the cache dir)
+  %(prog)s update                       # Update an installed mirror from its manifest
       """,
     )
 
@@ -60,6 +73,100 @@ Examples:
         help="Delay between requests in seconds (default: 0.5)",
     )
 
+    parser.add_argument(
+        "--http2",
+        action="store_true",
+        help="Multiplex requests over HTTP/2 (requires httpx[http2])",
+    )
+
+    parser.add_argument(
+        "--fixed-rate",
+        action="store_true",
+        help="Keep the request rate fixed instead of adapting it to the server",
+    )
+
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=4,
+        help="Number of pages fetched concurrently (default: 4)",
+    )
+
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only fetch pages whose sitemap lastmod changed since the last sync",
+    )
+
+    parser.add_argument(
+        "--full-sweep-hours",
+        type=float,
+        default=24.0,
+        help="Hours between full sweeps in incremental mode (default: 24)",
+    )
+
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip pages already completed by an interrupted fetch",
+    )
+
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        metavar="SECONDS",
+        help="Time budget of a fetch: pages that cannot finish in time are left "
+        "for the next run and keep their previous manifest entries",
+    )
+
+    parser.add_argument(
+        "--metrics-file",
+        type=Path,
+        help="Write per-request and run metrics here after a fetch "
+        "(Prometheus textfile for *.prom, JSON lines otherwise)",
+    )
+
+    parser.add_argument(
+        "--no-search-index",
+        action="store_true",
+        help="Do not build the full-text index used by /docs search",
+    )
+
+    parser.add_argument(
+        "--hash-algorithm",
+        choices=SUPPORTED_HASH_ALGORITHMS,
+        default="sha256",
+        help="Digest recorded in the manifest for new and changed files "
+        "(default: sha256)",
+    )
+
+    parser.add_argument(
+        "--generations-dir",
+        type=Path,
+        help="Write each run to a new generation here and publish it atomically "
+        "by turning --docs-dir into a symlink",
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        help="Directory for the HTTP response cache (default: "
+        ".<docs-dir name>-cache beside the docs directory)",
+    )
+
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=0.0,
+        help="Serve cached responses younger than this many seconds (default: 0)",
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disable the HTTP response cache",
+    )
+
     parser.add_argument(
         "--timeout",
         type=int,
@@ -71,6 +178,28 @@ Examples:
         "--verbose", "-v", action="store_true", help="Enable verbose logging"
     )
 
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="cprofile",
+        choices=PROFILERS,
+        help="Profile the command with cProfile (default) or a sampling profiler "
+        "and write the profile plus a hot-function summary",
+    )
+
+    parser.add_argument(
+        "--profile-dir",
+        type=Path,
+        help="Directory for --profile output (default: <cache-dir>/profiles)",
+    )
+
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=25,
+        help="Functions listed in the --profile summary (default: 25)",
+    )
+
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -81,12 +210,23 @@ Examples:
     parser.add_argument(
         "command",
         nargs="?",
-        choices=["fetch", "install", "uninstall"],
+        choices=["fetch", "install", "uninstall", "update"],
         help="Command to execute (default: fetch)",
     )
 
     parser.add_argument(
-        "--force", action="store_true", help="Force action without confirmation prompts"
+        "--force",
+        action="store_true",
+        help="Force action without confirmation prompts; with update, check "
+        "every file even if the published manifest did not change",
+    )
+
+    parser.add_argument(
+        "--hook-scope",
+        choices=HOOK_SCOPES,
+        default="docs",
+        help="When install's update hook runs: once per session, before "
+        "reads inside the docs mirror (default), or before every Read",
     )
 
     parser.add_argument(
@@ -104,11 +244,57 @@ Examples:
         retry_delay=parsed_args.retry_delay,
         rate_limit_delay=parsed_args.rate_limit_delay,
         timeout=parsed_args.timeout,
+        max_workers=parsed_args.max_workers,
+        adaptive_rate_limit=not parsed_args.fixed_rate,
+        http2=parsed_args.http2,
+        incremental=parsed_args.incremental,
+        full_sweep_interval_hours=parsed_args.full_sweep_hours,
+        cache_dir=parsed_args.cache_dir,
+        generations_dir=parsed_args.generations_dir,
+        use_response_cache=not parsed_args.no_cache,
+        cache_ttl_seconds=parsed_args.cache_ttl,
+        resume=parsed_args.resume,
+        hash_algorithm=parsed_args.hash_algorithm,
+        metrics_file=parsed_args.metrics_file,
+        deadline_seconds=parsed_args.deadline,
+        search_index_file=None if parsed_args.no_search_index else SEARCH_INDEX_FILE,
     )
 
     # Execute command
     command = parsed_args.command or "fetch"
 
+    if not parsed_args.profile or parsed_args.dry_run:
+        return await _run_command(command, parsed_args, config)
+
+    profiler = CommandProfiler(
+        parsed_args.profile_dir or config.cache_dir / "profiles",
+        command,
+        mode=parsed_args.profile,
+        top=parsed_args.profile_top,
+    )
+    with profiler:
+        result = await _run_command(command, parsed_args, config)
+    result["profile"] = {
+        "mode": profiler.mode,
+        "data": str(profiler.data_path),
+        "summary": str(profiler.summary_path),
+    }
+    return result
+
+
+async def _run_command(
+    command: str, parsed_args: argparse.Namespace, config: FetcherConfig
+) -> dict[str, Any]:
+    """Execute a CLI command.
+
+    Args:
+        command: One of fetch, install, uninstall or update.
+        parsed_args: Parsed command line arguments.
+        config: Fetcher configuration built from them.
+
+    Returns:
+        Dictionary with application status
+    """
     if command == "fetch":
         # Create fetcher
         fetcher = ClaudeCodeFetcher(config)
@@ -123,13 +309,19 @@ Examples:
                     "retry_delay": config.retry_delay,
                     "rate_limit_delay": config.rate_limit_delay,
                     "timeout": config.timeout,
+                    "max_workers": config.max_workers,
+                    "adaptive_rate_limit": config.adaptive_rate_limit,
+                    "http2": config.http2,
+                    "incremental": config.incremental,
+                    "resume": config.resume,
+                    "hash_algorithm": config.hash_algorithm,
                 },
                 "project": "claude-code-docs-spa",
             }
 
         try:
-            # Fetch documentation
-            result = fetcher.fetch_all_documentation()
+            # Fetch documentation without blocking the event loop
+            result = await fetcher.afetch_all_documentation()
 
             return {
                 "status": "success",
@@ -148,7 +340,7 @@ Examples:
 
     elif command == "install":
         # Create installer
-        installer_config = InstallerConfig()
+        installer_config = InstallerConfig(hook_scope=parsed_args.hook_scope)
         installer = ClaudeCodeInstaller(installer_config)
 
         try:
@@ -169,6 +361,29 @@ Examples:
                 "error": str(e),
             }
 
+    elif command == "update":
+        installer = ClaudeCodeInstaller(InstallerConfig())
+
+        try:
+            result = installer.update(force=parsed_args.force)
+
+            return {
+                "status": "success" if result["success"] else "error",
+                "message": "Documentation updated"
+                if result["success"]
+                else "Some documentation files could not be updated",
+                "project": "claude-code-docs-spa",
+                "result": result,
+            }
+
+        except Exception as e:
+            return {
+                "status": "error",
+                "message": f"Failed to update: {e}",
+                "project": "claude-code-docs-spa",
+                "error": str(e),
+            }
+
     elif command == "uninstall":
         # Create installer
         installer_config = InstallerConfig()
@@ -220,13 +435,49 @@ def run_sync() -> None:
                     # Fetch result
                     print(f"Pages discovered: {result_data['pages_discovered']}")
                     print(f"Pages fetched: {result_data['pages_fetched']}")
+                    if result_data.get("pages_skipped"):
+                        print(f"Pages unchanged: {result_data['pages_skipped']}")
+                    if result_data.get("pages_resumed"):
+                        print(f"Pages resumed: {result_data['pages_resumed']}")
+                    if result_data.get("pages_deferred"):
+                        print(
+                            "Pages left for the next run (deadline): "
+                            f"{result_data['pages_deferred']}"
+                        )
                     print(f"Duration: {result_data['duration_seconds']:.1f}s")
+                    times = result_data.get("time_seconds")
+                    if times:
+                        print(
+                            f"Network: {times['network']:.1f}s, "
+                            f"rate-limit waits: {times['rate_limit_sleep']:.1f}s, "
+                            f"retry back-off: {times['retry_backoff_sleep']:.1f}s"
+                        )
+                    if result_data.get("wire_bytes"):
+                        print(
+                            f"Transferred: {result_data['wire_bytes'] / 1024:.1f} KB "
+                            f"({result_data['decoded_bytes'] / 1024:.1f} KB decoded)"
+                        )
+                    rates = result_data.get("requests_per_second", {})
+                    for host, rate in rates.items():
+                        print(f"Request rate ({host}): {rate:.2f} req/s")
+                    breakers = result_data.get("circuit_breakers", {})
+                    for host, breaker in breakers.items():
+                        if breaker["times_opened"]:
+                            print(
+                                f"Circuit breaker ({host}): {breaker['state']}, "
+                                f"{breaker['short_circuited']} requests skipped"
+                            )
                     print(f"Documentation saved to: {result_data['docs_dir']}")
 
                     if result_data["pages_failed"] > 0:
                         print(f"WARNING: Pages failed: {result_data['pages_failed']}")
                         for failed_page in result_data["failed_pages"]:
                             print(f"   - {failed_page}")
+                elif "files_updated" in result_data:
+                    # Update result
+                    print(f"Files updated: {len(result_data['files_updated'])}")
+                    print(f"Files removed: {len(result_data['files_removed'])}")
+                    print(f"Installation directory: {result_data['install_dir']}")
                 elif "install_dir" in result_data:
                     # Install result
                     print(f"Installation directory: {result_data['install_dir']}")
@@ -238,15 +489,22 @@ def run_sync() -> None:
             print(f"Would save to: {result['config']['docs_dir']}")
             print(f"Max retries: {result['config']['max_retries']}")
             print(f"Rate limit delay: {result['config']['rate_limit_delay']}s")
+            print(f"Max workers: {result['config']['max_workers']}")
 
         else:
             print(f"ERROR: {result['message']}")
             if result.get("error"):
                 print(f"Error: {result['error']}")
+
+        if "profile" in result:
+            print(f"Profile: {result['profile']['data']}")
+            print(f"Profile summary: {result['profile']['summary']}")
+        if result["status"] not in ("success", "dry_run"):
             sys.exit(1)
 
     except KeyboardInterrupt:
         print("\nFetch interrupted by user")
+        print("Completed pages were checkpointed; run again with --resume")
         sys.exit(1)
     except Exception as e:
         print(f"Unexpected error: {e}")
@@ -0,0 +1,219 @@
+"""Profiling of CLI commands (fetch, install, uninstall)."""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import pstats
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from types import CodeType, FrameType, TracebackType
+from typing import Any
+
+# Profilers accepted by --profile
+PROFILERS = ("cprofile", "sampling")
+
+# Seconds between two stack samples of the sampling profiler
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+# From Python 3.12 cProfile runs on sys.monitoring: one enabled profiler sees
+# every thread, and enabling a second one raises ValueError
+PROCESS_WIDE_CPROFILE = sys.version_info >= (3, 12)
+
+
+def _frame_label(code: CodeType) -> str:
+    """Name a function in a collapsed stack."""
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Statistical profiler sampling the stacks of every thread.
+
+    A background thread records the stack of every other thread at a fixed
+    interval. Overhead does not depend on how many calls the profiled code
+    makes, and time spent blocked (sleeping, waiting on the network) shows
+    up, which a deterministic profiler only attributes to the blocking call.
+    """
+
+    def __init__(self, interval: float = DEFAULT_SAMPLE_INTERVAL) -> None:
+        """Initialize the profiler.
+
+        Args:
+            interval: Seconds between two samples.
+        """
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start sampling."""
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._sample, name="profile-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _sample(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack: list[str] = []
+                current: FrameType | None = frame
+                while current is not None:
+                    stack.append(_frame_label(current.f_code))
+                    current = current.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """Render the samples as collapsed stacks (flamegraph.pl input)."""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in sorted(self.stacks.items())
+        )
+
+    def summary(self, top: int) -> str:
+        """Summarize the functions found most often on and at the top of stacks."""
+        total = sum(self.stacks.values())
+        own: Counter[str] = Counter()
+        inclusive: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")[1:]
+            if frames:
+                own[frames[-1]] += count
+            for frame in set(frames):
+                inclusive[frame] += count
+
+        lines = [f"{total} samples every {self.interval * 1000:g} ms", ""]
+        for title, counts in (("Self", own), ("Inclusive", inclusive)):
+            lines.append(f"{title} samples:")
+            for label, count in counts.most_common(top):
+                lines.append(f"  {count:8d} {count / max(total, 1):7.1%}  {label}")
+            lines.append("")
+        return "\n".join(lines)
+
+
+class _ThreadProfileSnapshot:
+    """Stats of a per-thread profiler, read for pstats without disabling it.
+
+    Profile.disable() acts on the calling thread, so a worker's profiler
+    cannot be disabled from the thread that collects the stats. Its entries
+    are read as they are instead: the worker has finished, or sits idle in
+    its pool, and nothing it records afterwards is reported.
+    """
+
+    def __init__(self, profile: cProfile.Profile) -> None:
+        self._profile = profile
+        self.stats: dict[Any, Any] = {}
+
+    def create_stats(self) -> None:
+        """Snapshot the profiler's entries (called by pstats.Stats)."""
+        self._profile.snapshot_stats()
+        self.stats = self._profile.stats  # type: ignore[attr-defined]
+
+
+class CommandProfiler:
+    """Context manager profiling one CLI command.
+
+    The deterministic profiler (cProfile) covers every thread started while
+    it is active, such as fetch workers: before Python 3.12 through one
+    profiler per thread, installed with threading.setprofile, and from 3.12
+    through a single process-wide profiler. Per-thread profilers are read
+    where they stand when the command ends, so a pool worker still alive then
+    (e.g. asyncio's default executor) reports what it ran until that point.
+    It writes a ``.prof`` file for pstats or snakeviz. The sampling profiler
+    writes collapsed stacks. Both also write a text summary of the top
+    functions.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        command: str,
+        *,
+        mode: str = "cprofile",
+        top: int = 25,
+    ) -> None:
+        """Initialize the profiler.
+
+        Args:
+            output_dir: Directory the profile files are written to.
+            command: Name of the profiled command, used in file names.
+            mode: One of PROFILERS.
+            top: Functions listed in the summary.
+
+        Raises:
+            ValueError: If mode is not one of PROFILERS.
+        """
+        if mode not in PROFILERS:
+            raise ValueError(f"mode must be one of {', '.join(PROFILERS)}")
+        self.output_dir = Path(output_dir)
+        self.command = command
+        self.mode = mode
+        self.top = top
+        self.data_path: Path | None = None
+        self.summary_path: Path | None = None
+        self._profiles: list[cProfile.Profile] = []
+        self._sampler: SamplingProfiler | None = None
+
+    def _profile_thread(self, *_: object) -> None:
+        """Start a profiler in a new thread (installed with threading.setprofile)."""
+        profile = cProfile.Profile()
+        self._profiles.append(profile)
+        profile.enable()
+
+    def __enter__(self) -> CommandProfiler:
+        if self.mode == "sampling":
+            self._sampler = SamplingProfiler()
+            self._sampler.start()
+        else:
+            if not PROCESS_WIDE_CPROFILE:
+                threading.setprofile(self._profile_thread)
+            profile = cProfile.Profile()
+            self._profiles.append(profile)
+            profile.enable()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+        base = self.output_dir / f"profile-{self.command}-{stamp}"
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.summary_path = base.with_suffix(".txt")
+
+        if self._sampler is not None:
+            self._sampler.stop()
+            self.data_path = base.with_suffix(".collapsed")
+            self.data_path.write_text(self._sampler.collapsed(), encoding="utf-8")
+            summary = self._sampler.summary(self.top)
+        else:
+            self._profiles[0].disable()
+            if not PROCESS_WIDE_CPROFILE:
+                threading.setprofile(None)  # type: ignore[arg-type]
+            stream = io.StringIO()
+            main_profile, *thread_profiles = self._profiles
+            # pstats loads any object with create_stats() and a stats dict
+            snapshots = [_ThreadProfileSnapshot(profile) for profile in thread_profiles]
+            stats = pstats.Stats(main_profile, *snapshots, stream=stream)  # type: ignore[arg-type]
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+            self.data_path = base.with_suffix(".prof")
+            stats.dump_stats(self.data_path)
+            summary = stream.getvalue()
+
+        self.summary_path.write_text(summary, encoding="utf-8")
@@ -0,0 +1,205 @@
+"""Local HTTP server standing in for docs.anthropic.com in benchmarks."""
+
+from __future__ import annotations
+
+import hashlib
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+PAGE_PREFIX = "/es/docs/claude-code/page-"
+
+# Size range of generated pages, close to the real Spanish documentation
+DEFAULT_PAGE_BYTES = (2_000, 40_000)
+
+_PARAGRAPH = (
+    "## Sección {n}\n\n"
+    "Claude Code admite la configuración de `settings.json` por proyecto.\n\n"
+    "- Ejemplo de uso con **hooks** y [MCP](https://example.com/mcp)\n"
+    "- Instalación con `npm install -g @anthropic-ai/claude-code`\n\n"
+    "```bash\nclaude --help\n```\n\n"
+)
+
+
+def make_page(index: int, size: int) -> bytes:
+    """Build a markdown page of roughly ``size`` bytes that passes validation."""
+    parts = [f"# Página {index}\n\n> Documentación generada para pruebas.\n\n"]
+    length = len(parts[0])
+    n = 1
+    while length < size:
+        paragraph = _PARAGRAPH.format(n=n)
+        parts.append(paragraph)
+        length += len(paragraph)
+        n += 1
+    return "".join(parts).encode("utf-8")
+
+
+class DocsOrigin:
+    """Threaded HTTP/1.1 server with a synthetic sitemap, pages and changelog.
+
+    Faults are injected deterministically on the first request for a page,
+    so every page can still be fetched with retries: page i first gets a 429
+    (Retry-After: 0) when i is a multiple of ``throttle_every``, otherwise a
+    503 when i + 1 is a multiple of ``error_every``.
+    """
+
+    def __init__(
+        self,
+        pages: int = 1000,
+        *,
+        page_bytes: tuple[int, int] = DEFAULT_PAGE_BYTES,
+        latency: float = 0.0,
+        throttle_every: int = 0,
+        error_every: int = 0,
+        seed: int = 0,
+    ) -> None:
+        """Initialize the origin (call start() or use it as a context manager).
+
+        Args:
+            pages: Number of page URLs in the sitemap.
+            page_bytes: Smallest and largest generated page size.
+            latency: Seconds slept before answering each request.
+            throttle_every: Answer the first request for every n-th page with
+                429. 0 disables it.
+            error_every: Answer the first request for every n-th page with
+                503. 0 disables it.
+            seed: Seed of the page sizes.
+        """
+        # Reproducible page sizes, not security-sensitive
+        rng = random.Random(seed)  # noqa: S311
+        self.page_sizes = [rng.randint(*page_bytes) for _ in range(pages)]
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.error_every = error_every
+        self.status_counts: Counter[int] = Counter()
+        self.bytes_sent = 0
+        self._faulted: set[int] = set()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the origin."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def sitemap_url(self) -> str:
+        """URL of the sitemap listing every page."""
+        return f"{self.url}/sitemap.xml"
+
+    @property
+    def changelog_url(self) -> str:
+        """URL of the changelog."""
+        return f"{self.url}/CHANGELOG.md"
+
+    @property
+    def requests(self) -> int:
+        """Number of requests answered so far."""
+        with self._lock:
+            return sum(self.status_counts.values())
+
+    def start(self) -> DocsOrigin:
+        """Serve requests from a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the listening socket."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> DocsOrigin:
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def sitemap(self) -> bytes:
+        """Build the sitemap XML."""
+        urls = "".join(
+            f"<url><loc>{self.url}{PAGE_PREFIX}{i:05d}</loc>"
+            f"<lastmod>2025-01-01T00:00:00+00:00</lastmod></url>"
+            for i in range(len(self.page_sizes))
+        )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            f"{urls}</urlset>"
+        ).encode()
+
+    def _fault(self, index: int) -> int | None:
+        """Get the status injected for a page request, if any."""
+        with self._lock:
+            if index in self._faulted:
+                return None
+            if self.throttle_every and index % self.throttle_every == 0:
+                self._faulted.add(index)
+                return 429
+            if self.error_every and (index + 1) % self.error_every == 0:
+                self._faulted.add(index)
+                return 503
+        return None
+
+    def _route(self, path: str) -> tuple[int, bytes, dict[str, str]]:
+        """Answer a GET request with (status, body, headers)."""
+        if path == "/sitemap.xml":
+            return 200, self.sitemap(), {"Content-Type": "application/xml"}
+        if path == "/CHANGELOG.md":
+            return 200, make_page(0, 4_000), {"Content-Type": "text/markdown"}
+        if path.startswith(PAGE_PREFIX) and path.endswith(".md"):
+            try:
+                index = int(path[len(PAGE_PREFIX) : -len(".md")])
+                size = self.page_sizes[index]
+            except (ValueError, IndexError):
+                return 404, b"not found", {}
+            fault = self._fault(index)
+            if fault == 429:
+                return 429, b"", {"Retry-After": "0"}
+            if fault == 503:
+                return 503, b"unavailable", {}
+            body = make_page(index, size)
+            etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+            return 200, body, {"Content-Type": "text/markdown", "ETag": etag}
+        return 404, b"not found", {}
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        origin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; don't let Nagle's
+            # algorithm and delayed ACKs add 40 ms to every response
+            disable_nagle_algorithm = True
+
+            def do_GET(self) -> None:  # noqa: N802
+                if origin.latency:
+                    time.sleep(origin.latency)
+                status, body, headers = origin._route(self.path)
+                if (
+                    status == 200
+                    and headers.get("ETag")
+                    and (self.headers.get("If-None-Match") == headers["ETag"])
+                ):
+                    status, body = 304, b""
+
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with origin._lock:
+                    origin.status_counts[status] += 1
+                    origin.bytes_sent += len(body)
+
+            def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+                pass
+
+        return Handler
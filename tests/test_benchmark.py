@@ -0,0 +1,210 @@
+"""Benchmarks of fetch throughput against a local origin and hook startup.
+
+Plain ``pytest`` runs deselect them; run them alone, e.g. in a separate CI
+job, with ``pytest -m benchmark``. Each result is shown as a JSON line. DOCS_BENCH_PAGES sets the size of the synthetic sitemap (default 200;
+use thousands for tuning), DOCS_BENCH_HOOK_BUDGET_MS the startup budget of
+the PreToolUse hook (default 50) and DOCS_BENCH_REPORT names a JSON lines
+file each result is appended to.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from claude_code_docs_spa.fetcher.config import FetcherConfig
+from claude_code_docs_spa.fetcher.core import ClaudeCodeFetcher
+from claude_code_docs_spa.installer.config import InstallerConfig
+from claude_code_docs_spa.installer.helper import HelperScriptGenerator
+
+from .docs_origin import DocsOrigin
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+pytestmark = pytest.mark.benchmark
+
+BENCH_PAGES = int(os.environ.get("DOCS_BENCH_PAGES", "200"))
+
+# Budget for a PreToolUse hook run that finds a fresh update stamp
+HOOK_BUDGET_MS = float(os.environ.get("DOCS_BENCH_HOOK_BUDGET_MS", "50"))
+
+CONFIGS = {
+    "sequential": {"max_workers": 1, "requests_per_second": 0},
+    "concurrent": {"max_workers": 8, "requests_per_second": 0},
+    "adaptive_rate": {"max_workers": 8, "requests_per_second": 50},
+    "buffered": {"max_workers": 8, "requests_per_second": 0, "stream_downloads": False},
+}
+
+
+def peak_rss_mb() -> float | None:
+    """Get the peak resident set size of this process, in MiB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in KiB elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+@pytest.fixture
+def write_report(
+    pytestconfig: pytest.Config, capsys: pytest.CaptureFixture[str]
+) -> Callable[[dict[str, Any]], None]:
+    """Show benchmark results on the terminal and append them to DOCS_BENCH_REPORT.
+
+    Results are written by the terminal reporter with capturing suspended,
+    so they are shown without ``-s``.
+    """
+    terminal = pytestconfig.pluginmanager.get_plugin("terminalreporter")
+    report_path = os.environ.get("DOCS_BENCH_REPORT")
+
+    def write(result: dict[str, Any]) -> None:
+        line = json.dumps(result)
+        if terminal is not None:
+            with capsys.disabled():
+                terminal.ensure_newline()
+                terminal.write_line(line)
+        if report_path:
+            with Path(report_path).open("a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    return write
+
+
+def startup_ms(command: str | list[str], runs: int = 15) -> float:
+    """Get the median wall time of a command, in milliseconds."""
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, shell=isinstance(command, str), check=True)  # noqa: S602, S603
+        times.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(times), 2)
+
+
+def run_benchmark(
+    name: str,
+    origin: DocsOrigin,
+    docs_dir: Path,
+    write_report: Callable[[dict[str, Any]], None],
+    **config: Any,
+) -> dict[str, Any]:
+    """Fetch the whole origin once and report throughput figures."""
+    fetcher = ClaudeCodeFetcher(
+        config=FetcherConfig(
+            docs_dir=docs_dir,
+            sitemap_urls=[origin.sitemap_url],
+            changelog_url=origin.changelog_url,
+            retry_delay=0.01,
+            use_response_cache=False,
+            **config,
+        )
+    )
+    requests_before = origin.requests
+    bytes_before = origin.bytes_sent
+
+    started = time.perf_counter()
+    result = fetcher.fetch_all_documentation()
+    wall = time.perf_counter() - started
+
+    metrics = fetcher.metrics.summary()
+    report = {
+        "benchmark": name,
+        "pages": result["pages_fetched"],
+        "pages_failed": result["pages_failed"],
+        "wall_seconds": round(wall, 3),
+        "pages_per_second": round(result["pages_fetched"] / wall, 1),
+        "requests": origin.requests - requests_before,
+        "bytes_transferred": origin.bytes_sent - bytes_before,
+        "peak_rss_mb": peak_rss_mb(),
+        "latency_seconds": metrics["latency_seconds"]["total"],
+        "time_seconds": metrics["time_seconds"],
+        "config": config,
+    }
+    write_report(report)
+    return report
+
+
+@pytest.mark.parametrize("name", list(CONFIGS))
+def test_fetch_throughput(name, tmp_path, write_report):
+    """Benchmark a full fetch under each configuration."""
+    with DocsOrigin(BENCH_PAGES) as origin:
+        report = run_benchmark(
+            name, origin, tmp_path / "docs", write_report, **CONFIGS[name]
+        )
+
+    # Every page plus the changelog
+    assert report["pages"] == BENCH_PAGES + 1
+    assert report["pages_failed"] == 0
+    assert report["pages_per_second"] > 0
+    assert len(list((tmp_path / "docs").glob("page-*.md"))) == BENCH_PAGES
+
+
+def test_fetch_throughput_with_faults(tmp_path, write_report):
+    """Benchmark a fetch through injected latency, 429 and 503 replies."""
+    with DocsOrigin(
+        BENCH_PAGES, latency=0.005, throttle_every=10, error_every=25
+    ) as origin:
+        report = run_benchmark(
+            "faults",
+            origin,
+            tmp_path / "docs",
+            write_report,
+            max_workers=8,
+            requests_per_second=0,
+        )
+        statuses = dict(origin.status_counts)
+
+    assert report["pages_failed"] == 0
+    assert statuses.get(429, 0) == len(range(0, BENCH_PAGES, 10))
+    assert statuses.get(503, 0) == len(
+        [i for i in range(BENCH_PAGES) if i % 10 and (i + 1) % 25 == 0]
+    )
+
+
+def test_unchanged_refetch_transfers_no_bodies(tmp_path, write_report):
+    """Benchmark a second run, revalidated with ETags."""
+    with DocsOrigin(BENCH_PAGES) as origin:
+        config = {"max_workers": 8, "requests_per_second": 0}
+        docs_dir = tmp_path / "docs"
+        run_benchmark("first_run", origin, docs_dir, write_report, **config)
+        report = run_benchmark(
+            "unchanged_run", origin, docs_dir, write_report, **config
+        )
+        not_modified = origin.status_counts[304]
+
+    assert not_modified == BENCH_PAGES
+    assert report["pages_failed"] == 0
+
+
+def test_hook_cold_start(tmp_path, write_report):
+    """Benchmark the PreToolUse hook against a bare interpreter start."""
+    config = InstallerConfig(install_dir=tmp_path)
+    generator = HelperScriptGenerator(config)
+    generator.create_helper_script()
+    generator.create_hook_script()
+    config.update_stamp_path.touch()
+    hook = generator.generate_hook_command().replace("python", f'"{sys.executable}"', 1)
+
+    result = {
+        "benchmark": "hook_cold_start",
+        "bare_interpreter_ms": startup_ms([sys.executable, "-S", "-E", "-c", "pass"]),
+        "hook_ms": startup_ms(hook),
+        "helper_hook_check_ms": startup_ms(
+            [sys.executable, str(config.helper_script_path), "hook-check"]
+        ),
+    }
+    write_report(result)
+
+    assert result["hook_ms"] < HOOK_BUDGET_MS
+    assert result["hook_ms"] < result["helper_hook_check_ms"]
@@ -1,14 +1,53 @@
 """Tests for fetcher module."""
 
+import asyncio
+import gzip
+import hashlib
 import json
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+from datetime import UTC, datetime
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, patch
 
 import pytest
+import requests
 
+from claude_code_docs_spa.fetcher.cache import DiskResponseCache
+from claude_code_docs_spa.fetcher.circuit import CircuitBreaker, CircuitOpenError
 from claude_code_docs_spa.fetcher.config import FetcherConfig
-from claude_code_docs_spa.fetcher.core import ClaudeCodeFetcher
+from claude_code_docs_spa.fetcher.core import (
+    CHANGELOG_HEADER,
+    FALLBACK_PAGES,
+    ClaudeCodeFetcher,
+    FetchRun,
+)
+from claude_code_docs_spa.fetcher.deadline import DeadlineExceededError, RunDeadline
+from claude_code_docs_spa.fetcher.journal import JOURNAL_FILENAME, RunJournal
+from claude_code_docs_spa.fetcher.metrics import RunMetrics, percentile
+from claude_code_docs_spa.fetcher.ratelimit import (
+    AdaptiveTokenBucket,
+    HostRateLimiter,
+    TokenBucket,
+    parse_retry_after,
+)
+from claude_code_docs_spa.fetcher.search import (
+    SEARCH_INDEX_FILE,
+    build_search_index,
+    split_sections,
+    tokenize,
+)
+from claude_code_docs_spa.fetcher.sitemap import iter_sitemap_entries
+from claude_code_docs_spa.fetcher.transport import (
+    HTTP2Session,
+    TransferLog,
+    create_session,
+    supported_encodings,
+    wire_size,
+)
 
 
 class TestFetcherConfig:
@@ -504,3 +543,1878 @@ class TestClaudeCodeFetcher:
 
             assert result["fetched"] == 3
             # Should be faster with concurrent processing
+
+
+class TestTokenBucket:
+    """Test suite for the per-host token bucket rate limiter."""
+
+    def test_burst_does_not_wait(self):
+        """Test that requests within the burst capacity start immediately."""
+        bucket = TokenBucket(rate=1.0, capacity=3)
+
+        waits = [bucket.acquire() for _ in range(3)]
+
+        assert waits == [0.0, 0.0, 0.0]
+
+    def test_waits_when_bucket_is_empty(self):
+        """Test that exceeding the burst waits for a refilled token."""
+        bucket = TokenBucket(rate=50.0, capacity=1)
+
+        bucket.acquire()
+        waited = bucket.acquire()
+
+        assert 0 < waited <= 0.02 + 1e-6
+
+    def test_wait_longer_than_max_wait_is_refused(self):
+        """Test that a refused acquire neither sleeps nor takes a token."""
+        bucket = TokenBucket(rate=10.0, capacity=1)
+        bucket.acquire()
+
+        assert bucket.acquire(max_wait=0.01) is None
+        assert bucket.acquire(max_wait=0.01) is None
+        assert 0 < bucket.acquire(max_wait=0.2) <= 0.1 + 1e-6
+
+    def test_zero_rate_disables_limiting(self):
+        """Test that a zero rate never blocks."""
+        bucket = TokenBucket(rate=0, capacity=1)
+
+        assert all(bucket.acquire() == 0.0 for _ in range(10))
+
+    def test_buckets_are_per_host(self):
+        """Test that each host gets an independent bucket."""
+        limiter = HostRateLimiter(rate=1.0, capacity=1)
+
+        assert limiter.acquire("https://docs.anthropic.com/a") == 0.0
+        assert limiter.acquire("https://raw.githubusercontent.com/b") == 0.0
+        assert limiter.bucket_for("https://docs.anthropic.com/c") is (
+            limiter.bucket_for("https://docs.anthropic.com/d")
+        )
+
+
+class TestAdaptiveRateLimit:
+    """Test suite for the adaptive (AIMD) rate limiter."""
+
+    def test_retry_after_delta_seconds(self):
+        """Test parsing Retry-After given in seconds."""
+        assert parse_retry_after("120") == 120.0
+
+    def test_retry_after_http_date(self):
+        """Test parsing Retry-After given as an HTTP-date."""
+        now = datetime(2015, 10, 21, 7, 27, 30, tzinfo=UTC)
+
+        wait = parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT", now=now)
+
+        assert wait == 30.0
+
+    def test_retry_after_invalid(self):
+        """Test that missing or malformed values are ignored."""
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+
+    def test_healthy_responses_raise_rate(self):
+        """Test the additive increase up to max_rate."""
+        bucket = AdaptiveTokenBucket(rate=2.0, max_rate=2.5, increase=0.2)
+
+        for _ in range(5):
+            bucket.record(200, latency=0.1)
+
+        assert bucket.rate == 2.5
+
+    def test_slow_responses_hold_rate(self):
+        """Test that slow but successful responses don't raise the rate."""
+        bucket = AdaptiveTokenBucket(rate=2.0, target_latency=1.0)
+
+        bucket.record(200, latency=5.0)
+
+        assert bucket.rate == 2.0
+
+    def test_throttling_cuts_rate(self):
+        """Test the multiplicative decrease down to min_rate."""
+        bucket = AdaptiveTokenBucket(rate=2.0, min_rate=0.5)
+
+        bucket.record(429, latency=0.1)
+        assert bucket.rate == 1.0
+        bucket.record(503, latency=0.1)
+        bucket.record(500, latency=0.1)
+        assert bucket.rate == 0.5
+
+    def test_pause_applies_without_rate_limit(self):
+        """Test that Retry-After pauses are honoured even when unlimited."""
+        limiter = HostRateLimiter(rate=0)
+
+        limiter.pause("https://a.com/x", 0.05)
+
+        assert limiter.acquire("https://a.com/y") > 0
+        assert limiter.acquire("https://b.com/y") == 0.0
+
+    def test_429_does_not_consume_attempt(self, tmp_path):
+        """Test that a throttled request is retried beyond max_retries."""
+        config = FetcherConfig(
+            docs_dir=tmp_path, requests_per_second=0, max_retries=1, retry_delay=0
+        )
+        fetcher = ClaudeCodeFetcher(config=config)
+        session = Mock()
+        session.get.side_effect = [
+            make_response(status_code=429, headers={"Retry-After": "0"}),
+            make_response(text=VALID_MARKDOWN),
+        ]
+
+        _, content, _ = fetcher.fetch_markdown_content(
+            "/es/docs/claude-code/hooks", session, "https://x"
+        )
+
+        assert content.read_bytes() == VALID_MARKDOWN.encode("utf-8")
+        assert session.get.call_count == 2
+
+    def test_current_rate_in_run_stats(self, tmp_path):
+        """Test that the adapted rate per host is reported."""
+        config = FetcherConfig(docs_dir=tmp_path, requests_per_second=2.0)
+        fetcher = ClaudeCodeFetcher(config=config)
+        fetcher.rate_limiter.record("https://a.com/x", 429, latency=0.1)
+
+        assert fetcher.rate_limiter.current_rates() == {"a.com": 1.0}
+
+
+VALID_MARKDOWN = (
+    "# Claude Code\n\n## Uso\n\n- Primer paso\n- Segundo paso\n\n```bash\nclaude\n```\n"
+)
+
+
+class TestConcurrentFetch:
+    """Test suite for concurrent page fetching in fetch_all_documentation."""
+
+    @pytest.fixture
+    def fetcher(self, tmp_path):
+        """Create a fetcher with rate limiting disabled."""
+        config = FetcherConfig(
+            docs_dir=tmp_path / "docs", max_workers=4, requests_per_second=0
+        )
+        return ClaudeCodeFetcher(config=config)
+
+    def _run(self, fetcher, pages, fetch_page):
+        with (
+            patch.object(
+                fetcher,
+                "discover_documentation_pages",
+                return_value=(
+                    "https://example.com/sitemap.xml",
+                    "https://example.com",
+                    [(page, None) for page in pages],
+                ),
+            ),
+            patch.object(fetcher, "fetch_markdown_content", side_effect=fetch_page),
+            patch.object(
+                fetcher,
+                "fetch_changelog",
+                return_value=("changelog.md", VALID_MARKDOWN.encode("utf-8"), {}),
+            ),
+        ):
+            return fetcher.fetch_all_documentation()
+
+    def test_pages_are_fetched_in_parallel(self, fetcher):
+        """Test that pages overlap in time when several workers are used."""
+        pages = [f"/es/docs/claude-code/page{i}" for i in range(8)]
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def fetch_page(path, session, base_url, validators=None):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.05)
+            with lock:
+                active -= 1
+            return (
+                fetcher.url_to_safe_filename(path),
+                (VALID_MARKDOWN + path).encode("utf-8"),
+                {},
+            )
+
+        result = self._run(fetcher, pages, fetch_page)
+
+        assert peak > 1
+        assert result["pages_fetched"] == 9  # 8 pages + changelog
+        assert result["pages_failed"] == 0
+
+        manifest = fetcher.load_manifest()
+        assert list(manifest["files"]) == [f"page{i}.md" for i in range(8)] + [
+            "changelog.md"
+        ]
+        assert manifest["fetch_metadata"]["max_workers"] == 4
+
+    def test_failures_are_counted_per_page(self, fetcher):
+        """Test that failed pages are accounted for without aborting the run."""
+        pages = ["/es/docs/claude-code/ok", "/es/docs/claude-code/broken"]
+
+        def fetch_page(path, session, base_url, validators=None):
+            if path.endswith("broken"):
+                raise Exception("boom")
+            return (
+                fetcher.url_to_safe_filename(path),
+                VALID_MARKDOWN.encode("utf-8"),
+                {},
+            )
+
+        result = self._run(fetcher, pages, fetch_page)
+
+        assert result["pages_fetched"] == 2
+        assert result["pages_failed"] == 1
+        assert result["failed_pages"] == ["/es/docs/claude-code/broken"]
+        assert (fetcher.config.docs_dir / "ok.md").exists()
+
+    def test_unchanged_content_keeps_hash_and_timestamp(self, fetcher):
+        """Test that hash comparison still detects unchanged pages."""
+        pages = ["/es/docs/claude-code/stable"]
+
+        def fetch_page(path, session, base_url, validators=None):
+            return "stable.md", VALID_MARKDOWN.encode("utf-8"), {}
+
+        self._run(fetcher, pages, fetch_page)
+        first = fetcher.load_manifest()["files"]["stable.md"]
+        self._run(fetcher, pages, fetch_page)
+        second = fetcher.load_manifest()["files"]["stable.md"]
+
+        assert first["hash"] == second["hash"]
+        assert first["last_updated"] == second["last_updated"]
+
+    def test_max_workers_validation(self, tmp_path):
+        """Test that at least one worker is required."""
+        with pytest.raises(ValueError):
+            FetcherConfig(docs_dir=tmp_path, max_workers=0)
+
+
+class TestAsyncFetch:
+    """Test suite for the asyncio fetch pipeline."""
+
+    @pytest.fixture
+    def fetcher(self, tmp_path):
+        """Create a fetcher with rate limiting disabled."""
+        config = FetcherConfig(
+            docs_dir=tmp_path / "docs", max_workers=2, requests_per_second=0
+        )
+        return ClaudeCodeFetcher(config=config)
+
+    @pytest.fixture
+    def patched(self, fetcher):
+        """Patch discovery and HTTP fetches with slow in-memory fakes."""
+
+        def fetch_page(path, session, base_url, validators=None):
+            time.sleep(0.05)
+            return (
+                fetcher.url_to_safe_filename(path),
+                (VALID_MARKDOWN + path).encode("utf-8"),
+                {},
+            )
+
+        pages = [f"/es/docs/claude-code/page{i}" for i in range(4)]
+        with (
+            patch.object(
+                fetcher,
+                "discover_documentation_pages",
+                return_value=(
+                    "https://example.com/sitemap.xml",
+                    "https://example.com",
+                    [(page, None) for page in pages],
+                ),
+            ),
+            patch.object(fetcher, "fetch_markdown_content", side_effect=fetch_page),
+            patch.object(
+                fetcher,
+                "fetch_changelog",
+                return_value=("changelog.md", VALID_MARKDOWN.encode("utf-8"), {}),
+            ),
+        ):
+            yield pages
+
+    @pytest.mark.asyncio
+    async def test_afetch_builds_same_manifest(self, fetcher, patched):
+        """Test that the async path records pages in discovery order."""
+        result = await fetcher.afetch_all_documentation()
+
+        assert result["pages_fetched"] == 5
+        assert result["pages_failed"] == 0
+        manifest = fetcher.load_manifest()
+        assert list(manifest["files"]) == [f"page{i}.md" for i in range(4)] + [
+            "changelog.md"
+        ]
+        assert (fetcher.config.docs_dir / "page0.md").exists()
+
+    @pytest.mark.asyncio
+    async def test_afetch_does_not_block_event_loop(self, fetcher, patched):
+        """Test that other coroutines keep running during a sync."""
+        ticks = 0
+        done = asyncio.Event()
+
+        async def ticker():
+            nonlocal ticks
+            while not done.is_set():
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        ticker_task = asyncio.create_task(ticker())
+        await fetcher.afetch_all_documentation()
+        done.set()
+        await ticker_task
+
+        assert ticks > 5
+
+    @pytest.mark.asyncio
+    async def test_afetch_counts_failures(self, fetcher, patched):
+        """Test that changelog failures are accounted for in the async path."""
+        with patch.object(fetcher, "fetch_changelog", side_effect=Exception("down")):
+            result = await fetcher.afetch_all_documentation()
+
+        assert result["pages_failed"] == 1
+        assert result["failed_pages"] == ["changelog"]
+
+
+def make_response(status_code=200, text="", headers=None):
+    """Build a fake requests response."""
+    response = Mock()
+    response.status_code = status_code
+    response.text = text
+    response.content = text.encode("utf-8")
+    response.headers = headers or {}
+    response.iter_content.side_effect = lambda chunk_size=1, **kwargs: iter(
+        [response.content[i : i + 64] for i in range(0, len(response.content), 64)]
+    )
+    if status_code >= 400:
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(
+            f"{status_code} Error"
+        )
+    return response
+
+
+class TestConditionalRequests:
+    """Test suite for ETag / If-Modified-Since revalidation."""
+
+    @pytest.fixture
+    def fetcher(self, tmp_path):
+        """Create a fetcher with rate limiting disabled."""
+        config = FetcherConfig(docs_dir=tmp_path / "docs", requests_per_second=0)
+        return ClaudeCodeFetcher(config=config)
+
+    def test_validators_recorded_in_manifest_entry(self, fetcher):
+        """Test that ETag and Last-Modified are stored with the page."""
+        session = Mock()
+        session.get.return_value = make_response(
+            text=VALID_MARKDOWN,
+            headers={"ETag": '"abc"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"},
+        )
+
+        filename, entry = fetcher._process_page(
+            "/es/docs/claude-code/hooks", session, "https://example.com", {"files": {}}
+        )
+
+        assert filename == "hooks.md"
+        assert entry["etag"] == '"abc"'
+        assert entry["http_last_modified"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+        headers = session.get.call_args.kwargs["headers"]
+        assert "If-None-Match" not in headers
+        assert "Cache-Control" not in headers
+
+    def test_not_modified_keeps_previous_copy(self, fetcher):
+        """Test that a 304 reply counts as unchanged without a body."""
+        (fetcher.config.docs_dir / "hooks.md").write_text(VALID_MARKDOWN)
+        manifest = {
+            "files": {
+                "hooks.md": {
+                    "hash": "oldhash",
+                    "last_updated": "2024-01-01T00:00:00",
+                    "etag": '"abc"',
+                }
+            }
+        }
+        session = Mock()
+        session.get.return_value = make_response(status_code=304)
+
+        filename, entry = fetcher._process_page(
+            "/es/docs/claude-code/hooks", session, "https://example.com", manifest
+        )
+
+        headers = session.get.call_args.kwargs["headers"]
+        assert headers["If-None-Match"] == '"abc"'
+        assert entry["hash"] == "oldhash"
+        assert entry["last_updated"] == "2024-01-01T00:00:00"
+        assert entry["etag"] == '"abc"'
+        assert (fetcher.config.docs_dir / "hooks.md").read_text() == VALID_MARKDOWN
+
+    def test_missing_file_is_not_revalidated(self, fetcher):
+        """Test that validators are not sent when the local copy is gone."""
+        manifest = {"files": {"hooks.md": {"hash": "oldhash", "etag": '"abc"'}}}
+        session = Mock()
+        session.get.return_value = make_response(text=VALID_MARKDOWN)
+
+        fetcher._process_page(
+            "/es/docs/claude-code/hooks", session, "https://example.com", manifest
+        )
+
+        headers = session.get.call_args.kwargs["headers"]
+        assert "If-None-Match" not in headers
+        assert (fetcher.config.docs_dir / "hooks.md").exists()
+
+    def test_conditional_requests_can_be_disabled(self, tmp_path):
+        """Test that disabling revalidation restores the no-cache headers."""
+        config = FetcherConfig(docs_dir=tmp_path, conditional_requests=False)
+        fetcher = ClaudeCodeFetcher(config=config)
+
+        headers = fetcher._request_headers({"etag": '"abc"'})
+
+        assert headers == config.headers
+        assert "If-None-Match" not in headers
+
+    def test_changelog_not_modified(self, fetcher):
+        """Test that the changelog is revalidated with its Last-Modified."""
+        (fetcher.config.docs_dir / "changelog.md").write_text(VALID_MARKDOWN)
+        manifest = {
+            "files": {
+                "changelog.md": {
+                    "hash": "oldhash",
+                    "http_last_modified": "Mon, 01 Jan 2024 00:00:00 GMT",
+                }
+            }
+        }
+        session = Mock()
+        session.get.return_value = make_response(status_code=304)
+
+        filename, entry = fetcher._process_changelog(session, manifest)
+
+        headers = session.get.call_args.kwargs["headers"]
+        assert headers["If-Modified-Since"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+        assert filename == "changelog.md"
+        assert entry["hash"] == "oldhash"
+
+
+SITEMAP_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://docs.anthropic.com/es/docs/claude-code/hooks</loc></url>
+  <url><loc>https://docs.anthropic.com/es/docs/claude-code/setup/</loc></url>
+  <url><loc>https://docs.anthropic.com/en/docs/claude-code/hooks</loc></url>
+  <url><loc>https://docs.anthropic.com/es/docs/claude-code/api/x</loc></url>
+</urlset>
+"""
+
+
+class TestSitemapDiscovery:
+    """Test suite for single-download sitemap discovery."""
+
+    @pytest.fixture
+    def fetcher(self, tmp_path):
+        """Create a fetcher with a single sitemap URL."""
+        config = FetcherConfig(
+            docs_dir=tmp_path / "docs",
+            sitemap_urls=["https://docs.anthropic.com/sitemap.xml"],
+            requests_per_second=0,
+        )
+        return ClaudeCodeFetcher(config=config)
+
+    def test_sitemap_downloaded_once(self, fetcher):
+        """Test that base URL and pages come from one sitemap request."""
+        session = Mock()
+        session.get.return_value = make_response(text=SITEMAP_XML)
+
+        sitemap_url, base_url, pages = fetcher.discover_documentation_pages(session)
+
+        assert session.get.call_count == 1
+        assert sitemap_url == "https://docs.anthropic.com/sitemap.xml"
+        assert base_url == "https://docs.anthropic.com"
+        assert pages == [
+            ("/es/docs/claude-code/hooks", None),
+            ("/es/docs/claude-code/setup", None),
+        ]
+
+    def test_sitemap_revalidated_from_disk_cache(self, fetcher):
+        """Test that the next run sends validators and reuses the cached body."""
+        session = Mock()
+        session.get.return_value = make_response(
+            text=SITEMAP_XML, headers={"ETag": '"v1"'}
+        )
+        fetcher.discover_documentation_pages(session)
+
+        session.get.return_value = make_response(status_code=304)
+        _, _, pages = fetcher.discover_documentation_pages(session)
+
+        headers = session.get.call_args.kwargs["headers"]
+        assert headers["If-None-Match"] == '"v1"'
+        assert pages == [
+            ("/es/docs/claude-code/hooks", None),
+            ("/es/docs/claude-code/setup", None),
+        ]
+
+    def test_invalid_sitemap_raises(self, fetcher):
+        """Test that an unparseable sitemap is skipped."""
+        session = Mock()
+        session.get.return_value = make_response(text="not xml")
+
+        with pytest.raises(Exception, match="No valid sitemap found"):
+            fetcher.discover_documentation_pages(session)
+
+    def test_discovery_failure_uses_fallback_pages(self, fetcher):
+        """Test that the run falls back to the built-in page list."""
+        run = FetchRun()
+        with patch.object(
+            fetcher, "discover_documentation_pages", side_effect=Exception("down")
+        ):
+            fetcher._discover_documentation(Mock(), run)
+
+        assert run.sitemap_url is None
+        assert run.pages == FALLBACK_PAGES
+
+
+SITEMAP_INDEX_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://docs.anthropic.com/sitemap-en.xml</loc></sitemap>
+  <sitemap><loc>https://docs.anthropic.com/sitemap-es.xml</loc></sitemap>
+</sitemapindex>
+"""
+
+
+class TestStreamingSitemap:
+    """Test suite for the streaming sitemap parser."""
+
+    def test_parses_urlset_in_small_chunks(self):
+        """Test that entries are parsed from arbitrarily split chunks."""
+        data = SITEMAP_XML.encode("utf-8")
+        chunks = [data[i : i + 7] for i in range(0, len(data), 7)]
+
+        entries = list(iter_sitemap_entries(chunks))
+
+        assert len(entries) == 4
+        assert entries[0] == (
+            "url",
+            "https://docs.anthropic.com/es/docs/claude-code/hooks",
+            None,
+        )
+
+    def test_parses_without_namespace_and_lastmod(self):
+        """Test sitemaps without the sitemaps.org namespace."""
+        xml = (
+            b"<urlset><url><loc> https://a.com/x </loc>"
+            b"<lastmod>2024-05-01</lastmod></url></urlset>"
+        )
+
+        assert list(iter_sitemap_entries([xml])) == [
+            ("url", "https://a.com/x", "2024-05-01")
+        ]
+
+    def test_parses_sitemap_index(self):
+        """Test that sitemap index children are reported as sitemaps."""
+        entries = list(iter_sitemap_entries([SITEMAP_INDEX_XML.encode("utf-8")]))
+
+        assert [kind for kind, _, _ in entries] == ["sitemap", "sitemap"]
+
+    def test_malformed_xml_raises(self):
+        """Test that malformed XML raises a parse error."""
+        with pytest.raises(ET.ParseError):
+            list(iter_sitemap_entries([b"<urlset><url>"]))
+
+    def test_base_url_discovery_stops_early(self, tmp_path):
+        """Test that base URL discovery does not read the whole sitemap."""
+        config = FetcherConfig(
+            docs_dir=tmp_path / "docs",
+            sitemap_urls=["https://docs.anthropic.com/sitemap.xml"],
+            requests_per_second=0,
+        )
+        fetcher = ClaudeCodeFetcher(config=config)
+        data = SITEMAP_XML.encode("utf-8")
+        consumed = []
+
+        def chunks(chunk_size=1, **kwargs):
+            for i in range(0, len(data), 32):
+                consumed.append(i)
+                yield data[i : i + 32]
+
+        response = make_response(text=SITEMAP_XML)
+        response.iter_content.side_effect = chunks
+        session = Mock()
+        session.get.return_value = response
+
+        sitemap_url, base_url = fetcher.discover_sitemap_and_base_url(session)
+
+        assert base_url == "https://docs.anthropic.com"
+        assert len(consumed) < len(range(0, len(data), 32))
+        # A partially read sitemap must not replace the cached copy
+        assert fetcher.response_cache.lookup(sitemap_url) is None
+
+    def test_sitemap_index_children_are_followed(self, tmp_path):
+        """Test that pages are collected from every child sitemap."""
+        config = FetcherConfig(
+            docs_dir=tmp_path / "docs",
+            sitemap_urls=["https://docs.anthropic.com/sitemap_index.xml"],
+            requests_per_second=0,
+        )
+        fetcher = ClaudeCodeFetcher(config=config)
+        bodies = {
+            "https://docs.anthropic.com/sitemap_index.xml": SITEMAP_INDEX_XML,
+            "https://docs.anthropic.com/sitemap-en.xml": (
+                '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                "<url><loc>https://docs.anthropic.com/en/docs/claude-code/a</loc></url>"
+                "</urlset>"
+            ),
+            "https://docs.anthropic.com/sitemap-es.xml": SITEMAP_XML,
+        }
+        session = Mock()
+        session.get.side_effect = lambda url, **kwargs: make_response(text=bodies[url])
+
+        sitemap_url, base_url, pages = fetcher.discover_documentation_pages(session)
+
+        assert session.get.call_count == 3
+        assert sitemap_url == "https://docs.anthropic.com/sitemap_index.xml"
+        assert base_url == "https://docs.anthropic.com"
+        assert pages == [
+            ("/es/docs/claude-code/hooks", None),
+            ("/es/docs/claude-code/setup", None),
+        ]
+
+
+class TestIncrementalSync:
+    """Test suite for sitemap lastmod-driven incremental sync."""
+
+    PAGES = [
+        ("/es/docs/claude-code/hooks", "2024-05-01"),
+        ("/es/docs/claude-code/setup", "2024-05-01"),
+    ]
+
+    @pytest.fixture
+    def fetcher(self, tmp_path):
+        """Create an incremental fetcher with rate limiting disabled."""
+        config = FetcherConfig(
+            docs_dir=tmp_path / "docs", requests_per_second=0, incremental=True
+        )
+        return ClaudeCodeFetcher(config=config)
+
+    def _run(self, fetcher, pages):
+        fetched = []
+
+        def fetch_page(path, session, base_url, validators=None):
+            fetched.append(path)
+            return (
+                fetcher.url_to_safe_filename(path),
+                (VALID_MARKDOWN + path).encode("utf-8"),
+                {},
+            )
+
+        with (
+            patch.object(
+                fetcher,
+                "discover_documentation_pages",
+                return_value=("https://example.com/sitemap.xml", "https://x", pages),
+            ),
+            patch.object(fetcher, "fetch_markdown_content", side_effect=fetch_page),
+            patch.object(
+                fetcher,
+                "fetch_changelog",
+                return_value=("changelog.md", VALID_MARKDOWN.encode("utf-8"), {}),
+            ),
+        ):
+            result = fetcher.fetch_all_documentation()
+        return result, fetched
+
+    def test_lastmod_recorded_in_manifest(self, fetcher):
+        """Test that the sitemap lastmod is remembered per page."""
+        self._run(fetcher, self.PAGES)
+
+        files = fetcher.load_manifest()["files"]
+        assert files["hooks.md"]["sitemap_lastmod"] == "2024-05-01"
+
+    def test_only_changed_lastmod_is_fetched(self, fetcher):
+        """Test that pages with an unchanged lastmod are not requested."""
+        self._run(fetcher, self.PAGES)
+
+        updated = [self.PAGES[0], ("/es/docs/claude-code/setup", "2024-06-01")]
+        result, fetched = self._run(fetcher, updated)
+
+        assert fetched == ["/es/docs/claude-code/setup"]
+        assert result["pages_skipped"] == 1
+        manifest = fetcher.load_manifest()
+        assert set(manifest["files"]) == {"hooks.md", "setup.md", "changelog.md"}
+        assert manifest["files"]["setup.md"]["sitemap_lastmod"] == "2024-06-01"
+        assert manifest["fetch_metadata"]["incremental"] is True
+
+    def test_missing_file_is_refetched(self, fetcher):
+        """Test that a deleted local copy is fetched despite its lastmod."""
+        self._run(fetcher, self.PAGES)
+        (fetcher.config.docs_dir / "hooks.md").unlink()
+
+        _, fetched = self._run(fetcher, self.PAGES)
+
+        assert fetched == ["/es/docs/claude-code/hooks"]
+
+    def test_full_sweep_when_interval_elapsed(self, fetcher):
+        """Test the periodic full-sweep fallback."""
+        self._run(fetcher, self.PAGES)
+        manifest = fetcher.load_manifest()
+        manifest["fetch_metadata"]["last_full_sweep"] = "2000-01-01T00:00:00"
+        fetcher.save_manifest(manifest)
+
+        _, fetched = self._run(fetcher, self.PAGES)
+
+        assert len(fetched) == 2
+        sweep = fetcher.load_manifest()["fetch_metadata"]["last_full_sweep"]
+        assert sweep > "2000-01-01T00:00:00"
+
+
+class TestResponseCache:
+    """Test suite for the on-disk response cache."""
+
+    URL = "https://docs.anthropic.com/es/docs/claude-code/hooks.md"
+
+    def test_store_and_lookup_persist(self, tmp_path):
+        """Test that stored bodies survive a new cache instance."""
+        cache = DiskResponseCache(tmp_path)
+        cache.store(self.URL, b"body", {"etag": '"v1"'})
+
+        reloaded = DiskResponseCache(tmp_path)
+        entry = reloaded.lookup(self.URL)
+
+        assert entry is not None
+        assert reloaded.read_body(entry) == b"body"
+        assert entry.validators == {"etag": '"v1"'}
+
+    def test_identical_bodies_are_stored_once(self, tmp_path):
+        """Test content-addressed deduplication."""
+        cache = DiskResponseCache(tmp_path)
+        cache.store(self.URL, b"same", {})
+        cache.store(self.URL + "?v=2", b"same", {})
+
+        assert len(list(tmp_path.glob("objects/*/*"))) == 1
+        assert cache.total_bytes() == 4
+
+    def test_least_recently_used_entries_are_evicted(self, tmp_path):
+        """Test that the cache stays under max_bytes."""
+        cache = DiskResponseCache(tmp_path, max_bytes=10)
+        cache.store("https://a.com/1", b"a" * 6, {})
+        cache.store("https://a.com/2", b"b" * 6, {})
+
+        assert cache.lookup("https://a.com/1") is None
+        assert cache.lookup("https://a.com/2") is not None
+        assert len(list(tmp_path.glob("objects/*/*"))) == 1
+
+    def test_abandoned_stream_is_not_cached(self, tmp_path):
+        """Test that a partially consumed stream leaves no entry behind."""
+        cache = DiskResponseCache(tmp_path)
+        stream = cache.store_stream(self.URL, [b"a", b"b", b"c"], {})
+
+        assert next(stream) == b"a"
+        stream.close()
+
+        assert cache.lookup(self.URL) is None
+        assert not list(tmp_path.glob("tmp/*"))
+
+    def test_fresh_entry_is_served_without_request(self, tmp_path):
+        """Test that a cached page within the TTL skips the network."""
+        config = FetcherConfig(
+            docs_dir=tmp_path / "docs", requests_per_second=0, cache_ttl_seconds=60
+        )
+        fetcher = ClaudeCodeFetcher(config=config)
+        session = Mock()
+        session.get.return_value = make_response(text=VALID_MARKDOWN)
+
+        fetcher.fetch_markdown_content("/es/docs/claude-code/hooks", session, "")
+        _, content, _ = fetcher.fetch_markdown_content(
+            "/es/docs/claude-code/hooks", session, ""
+        )
+
+        assert content.read_bytes() == VALID_MARKDOWN.encode("utf-8")
+        assert session.get.call_count == 1
+
+    def test_stale_entry_is_revalidated(self, tmp_path):
+        """Test that a 304 for a stale entry serves the cached body."""
+        config = FetcherConfig(docs_dir=tmp_path / "docs", requests_per_second=0)
+        fetcher = ClaudeCodeFetcher(config=config)
+        session = Mock()
+        session.get.side_effect = [
+            make_response(text=VALID_MARKDOWN, headers={"ETag": '"v1"'}),
+            make_response(status_code=304),
+        ]
+
+        fetcher.fetch_markdown_content("/es/docs/claude-code/hooks", session, "")
+        _, content, _ = fetcher.fetch_markdown_content(
+            "/es/docs/claude-code/hooks", session, ""
+        )
+
+        assert content.read_bytes() == VALID_MARKDOWN.encode("utf-8")
+        headers = session.get.call_args_list[1].kwargs["headers"]
+        assert headers["If-None-Match"] == '"v1"'
+
+    def test_not_modified_copy_on_disk_skips_cache(self, tmp_path):
+        """Test that a 304 for the caller's own validators is passed through."""
+        config = FetcherConfig(docs_dir=tmp_path / "docs", requests_per_second=0)
+        fetcher = ClaudeCodeFetcher(config=config)
+        session = Mock()
+        session.get.side_effect = [
+            make_response(text=VALID_MARKDOWN, headers={"ETag": '"v1"'}),
+            make_response(status_code=304),
+        ]
+
+        fetcher.fetch_markdown_content("/es/docs/claude-code/hooks", session, "")
+        _, content, validators = fetcher.fetch_markdown_content(
+            "/es/docs/claude-code/hooks", session, "", validators={"etag": '"v0"'}
+        )
+
+        assert content is None
+        assert validators == {"etag": '"v0"'}
+        headers = session.get.call_args_list[1].kwargs["headers"]
+        assert headers["If-None-Match"] == '"v0"'
+
+    def test_cache_stays_outside_docs_dir(self, tmp_path):
+        """Test that the default cache is not published with the docs."""
+        config = FetcherConfig(docs_dir=tmp_path / "docs")
+
+        assert config.cache_dir == tmp_path / ".docs-cache"
+
+    def test_cache_can_be_disabled(self, tmp_path):
+        """Test that use_response_cache=False leaves no cache behind."""
+        config = FetcherConfig(docs_dir=tmp_path / "docs", use_response_cache=False)
+
+        assert ClaudeCodeFetcher(config=config).response_cache is None
+
+
+class TestResumableSync:
+    """Test suite for checkpointed, resumable fetch runs."""
+
+    PAGES = [
+        ("/es/docs/claude-code/hooks", None),
+        ("/es/docs/claude-code/setup", None),
+    ]
+
+    def _fetcher(self, tmp_path, **kwargs):
+        config = FetcherConfig(
+            docs_dir=tmp_path / "docs", requests_per_second=0, max_workers=1, **kwargs
+        )
+        return ClaudeCodeFetcher(config=config)
+
+    def _run(self, fetcher, interrupt_at=None):
+        fetched = []
+
+        def fetch_page(path, session, base_url, validators=None):
+            if path == interrupt_at:
+                raise KeyboardInterrupt
+            fetched.append(path)
+            return (
+                fetcher.url_to_safe_filename(path),
+                (VALID_MARKDOWN + path).encode("utf-8"),
+                {},
+            )
+
+        with (
+            patch.object(
+                fetcher,
+                "discover_documentation_pages",
+                return_value=("https://x/sitemap.xml", "https://x", self.PAGES),
+            ),
+            patch.object(fetcher, "fetch_markdown_content", side_effect=fetch_page),
+            patch.object(
+                fetcher,
+                "fetch_changelog",
+                return_value=("changelog.md", VALID_MARKDOWN.encode("utf-8"), {}),
+            ),
+        ):
+            result = fetcher.fetch_all_documentation()
+        return result, fetched
+
+    def test_interrupted_run_is_resumed(self, tmp_path):
+        """Test that --resume only fetches the pages left by the interruption."""
+        with pytest.raises(KeyboardInterrupt):
+            self._run(self._fetcher(tmp_path), interrupt_at=self.PAGES[1][0])
+
+        fetcher = self._fetcher(tmp_path, resume=True)
+        result, fetched = self._run(fetcher)
+
+        assert fetched == ["/es/docs/claude-code/setup"]
+        assert result["pages_resumed"] == 1
+        assert result["pages_fetched"] == 2
+        manifest = fetcher.load_manifest()
+        assert set(manifest["files"]) == {"hooks.md", "setup.md", "changelog.md"}
+        assert not (fetcher.config.cache_dir / JOURNAL_FILENAME).exists()
+
+    def test_without_resume_everything_is_fetched(self, tmp_path):
+        """Test that a stale journal is ignored unless resuming."""
+        with pytest.raises(KeyboardInterrupt):
+            self._run(self._fetcher(tmp_path), interrupt_at=self.PAGES[1][0])
+
+        _, fetched = self._run(self._fetcher(tmp_path))
+
+        assert len(fetched) == 2
+
+    def test_failed_run_closes_journal(self, tmp_path):
+        """Test that a run without any fetched page releases its journal."""
+        fetcher = self._fetcher(tmp_path)
+        run = FetchRun()
+        run.journal = RunJournal(fetcher.config.cache_dir / JOURNAL_FILENAME)
+        run.journal.start({"base_url": "https://x"})
+        fetcher._start_run()
+
+        with pytest.raises(RuntimeError):
+            fetcher._finalize_run(run, {"files": {}})
+
+        assert run.journal._file is None
+        assert run.journal.path.exists()
+
+    def test_truncated_journal_record_is_ignored(self, tmp_path):
+        """Test that a partially written last record does not break loading."""
+        journal = RunJournal(tmp_path / JOURNAL_FILENAME)
+        journal.start({"base_url": "https://x"})
+        journal.record("/a", "a.md", {"hash": "1"})
+        journal.close()
+        with journal.path.open("a") as f:
+            f.write('{"page": "/b", "filen')
+
+        header, completed = journal.load()
+
+        assert header == {"base_url": "https://x"}
+        assert completed == {"/a": ("a.md", {"hash": "1"})}
+
+    def test_resumes_after_torn_write_keep_their_records(self, tmp_path):
+        """Test that records appended after a torn write survive the next resume."""
+        journal = RunJournal(tmp_path / JOURNAL_FILENAME)
+        journal.start({"base_url": "https://x"})
+        journal.record("/a", "a.md", {"hash": "1"})
+        journal.close()
+        with journal.path.open("a") as f:
+            f.write('{"page": "/b", "filen')
+
+        for page in ("/b", "/c"):
+            journal.start({"base_url": "https://x"}, append=True)
+            journal.record(page, page[1:] + ".md", {"hash": page})
+            journal.close()
+
+        _, completed = journal.load()
+
+        assert set(completed) == {"/a", "/b", "/c"}
+
+
+class TestTransport:
+    """Test suite for the fetch session transport."""
+
+    def test_pool_sized_to_workers(self, tmp_path):
+        """Test that the connection pool holds a connection per worker."""
+        config = FetcherConfig(docs_dir=tmp_path, max_workers=12)
+
+        with create_session(config) as session:
+            adapter = session.get_adapter("https://docs.anthropic.com/")
+
+            assert adapter._pool_maxsize == 12
+            assert session.headers["Connection"] == "keep-alive"
+
+    def test_http2_requires_optional_dependency(self, tmp_path, monkeypatch):
+        """Test that a missing h2 package fails with an install hint."""
+        monkeypatch.setitem(sys.modules, "h2", None)
+        config = FetcherConfig(docs_dir=tmp_path, http2=True)
+
+        with pytest.raises(ImportError, match="httpx\\[http2\\]"):
+            create_session(config)
+
+    def test_httpx_response_conversion(self):
+        """Test that httpx responses behave like requests responses."""
+        httpx = pytest.importorskip("httpx")
+        response = httpx.Response(
+            404,
+            headers={"ETag": '"v1"'},
+            content=b"missing",
+            request=httpx.Request("GET", "https://docs.anthropic.com/x.md"),
+        )
+
+        converted = HTTP2Session._to_requests_response(response, stream=False)
+
+        assert converted.headers["etag"] == '"v1"'
+        assert converted.text == "missing"
+        with pytest.raises(requests.exceptions.HTTPError):
+            converted.raise_for_status()
+
+    def test_httpx_streamed_response_conversion(self):
+        """Test that streamed httpx bodies are readable through iter_content."""
+        httpx = pytest.importorskip("httpx")
+        response = httpx.Response(
+            200,
+            stream=httpx.ByteStream(SITEMAP_XML.encode("utf-8")),
+            request=httpx.Request("GET", "https://docs.anthropic.com/sitemap.xml"),
+        )
+
+        converted = HTTP2Session._to_requests_response(response, stream=True)
+
+        assert b"".join(converted.iter_content(chunk_size=16)) == (
+            SITEMAP_XML.encode("utf-8")
+        )
+
+    def test_httpx_buffered_response_keeps_wire_size(self):
+        """Test that a buffered gzip body reports its compressed size."""
+        httpx = pytest.importorskip("httpx")
+        body = VALID_MARKDOWN.encode("utf-8") * 20
+        compressed = gzip.compress(body)
+        response = httpx.Response(
+            200,
+            headers={"Content-Encoding": "gzip"},
+            stream=httpx.ByteStream(compressed),
+            request=httpx.Request("GET", "https://docs.anthropic.com/x.md"),
+        )
+        response.read()
+
+        converted = HTTP2Session._to_requests_response(response, stream=False)
+        record = TransferLog().record(
+            "https://docs.anthropic.com/x.md", converted, len(converted.content)
+        )
+
+        assert converted.content == body
+        assert record["wire_bytes"] == len(compressed)
+        assert record["wire_bytes"] < record["decoded_bytes"]
+
+
+class TestTransferAccounting:
+    """Test suite for content-coding negotiation and wire-size accounting."""
+
+    def test_gzip_always_offered(self, tmp_path):
+        """Test that the stdlib codecs are always negotiated."""
+        config = FetcherConfig(docs_dir=tmp_path)
+
+        assert "gzip" in config.accept_encoding
+        assert config.headers["Accept-Encoding"] == config.accept_encoding
+        assert config.conditional_headers["Accept-Encoding"] == config.accept_encoding
+
+    def test_missing_codec_is_not_offered(self, monkeypatch):
+        """Test that br / zstd are only offered when they can be decoded."""
+        monkeypatch.setattr(
+            "claude_code_docs_spa.fetcher.transport.importlib.util.find_spec",
+            lambda name: object() if name == "brotlicffi" else None,
+        )
+
+        assert supported_encodings(http2=True) == ["br", "gzip", "deflate"]
+
+    def test_wire_size_prefers_stream_position(self):
+        """Test that the encoded byte count is taken from the raw stream."""
+        response = make_response(text="x" * 500, headers={"Content-Length": "90"})
+        response.raw.tell.return_value = 80
+
+        assert wire_size(response) == 80
+
+        response.raw.tell.return_value = 0
+        assert wire_size(response) == 90
+
+    def test_summary_reports_compression(self):
+        """Test totals and compression ratio of a run's transfers."""
+        log = TransferLog()
+        page = make_response(headers={"Content-Encoding": "gzip"})
+        cached = make_response(headers={"X-Cache": "HIT"})
+
+        log.record("https://x/a.md", page, decoded_bytes=1000, wire_bytes=200)
+        log.record("https://x/b.md", cached, decoded_bytes=500)
+
+        summary = log.summary()
+        assert summary["requests"] == 2
+        assert summary["wire_bytes"] == 200
+        assert summary["decoded_bytes"] == 1500
+        assert summary["compression_ratio"] == 5.0
+        assert summary["per_request"][0]["content_encoding"] == "gzip"
+        assert summary["per_request"][1]["cache"] == "HIT"
+
+    def test_requests_are_logged(self, tmp_path):
+        """Test that page requests are recorded with their sizes."""
+        config = FetcherConfig(docs_dir=tmp_path, requests_per_second=0)
+        fetcher = ClaudeCodeFetcher(config=config)
+        response = make_response(text=VALID_MARKDOWN, headers={"Content-Length": "40"})
+        response.raw.tell.return_value = None
+        session = Mock()
+        session.get.return_value = response
+
+        fetcher.fetch_markdown_content("/es/docs/claude-code/hooks", session, "")
+
+        (record,) = fetcher.transfer_log.summary()["per_request"]
+        assert record["wire_bytes"] == 40
+        assert record["decoded_bytes"] == len(VALID_MARKDOWN.encode("utf-8"))
+
+
+class TestBytesPipeline:
+    """Test suite for the bytes-native fetch, hash and write pipeline."""
+
+    BODY = (VALID_MARKDOWN + "\nConfiguración rápida ✓\n").encode("utf-8")
+
+    @pytest.fixture
+    def fetcher(self, tmp_path):
+        """Create a fetcher with rate limiting disabled."""
+        config = FetcherConfig(docs_dir=tmp_path / "docs", requests_per_second=0)
+        return ClaudeCodeFetcher(config=config)
+
+    def _session(self):
+        response = make_response()
+        response.content = self.BODY
+        # Decoding through .text would trigger charset detection
+        type(response).text = property(lambda _: pytest.fail("decoded via .text"))
+        session = Mock()
+        session.get.return_value = response
+        return session
+
+    def test_body_is_written_byte_for_byte(self, fetcher):
+        """Test that the response bytes reach disk unchanged."""
+        filename, entry = fetcher._process_page(
+            "/es/docs/claude-code/hooks", self._session(), "", {"files": {}}
+        )
+
+        assert (fetcher.config.docs_dir / filename).read_bytes() == self.BODY
+        assert entry["hash"] == hashlib.sha256(self.BODY).hexdigest()
+
+    def test_body_is_hashed_once(self, tmp_path):
+        """Test that a changed, buffered page is hashed a single time."""
+        config = FetcherConfig(
+            docs_dir=tmp_path, requests_per_second=0, stream_downloads=False
+        )
+        fetcher = ClaudeCodeFetcher(config=config)
+        with patch.object(
+            fetcher, "content_hash", wraps=fetcher.content_hash
+        ) as content_hash:
+            fetcher._process_page(
+                "/es/docs/claude-code/hooks", self._session(), "", {"files": {}}
+            )
+
+        assert content_hash.call_count == 1
+
+    def test_missing_file_with_unchanged_hash_is_rewritten(self, fetcher):
+        """Test that an unchanged page is restored if its file was deleted."""
+        manifest = {
+            "files": {"hooks.md": {"hash": hashlib.sha256(self.BODY).hexdigest()}}
+        }
+
+        fetcher._process_page(
+            "/es/docs/claude-code/hooks", self._session(), "", manifest
+        )
+
+        assert (fetcher.config.docs_dir / "hooks.md").read_bytes() == self.BODY
+
+    def test_changelog_header_prepended_to_raw_body(self, fetcher):
+        """Test that the changelog is assembled from bytes."""
+        filename, content, _ = fetcher.fetch_changelog(self._session())
+
+        assert filename == "changelog.md"
+        assert content.read_bytes() == CHANGELOG_HEADER + self.BODY
+
+
+class TestStreamingDownload:
+    """Test suite for streaming page bodies to disk."""
+
+    @pytest.fixture
+    def fetcher(self, tmp_path):
+        """Create a streaming fetcher with rate limiting disabled."""
+        config = FetcherConfig(
+            docs_dir=tmp_path / "docs", requests_per_second=0, max_body_bytes=4096
+        )
+        return ClaudeCodeFetcher(config=config)
+
+    def _session(self, response):
+        session = Mock()
+        session.get.return_value = response
+        return session
+
+    def test_body_is_hashed_while_streaming(self, fetcher):
+        """Test that a streamed page is hashed on the way to disk."""
+        body = VALID_MARKDOWN.encode("utf-8")
+        session = self._session(make_response(text=VALID_MARKDOWN))
+
+        with patch.object(fetcher, "content_hash") as content_hash:
+            filename, entry = fetcher._process_page(
+                "/es/docs/claude-code/hooks", session, "", {"files": {}}
+            )
+
+        content_hash.assert_not_called()
+        assert entry["hash"] == hashlib.sha256(body).hexdigest()
+        assert (fetcher.config.docs_dir / filename).read_bytes() == body
+        assert not list(fetcher.config.docs_dir.glob(".*.part"))
+
+    def test_oversized_body_is_aborted(self, fetcher):
+        """Test that the download stops once the size cap is crossed."""
+        response = make_response(text=VALID_MARKDOWN * 200)
+        chunks_read = []
+        response.iter_content.side_effect = lambda chunk_size=1, **kwargs: (
+            chunks_read.append(i) or response.content[i : i + 1024]
+            for i in range(0, len(response.content), 1024)
+        )
+
+        with pytest.raises(ValueError, match="exceeds 4096 bytes"):
+            fetcher.fetch_markdown_content(
+                "/es/docs/claude-code/hooks", self._session(response), ""
+            )
+
+        assert len(chunks_read) == 5
+        assert not list(fetcher.config.docs_dir.glob(".*.part"))
+        assert fetcher.response_cache.lookup("/es/docs/claude-code/hooks.md") is None
+
+    def test_html_is_rejected_before_download_completes(self, fetcher):
+        """Test that an HTML error page is detected from its first bytes."""
+        html = "<!DOCTYPE html><html>" + "x" * 3000
+
+        with pytest.raises(ValueError, match="HTML"):
+            fetcher.fetch_markdown_content(
+                "/es/docs/claude-code/hooks",
+                self._session(make_response(text=html)),
+                "",
+            )
+
+        assert not list(fetcher.config.docs_dir.glob("*.md"))
+        assert not list(fetcher.config.docs_dir.glob(".*.part"))
+
+    def test_unchanged_body_is_discarded(self, fetcher):
+        """Test that an unchanged staged body does not touch the file."""
+        session = self._session(make_response(text=VALID_MARKDOWN))
+        _, entry = fetcher._process_page(
+            "/es/docs/claude-code/hooks", session, "", {"files": {}}
+        )
+        path = fetcher.config.docs_dir / "hooks.md"
+        mtime = path.stat().st_mtime_ns
+
+        session = self._session(make_response(text=VALID_MARKDOWN))
+        fetcher._process_page(
+            "/es/docs/claude-code/hooks", session, "", {"files": {"hooks.md": entry}}
+        )
+
+        assert path.stat().st_mtime_ns == mtime
+        assert not list(fetcher.config.docs_dir.glob(".*.part"))
+
+    @pytest.mark.parametrize("status_code", [304, 404, 429, 503])
+    def test_unread_reply_releases_connection(self, fetcher, status_code):
+        """Test that a streamed reply the caller never reads is closed."""
+        response = make_response(status_code=status_code)
+        session = self._session(response)
+
+        fetcher._get(session, "https://docs.anthropic.com/x.md", stream=True)
+
+        response.close.assert_called_once()
+
+
+class TestContentDigests:
+    """Test suite for selectable manifest digests."""
+
+    BODY = VALID_MARKDOWN.encode("utf-8")
+    PAGE = "/es/docs/claude-code/hooks"
+
+    def _fetcher(self, tmp_path, **kwargs):
+        config = FetcherConfig(docs_dir=tmp_path, requests_per_second=0, **kwargs)
+        return ClaudeCodeFetcher(config=config)
+
+    def _session(self):
+        session = Mock()
+        session.get.return_value = make_response(text=VALID_MARKDOWN)
+        return session
+
+    def test_unsupported_algorithm_rejected(self):
+        """Test that unknown digests are rejected up front."""
+        with pytest.raises(ValueError, match="hash_algorithm"):
+            FetcherConfig(hash_algorithm="md4")
+
+    @pytest.mark.parametrize("stream_downloads", [True, False])
+    def test_entry_records_algorithm(self, tmp_path, stream_downloads):
+        """Test that entries carry the digest they were hashed with."""
+        fetcher = self._fetcher(
+            tmp_path, hash_algorithm="blake2b", stream_downloads=stream_downloads
+        )
+
+        _, entry = fetcher._process_page(self.PAGE, self._session(), "", {"files": {}})
+
+        assert entry["hash_algorithm"] == "blake2b"
+        assert entry["hash"] == hashlib.blake2b(self.BODY).hexdigest()
+
+    @pytest.mark.parametrize("stream_downloads", [True, False])
+    def test_untagged_sha256_entry_is_unchanged(self, tmp_path, stream_downloads):
+        """Test that switching digests does not rewrite unchanged files."""
+        fetcher = self._fetcher(
+            tmp_path, hash_algorithm="blake2b", stream_downloads=stream_downloads
+        )
+        (tmp_path / "hooks.md").write_bytes(self.BODY)
+        manifest = {
+            "files": {
+                "hooks.md": {
+                    "hash": hashlib.sha256(self.BODY).hexdigest(),
+                    "last_updated": "2024-01-01T00:00:00",
+                }
+            }
+        }
+
+        with patch.object(fetcher, "save_markdown_file") as save:
+            _, entry = fetcher._process_page(self.PAGE, self._session(), "", manifest)
+
+        save.assert_not_called()
+        assert entry["last_updated"] == "2024-01-01T00:00:00"
+        assert entry["hash_algorithm"] == "blake2b"
+        assert entry["hash"] == hashlib.blake2b(self.BODY).hexdigest()
+
+    def test_verify_files_uses_each_entry_algorithm(self, tmp_path):
+        """Test mirror verification over a manifest mixing digests."""
+        fetcher = self._fetcher(tmp_path)
+        (tmp_path / "a.md").write_bytes(b"a")
+        (tmp_path / "b.md").write_bytes(b"b")
+        (tmp_path / "c.md").write_bytes(b"tampered")
+        manifest = {
+            "files": {
+                "a.md": {"hash": hashlib.sha256(b"a").hexdigest()},
+                "b.md": {
+                    "hash": hashlib.blake2b(b"b").hexdigest(),
+                    "hash_algorithm": "blake2b",
+                },
+                "c.md": {"hash": hashlib.sha256(b"c").hexdigest()},
+                "d.md": {"hash": hashlib.sha256(b"d").hexdigest()},
+            }
+        }
+
+        assert fetcher.verify_files(manifest) == ["c.md", "d.md"]
+
+
+class TestRunMetrics:
+    """Test suite for per-request timings and run metrics."""
+
+    PAGE = "/es/docs/claude-code/hooks"
+
+    def test_percentile_interpolates(self):
+        """Test percentiles between ranks."""
+        assert percentile([], 50) is None
+        assert percentile([3.0], 99) == 3.0
+        assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.5
+        assert percentile(list(range(101)), 95) == 95
+
+    def test_requests_are_timed(self, tmp_path):
+        """Test that a streamed page gets its waits and latencies recorded."""
+        config = FetcherConfig(docs_dir=tmp_path, requests_per_second=0)
+        fetcher = ClaudeCodeFetcher(config=config)
+        session = Mock()
+        session.get.return_value = make_response(text=VALID_MARKDOWN)
+
+        with patch.object(fetcher.rate_limiter, "acquire", return_value=0.25):
+            fetcher.fetch_markdown_content(self.PAGE, session, "")
+
+        (record,) = fetcher.metrics.requests()
+        assert record["status"] == 200
+        assert record["rate_limit_wait"] == 0.25
+        assert 0 <= record["ttfb"] <= record["total"]
+        summary = fetcher.metrics.summary()
+        assert summary["time_seconds"]["rate_limit_sleep"] == 0.25
+        assert summary["latency_seconds"]["total"]["p50"] == record["total"]
+
+    def test_throttled_replies_are_counted(self, tmp_path):
+        """Test that 429 retries show up in the status and retry counts."""
+        config = FetcherConfig(docs_dir=tmp_path, requests_per_second=0)
+        fetcher = ClaudeCodeFetcher(config=config)
+        session = Mock()
+        session.get.side_effect = [
+            make_response(status_code=429, headers={"Retry-After": "0"}),
+            make_response(text=VALID_MARKDOWN),
+        ]
+
+        fetcher.fetch_markdown_content(self.PAGE, session, "")
+
+        summary = fetcher.metrics.summary()
+        assert summary["status_codes"] == {"200": 1, "429": 1}
+        assert summary["retries"] == {"throttled": 1, "failed": 0}
+
+    def test_cache_hits_are_not_timed(self):
+        """Test that cache-served responses stay out of latency percentiles."""
+        metrics = RunMetrics()
+        metrics.record_request({"status": 200, "cache": "HIT"}, None)
+
+        summary = metrics.summary()
+        assert summary["requests"] == 1
+        assert summary["network_requests"] == 0
+        assert summary["latency_seconds"]["ttfb"]["p95"] is None
+
+    def test_phases_accumulate(self):
+        """Test that repeated phases add up."""
+        metrics = RunMetrics()
+        with patch(
+            "claude_code_docs_spa.fetcher.metrics.time.monotonic",
+            side_effect=[0.0, 1.5, 2.0, 2.5],
+        ):
+            with metrics.phase("writes"):
+                pass
+            with metrics.phase("writes"):
+                pass
+
+        assert metrics.summary()["phases_seconds"]["writes"] == 2.0
+
+    def test_prometheus_textfile(self, tmp_path):
+        """Test the Prometheus export of a run."""
+        metrics = RunMetrics()
+        timing = {"started": time.monotonic(), "rate_limit_wait": 0.0, "ttfb": 0.1}
+        metrics.record_request({"status": 200, "wire_bytes": 10}, timing)
+        path = tmp_path / "fetch.prom"
+
+        metrics.write(path)
+
+        text = path.read_text()
+        assert "# TYPE claude_code_docs_fetch_request_ttfb_seconds summary" in text
+        assert (
+            'claude_code_docs_fetch_request_ttfb_seconds{quantile="0.95"} 0.1' in text
+        )
+        assert 'claude_code_docs_fetch_responses{status="200"} 1' in text
+        assert 'claude_code_docs_fetch_bytes{encoding="wire"} 10' in text
+
+    def test_json_lines_export_after_run(self, tmp_path):
+        """Test that a run writes its requests and summary as JSON lines."""
+        metrics_file = tmp_path / "metrics.jsonl"
+        config = FetcherConfig(
+            docs_dir=tmp_path / "docs",
+            requests_per_second=0,
+            metrics_file=metrics_file,
+        )
+        fetcher = ClaudeCodeFetcher(config=config)
+        run, manifest = fetcher._start_run()
+        run.pages = ["/a"]
+        run.record_success("a.md", {"hash": ""})
+        fetcher.metrics.record_request({"url": "/a", "status": 200}, None)
+
+        fetcher._finalize_run(run, manifest)
+
+        lines = [json.loads(line) for line in metrics_file.read_text().splitlines()]
+        assert [line["type"] for line in lines] == ["request", "run"]
+        assert lines[1]["phases_seconds"]["cleanup"] >= 0
+        saved = json.loads((tmp_path / "docs" / "docs_manifest.json").read_text())
+        assert saved["fetch_metadata"]["metrics"]["requests"] == 1
+
+
+class TestCircuitBreaker:
+    """Test suite for per-host circuit breakers."""
+
+    def test_opens_after_consecutive_failures(self):
+        """Test that only consecutive failures open the circuit."""
+        breaker = CircuitBreaker(threshold=3, reset_timeout=30)
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.allow() is None
+
+        breaker.record_failure()
+
+        assert breaker.state == "open"
+        assert breaker.allow() > 0
+        assert breaker.snapshot()["short_circuited"] == 1
+
+    def test_half_open_lets_one_probe_through(self):
+        """Test probing once the reset timeout has passed."""
+        clock = [100.0]
+        with patch(
+            "claude_code_docs_spa.fetcher.circuit.time.monotonic",
+            side_effect=lambda: clock[0],
+        ):
+            breaker = CircuitBreaker(threshold=1, reset_timeout=30)
+            breaker.record_failure()
+            clock[0] += 31
+
+            assert breaker.allow(probe=False) is None
+            assert breaker.state == "open"
+            assert breaker.allow() is None
+            assert breaker.allow() is not None  # probe already in flight
+
+            breaker.record_failure()
+            assert breaker.state == "open"
+            assert breaker.times_opened == 2
+
+            clock[0] += 31
+            assert breaker.allow() is None
+            breaker.record_success()
+            assert breaker.state == "closed"
+
+    def test_refused_request_leaves_probe_slot(self, tmp_path):
+        """Test that a request stopped before sending does not take the probe."""
+        config = FetcherConfig(
+            docs_dir=tmp_path,
+            requests_per_second=0,
+            use_response_cache=False,
+            circuit_breaker_threshold=1,
+            circuit_breaker_reset_seconds=0,
+        )
+        fetcher = ClaudeCodeFetcher(config=config)
+        url = "https://docs.anthropic.com/a.md"
+        fetcher.circuit_breakers.record(url, failed=True)
+        # The budget runs out while the request waits for the rate limiter
+        fetcher.deadline = Mock(wraps=RunDeadline())
+        fetcher.deadline.check.side_effect = [None, DeadlineExceededError("x", 0)]
+
+        with pytest.raises(DeadlineExceededError):
+            fetcher._get(MagicMock(), url)
+
+        assert fetcher.circuit_breakers.breaker_for(url).allow() is None
+
+    def _dead_origin_fetcher(self, tmp_path, **kwargs):
+        config = FetcherConfig(
+            docs_dir=tmp_path / "docs",
+            requests_per_second=0,
+            use_response_cache=False,
+            circuit_breaker_threshold=3,
+            **kwargs,
+        )
+        fetcher = ClaudeCodeFetcher(config=config)
+        session = MagicMock()
+        session.__enter__.return_value = session
+        session.get.side_effect = requests.exceptions.ConnectionError("refused")
+        return fetcher, session
+
+    def test_dead_origin_fails_fast(self, tmp_path):
+        """Test that requests to a dead host stop once its circuit opens."""
+        fetcher, session = self._dead_origin_fetcher(tmp_path, max_workers=1)
+
+        with patch("claude_code_docs_spa.fetcher.core.time.sleep") as sleep:
+            for page in ["/a", "/b", "/c"]:
+                with pytest.raises(Exception):  # noqa: B017
+                    fetcher.fetch_markdown_content(page, session, "https://x")
+
+        assert session.get.call_count == 3
+        assert sleep.call_count == 2
+        with pytest.raises(CircuitOpenError):
+            fetcher.fetch_markdown_content("/d", session, "https://x")
+
+    def test_dead_origin_keeps_previous_mirror(self, tmp_path):
+        """Test that a run that fetched nothing leaves the docs untouched."""
+        fetcher, session = self._dead_origin_fetcher(tmp_path, max_workers=4)
+        docs_dir = fetcher.config.docs_dir
+        docs_dir.mkdir(exist_ok=True)
+        (docs_dir / "hooks.md").write_text(VALID_MARKDOWN)
+        manifest = {"files": {"hooks.md": {"hash": "h"}}, "fetch_metadata": {}}
+        (docs_dir / "docs_manifest.json").write_text(json.dumps(manifest))
+
+        with (
+            patch(
+                "claude_code_docs_spa.fetcher.core.create_session", return_value=session
+            ),
+            patch("claude_code_docs_spa.fetcher.core.time.sleep"),
+            pytest.raises(RuntimeError, match="previous documentation kept"),
+        ):
+            fetcher.fetch_all_documentation()
+
+        assert (docs_dir / "hooks.md").read_text() == VALID_MARKDOWN
+        assert json.loads((docs_dir / "docs_manifest.json").read_text()) == manifest
+        breakers = fetcher.circuit_breakers.states()
+        assert breakers["docs.anthropic.com"]["state"] == "open"
+        assert breakers["docs.anthropic.com"]["short_circuited"] > 0
+
+    def test_failed_page_keeps_previous_entry(self, tmp_path):
+        """Test that a page failing in a partial run keeps its file."""
+        config = FetcherConfig(docs_dir=tmp_path, requests_per_second=0)
+        fetcher = ClaudeCodeFetcher(config=config)
+        (tmp_path / "hooks.md").write_text(VALID_MARKDOWN)
+        manifest = {"files": {"hooks.md": {"hash": "h"}}}
+        run, _ = fetcher._start_run()
+        run.pages = ["/es/docs/claude-code/hooks", "/es/docs/claude-code/mcp"]
+        run.record_success("mcp.md", {"hash": "m"})
+
+        fetcher._record_page_result(
+            run, "/es/docs/claude-code/hooks", CircuitOpenError("x", 1), manifest
+        )
+        result = fetcher._finalize_run(run, manifest)
+
+        assert result["failed_pages"] == ["/es/docs/claude-code/hooks"]
+        assert (tmp_path / "hooks.md").exists()
+        saved = json.loads((tmp_path / "docs_manifest.json").read_text())
+        assert saved["files"]["hooks.md"] == {"hash": "h"}
+
+
+class TestRunDeadline:
+    """Test suite for the time budget of a run."""
+
+    PAGES = [
+        ("/es/docs/claude-code/hooks", None),
+        ("/es/docs/claude-code/setup", None),
+    ]
+
+    def test_budget_covers_expected_work(self):
+        """Test that work is refused once the time left cannot cover it."""
+        clock = [100.0]
+        with patch(
+            "claude_code_docs_spa.fetcher.deadline.time.monotonic",
+            side_effect=lambda: clock[0],
+        ):
+            deadline = RunDeadline(10)
+            deadline.check(9, "a page")
+            assert deadline.cap(30) == 10
+
+            clock[0] += 5
+            with pytest.raises(DeadlineExceededError, match="not enough for a page"):
+                deadline.check(6, "a page")
+            deadline.check(0, "a request")
+
+            clock[0] += 5
+            with pytest.raises(DeadlineExceededError):
+                deadline.check(0, "a request")
+
+        unlimited = RunDeadline()
+        unlimited.check(1e9, "anything")
+        assert unlimited.cap(30) == 30
+
+    def test_invalid_deadline_rejected(self):
+        """Test that a deadline must be positive."""
+        with pytest.raises(ValueError, match="deadline_seconds"):
+            FetcherConfig(deadline_seconds=0)
+
+    def test_pages_past_deadline_keep_previous_entries(self, tmp_path):
+        """Test that pages left by the deadline keep their files and entries."""
+        config = FetcherConfig(
+            docs_dir=tmp_path,
+            requests_per_second=0,
+            max_workers=1,
+            deadline_seconds=30,
+        )
+        fetcher = ClaudeCodeFetcher(config=config)
+        previous = {"hash": "old", "last_updated": "2025-01-01T00:00:00"}
+        (tmp_path / "setup.md").write_text(VALID_MARKDOWN)
+        (tmp_path / "docs_manifest.json").write_text(
+            json.dumps({"files": {"setup.md": previous}})
+        )
+        clock = [100.0]
+
+        def fetch_page(path, session, base_url, validators=None):
+            clock[0] += 40  # the first page uses up the whole budget
+            return fetcher.url_to_safe_filename(path), VALID_MARKDOWN.encode(), {}
+
+        with (
+            patch(
+                "claude_code_docs_spa.fetcher.deadline.time.monotonic",
+                side_effect=lambda: clock[0],
+            ),
+            patch.object(
+                fetcher,
+                "discover_documentation_pages",
+                return_value=("https://x/sitemap.xml", "https://x", self.PAGES),
+            ),
+            patch.object(fetcher, "fetch_markdown_content", side_effect=fetch_page),
+            patch.object(fetcher, "fetch_changelog") as fetch_changelog,
+        ):
+            result = fetcher.fetch_all_documentation()
+
+        assert result["pages_fetched"] == 1
+        assert result["pages_failed"] == 0
+        assert result["deferred_pages"] == ["/es/docs/claude-code/setup", "changelog"]
+        fetch_changelog.assert_not_called()
+        assert (tmp_path / "setup.md").read_text() == VALID_MARKDOWN
+        saved = json.loads((tmp_path / "docs_manifest.json").read_text())
+        assert saved["files"]["setup.md"] == previous
+        assert "hooks.md" in saved["files"]
+        assert saved["fetch_metadata"]["pages_deferred"] == 2
+
+    def test_retry_cancelled_by_deadline(self, tmp_path):
+        """Test that no back-off is slept for a retry that cannot finish."""
+        config = FetcherConfig(
+            docs_dir=tmp_path,
+            requests_per_second=0,
+            use_response_cache=False,
+            retry_delay=10,
+        )
+        fetcher = ClaudeCodeFetcher(config=config)
+        fetcher.deadline = RunDeadline(5)
+        session = MagicMock()
+        session.get.side_effect = requests.exceptions.ConnectionError("reset")
+
+        with (
+            patch("claude_code_docs_spa.fetcher.core.time.sleep") as sleep,
+            pytest.raises(DeadlineExceededError, match="retry of hooks.md"),
+        ):
+            fetcher.fetch_markdown_content(
+                "/es/docs/claude-code/hooks", session, "https://x"
+            )
+
+        assert session.get.call_count == 1
+        sleep.assert_not_called()
+        assert session.get.call_args.kwargs["timeout"] <= 5
+
+    def test_retry_after_pause_longer_than_budget(self, tmp_path):
+        """Test that a Retry-After pause outlasting the budget is not slept."""
+        config = FetcherConfig(
+            docs_dir=tmp_path, requests_per_second=0, use_response_cache=False
+        )
+        fetcher = ClaudeCodeFetcher(config=config)
+        fetcher.deadline = RunDeadline(5)
+        url = "https://docs.anthropic.com/a.md"
+        fetcher.rate_limiter.pause(url, 300)
+        session = MagicMock()
+
+        with (
+            patch("claude_code_docs_spa.fetcher.ratelimit.time.sleep") as sleep,
+            pytest.raises(DeadlineExceededError, match="rate limited"),
+        ):
+            fetcher._get(session, url)
+
+        sleep.assert_not_called()
+        session.get.assert_not_called()
+
+
+class TestGenerations:
+    """Test suite for generation directories published by symlink swap."""
+
+    PAGES = [
+        ("/es/docs/claude-code/hooks", None),
+        ("/es/docs/claude-code/setup", None),
+    ]
+
+    def _fetcher(self, tmp_path, **kwargs):
+        config = FetcherConfig(
+            docs_dir=tmp_path / "docs",
+            generations_dir=tmp_path / "generations",
+            requests_per_second=0,
+            **kwargs,
+        )
+        return ClaudeCodeFetcher(config=config)
+
+    def _run(self, fetcher, changed=(), fail=False):
+        def fetch_page(path, session, base_url, validators=None):
+            if fail:
+                raise Exception("down")
+            suffix = "v2" if path in changed else ""
+            body = (VALID_MARKDOWN + path + suffix).encode("utf-8")
+            return fetcher.url_to_safe_filename(path), body, {}
+
+        with (
+            patch.object(
+                fetcher,
+                "discover_documentation_pages",
+                return_value=("https://x/sitemap.xml", "https://x", self.PAGES),
+            ),
+            patch.object(fetcher, "fetch_markdown_content", side_effect=fetch_page),
+            patch.object(
+                fetcher,
+                "fetch_changelog",
+                side_effect=Exception("down") if fail else None,
+                return_value=("changelog.md", VALID_MARKDOWN.encode("utf-8"), {}),
+            ),
+        ):
+            return fetcher.fetch_all_documentation()
+
+    def test_run_is_published_as_symlink(self, tmp_path):
+        """Test that docs_dir points at a complete generation."""
+        fetcher = self._fetcher(tmp_path)
+        (tmp_path / "docs" / "notes.txt").write_text("kept")
+
+        self._run(fetcher)
+
+        docs = tmp_path / "docs"
+        assert docs.is_symlink()
+        assert docs.resolve().parent == tmp_path / "generations"
+        assert (docs / "hooks.md").exists()
+        assert (docs / "notes.txt").read_text() == "kept"
+        assert (
+            "hooks.md" in json.loads((docs / "docs_manifest.json").read_text())["files"]
+        )
+
+    def test_unchanged_files_are_hardlinked(self, tmp_path):
+        """Test that a new generation reuses unchanged files."""
+        fetcher = self._fetcher(tmp_path)
+        self._run(fetcher)
+        first = (tmp_path / "docs").resolve()
+
+        self._run(fetcher, changed={"/es/docs/claude-code/setup"})
+        second = (tmp_path / "docs").resolve()
+
+        assert first != second
+        assert (second / "hooks.md").stat().st_ino == (first / "hooks.md").stat().st_ino
+        assert (second / "setup.md").stat().st_ino != (first / "setup.md").stat().st_ino
+        assert (second / "setup.md").read_text().endswith("v2")
+
+    def test_old_generations_are_collected(self, tmp_path):
+        """Test that only keep_generations published generations remain."""
+        fetcher = self._fetcher(tmp_path, keep_generations=2)
+
+        for i in range(4):
+            self._run(fetcher, changed={"/es/docs/claude-code/setup"} if i % 2 else ())
+
+        generations = [
+            path
+            for path in (tmp_path / "generations").iterdir()
+            if path.name.startswith("gen-")
+        ]
+        assert len(generations) == 2
+        assert (tmp_path / "docs").resolve() in generations
+
+    def test_failed_run_is_not_published(self, tmp_path):
+        """Test that a run without any successful page keeps the old tree."""
+        fetcher = self._fetcher(tmp_path)
+        self._run(fetcher)
+        published = (tmp_path / "docs").resolve()
+
+        with pytest.raises(RuntimeError):
+            self._run(fetcher, fail=True)
+
+        assert (tmp_path / "docs").resolve() == published
+        assert list((tmp_path / "generations").glob("gen-2*")) == [published]
+
+
+class TestSearchIndex:
+    """Test suite for the full-text search index built after each run."""
+
+    def test_sections_split_on_headings_outside_code(self):
+        """Test that a heading inside a fenced block does not start a section."""
+        text = "Intro\n# Hooks\nText\n```bash\n# not a heading\n```\n## Setup\nMore"
+
+        assert split_sections(text) == [
+            ("", 0, 1),
+            ("Hooks", 1, 6),
+            ("Setup", 6, 8),
+        ]
+
+    def test_tokens_are_folded_and_split(self):
+        """Test case and accent folding and splitting of identifiers."""
+        assert tokenize("Configuración de CLAUDE_CODE_USE_BEDROCK en a.json") == [
+            "configuracion",
+            "de",
+            "claude",
+            "code",
+            "use",
+            "bedrock",
+            "en",
+            "json",
+        ]
+
+    def test_postings_count_heading_words(self, tmp_path):
+        """Test postings, section rows and the weight of heading words."""
+        (tmp_path / "hooks.md").write_text("# Hooks\n\nHooks run commands.\n")
+        (tmp_path / "setup.md").write_text("# Setup\n\nInstall then run.\n")
+        (tmp_path / "notes.txt").write_text("hooks")
+
+        index = build_search_index(tmp_path, ["setup.md", "hooks.md", "notes.txt"])
+
+        assert index["files"] == ["hooks.md", "setup.md"]
+        assert index["sections"] == [[0, "Hooks", 0, 3, 6], [1, "Setup", 0, 3, 6]]
+        assert index["postings"]["hooks"] == [0, 4]
+        assert index["postings"]["run"] == [0, 1, 1, 1]
+        assert index["average_length"] == 6
+
+    def test_run_publishes_index_with_manifest(self, tmp_path):
+        """Test that a run writes the index and records it in the manifest."""
+        fetcher = ClaudeCodeFetcher(
+            config=FetcherConfig(docs_dir=tmp_path / "docs", requests_per_second=0)
+        )
+
+        result = TestGenerations()._run(fetcher)
+
+        index_path = tmp_path / "docs" / SEARCH_INDEX_FILE
+        index = json.loads(index_path.read_text())
+        assert index["files"] == ["changelog.md", "hooks.md", "setup.md"]
+        entry = json.loads((tmp_path / "docs" / "docs_manifest.json").read_text())[
+            "search_index"
+        ]
+        assert entry["file"] == SEARCH_INDEX_FILE
+        assert entry["hash"] == hashlib.sha256(index_path.read_bytes()).hexdigest()
+        assert result["search_index"] == entry
+        assert SEARCH_INDEX_FILE not in fetcher.verify_files()
+
+    def test_index_is_not_carried_into_new_generation(self, tmp_path):
+        """Test that a generation gets its own index, not a link to the old one."""
+        generations = TestGenerations()
+        fetcher = generations._fetcher(tmp_path)
+        generations._run(fetcher)
+        first = (tmp_path / "docs").resolve() / SEARCH_INDEX_FILE
+
+        generations._run(fetcher, changed={"/es/docs/claude-code/setup"})
+        second = (tmp_path / "docs").resolve() / SEARCH_INDEX_FILE
+
+        assert second.stat().st_ino != first.stat().st_ino
+        assert first.stat().st_nlink == 1
+
+    def test_index_can_be_disabled(self, tmp_path):
+        """Test that search_index_file=None builds no index."""
+        fetcher = ClaudeCodeFetcher(
+            config=FetcherConfig(
+                docs_dir=tmp_path / "docs",
+                requests_per_second=0,
+                search_index_file=None,
+            )
+        )
+
+        result = TestGenerations()._run(fetcher)
+
+        assert result["search_index"] is None
+        assert not (tmp_path / "docs" / SEARCH_INDEX_FILE).exists()
@@ -1,17 +1,45 @@
 """Tests for installer module."""
 
 import asyncio
+import hashlib
+import importlib.util
+import io
 import json
+import os
+import shutil
+import subprocess
 import sys
+import time
+import urllib.error
 from pathlib import Path
 from tempfile import TemporaryDirectory
 from unittest.mock import Mock, patch
 
 import pytest
 
+from claude_code_docs_spa.fetcher.search import build_search_index, encode_search_index
 from claude_code_docs_spa.installer.config import InstallerConfig
 from claude_code_docs_spa.installer.core import ClaudeCodeInstaller
 from claude_code_docs_spa.installer.helper import HelperScriptGenerator
+from claude_code_docs_spa.installer.update import ManifestUpdater
+
+
+def load_helper(install_dir, **config):
+    """Load the generated helper script against a fake installation."""
+    config = InstallerConfig(install_dir=install_dir, **config)
+    content = HelperScriptGenerator(config).generate_helper_script_content()
+    namespace = {"__name__": "helper", "__file__": str(install_dir / "helper.py")}
+    exec(compile(content, "helper.py", "exec"), namespace)  # noqa: S102
+    namespace.update(
+        DOCS_PATH=install_dir,
+        MANIFEST_FILE=install_dir / "docs" / "docs_manifest.json",
+        MANIFEST_ETAG=install_dir / ".docs-manifest-etag",
+        MANIFEST_CHANGES=install_dir / ".docs-manifest-changes.json",
+        UPDATE_STAMP=install_dir / ".docs-update-stamp",
+        UPDATE_LOCK=install_dir / ".docs-update.lock",
+        SEARCH_INDEX_FILE=install_dir / "docs" / "search_index.json",
+    )
+    return namespace
 
 
 class TestInstallerConfig:
@@ -571,3 +599,458 @@ class TestClaudeCodeInstaller:
         for result in results:
             assert result["installed"] is True
             assert result["dry_run"] is True
+
+
+class TestHelperAutoUpdate:
+    """Test suite for the background auto-update of the generated helper."""
+
+    @pytest.fixture
+    def helper(self, tmp_path):
+        """Load the generated helper script against a fake installation."""
+        return load_helper(tmp_path, update_ttl_seconds=60)
+
+    def test_update_runs_in_background_once_per_ttl(self, helper):
+        """Test that a due check is spawned detached and then throttled."""
+        with patch("subprocess.Popen") as popen:
+            assert helper["auto_update"]() is True
+            assert helper["auto_update"]() is False
+
+        popen.assert_called_once()
+        args, kwargs = popen.call_args
+        assert args[0][-1] == "background-update"
+        assert kwargs["stdout"] is not None
+        assert helper["UPDATE_STAMP"].exists()
+        assert helper["UPDATE_LOCK"].exists()
+
+    def test_update_in_progress_is_not_duplicated(self, helper):
+        """Test that a held lock keeps a due check from spawning again."""
+        helper["UPDATE_LOCK"].write_text("1234")
+
+        with patch("subprocess.Popen") as popen:
+            assert helper["auto_update"]() is False
+
+        popen.assert_not_called()
+
+    def test_stale_lock_is_taken_over(self, helper):
+        """Test that the lock of an update that died is replaced."""
+        lock = helper["UPDATE_LOCK"]
+        lock.write_text("1234")
+        old = time.time() - helper["UPDATE_LOCK_STALE_SECONDS"] - 1
+        os.utime(lock, (old, old))
+
+        with patch("subprocess.Popen") as popen:
+            assert helper["auto_update"]() is True
+
+        popen.assert_called_once()
+        assert lock.read_text() == str(os.getpid())
+
+    def test_background_update_releases_lock(self, helper, monkeypatch):
+        """Test that the spawned update frees the lock when it is done."""
+        monkeypatch.chdir(helper["DOCS_PATH"])  # restored after run_update's chdir
+        helper["UPDATE_LOCK"].write_text("1234")
+
+        with patch("subprocess.run", side_effect=OSError("no git")):
+            assert helper["run_update"]() is False
+
+        assert not helper["UPDATE_LOCK"].exists()
+
+    @pytest.mark.parametrize(("value", "ttl"), [("120", 120), ("1h", 60), ("", 60)])
+    def test_ttl_override(self, tmp_path, monkeypatch, value, ttl):
+        """Test that an invalid CLAUDE_DOCS_UPDATE_TTL falls back to the config."""
+        monkeypatch.setenv("CLAUDE_DOCS_UPDATE_TTL", value)
+
+        helper = load_helper(tmp_path, update_ttl_seconds=60)
+
+        assert helper["UPDATE_TTL_SECONDS"] == ttl
+
+
+def hook_command(config):
+    """Get the installed hook command, run by this test's interpreter."""
+    command = HelperScriptGenerator(config).generate_hook_command()
+    return command.replace("python", f'"{sys.executable}"', 1)
+
+
+class TestHookScript:
+    """Test suite for the minimal PreToolUse hook entry point."""
+
+    @staticmethod
+    def _install(install_dir, **kwargs):
+        """Create an installation whose helper only leaves a marker file."""
+        config = InstallerConfig(
+            install_dir=install_dir,
+            settings_file=install_dir.parent / "settings.json",
+            update_ttl_seconds=60,
+            **kwargs,
+        )
+        config.install_dir.mkdir()
+        config.helper_script_path.write_text(
+            "import pathlib, sys\n"
+            "pathlib.Path(__file__).with_name('called').write_text(sys.argv[1])\n"
+        )
+        return config
+
+    @pytest.fixture
+    def config(self, tmp_path):
+        """Create an installation whose helper only leaves a marker file."""
+        return self._install(tmp_path / "install")
+
+    def test_hook_is_compiled_and_registered(self, config):
+        """Test that install writes bytecode and points the hook at it."""
+        installer = ClaudeCodeInstaller(config)
+        hook_path = installer.helper_generator.create_hook_script()
+        installer.setup_auto_update()
+
+        assert Path(importlib.util.cache_from_source(str(hook_path))).exists()
+        settings = json.loads(config.settings_file.read_text())
+        command = settings["hooks"]["PreToolUse"][0]["hooks"][0]["command"]
+        assert command == installer.helper_generator.generate_hook_command()
+        assert "import claude_docs_hook" in command
+
+    def test_hook_command_survives_shell_characters(self, tmp_path):
+        """Test an install path with quotes, $ and backticks."""
+        config = self._install(tmp_path / 'it\'s "$HOME" `id`', hook_scope="session")
+        HelperScriptGenerator(config).create_hook_script()
+
+        subprocess.run(hook_command(config), shell=True, check=True)  # noqa: S602
+
+        assert (config.install_dir / "called").read_text() == "hook-check"
+
+    @pytest.mark.parametrize(
+        ("scope", "event", "matcher"),
+        [("session", "SessionStart", None), ("docs", "PreToolUse", "Read")],
+    )
+    def test_scope_selects_hook_event(self, tmp_path, scope, event, matcher):
+        """Test the settings entry written for each hook scope."""
+        config = InstallerConfig(install_dir=tmp_path, hook_scope=scope)
+
+        hook_event, entry = HelperScriptGenerator(config).generate_hook_settings()
+
+        assert hook_event == event
+        assert entry.get("matcher") == matcher
+
+    def test_docs_scope_ignores_other_reads(self, config):
+        """Test that reads outside the docs mirror end the hook at once."""
+        HelperScriptGenerator(config).create_hook_script()
+        other = {"tool_name": "Read", "tool_input": {"file_path": "/src/app.py"}}
+        docs = {"tool_input": {"file_path": str(config.docs_dir / "hooks.md")}}
+
+        for payload in (other, docs):
+            subprocess.run(  # noqa: S602
+                hook_command(config),
+                shell=True,
+                check=True,
+                input=json.dumps(payload),
+                text=True,
+            )
+            called = (config.install_dir / "called").exists()
+            assert called == (payload is docs)
+
+    @pytest.mark.parametrize("ensure_ascii", [False, True])
+    def test_docs_scope_matches_non_ascii_install_dir(self, tmp_path, ensure_ascii):
+        """Test a docs path with non-ASCII characters, raw or escaped."""
+        config = self._install(tmp_path / "José")
+        HelperScriptGenerator(config).create_hook_script()
+        payload = {"tool_input": {"file_path": str(config.docs_dir / "hooks.md")}}
+
+        subprocess.run(  # noqa: S602
+            hook_command(config),
+            shell=True,
+            check=True,
+            input=json.dumps(payload, ensure_ascii=ensure_ascii).encode("utf-8"),
+            env={**os.environ, "LC_ALL": "C"},
+        )
+
+        assert (config.install_dir / "called").read_text() == "hook-check"
+
+    def test_uninstall_removes_every_hook_form(self, config):
+        """Test that old and new hook entries go, other hooks stay."""
+        installer = ClaudeCodeInstaller(config)
+        config.hook_scope = "session"
+        other = {"matcher": "Bash", "hooks": [{"type": "command", "command": "lint"}]}
+        old = {
+            "matcher": "Read",
+            "hooks": [
+                {
+                    "type": "command",
+                    "command": f'python "{config.helper_script_path}" hook-check',
+                }
+            ],
+        }
+        settings = {"hooks": {"PreToolUse": [other, old]}}
+        config.settings_file.write_text(json.dumps(settings))
+        installer.setup_auto_update()
+
+        result = installer.uninstall(skip_dir_removal=True)
+
+        assert result["details"]["hooks_removed"] is True
+        settings = json.loads(config.settings_file.read_text())
+        assert settings["hooks"] == {"PreToolUse": [other], "SessionStart": []}
+
+    def test_unrelated_hooks_naming_the_helper_stay(self, config):
+        """Test that only hooks pointing into the install directory are ours."""
+        installer = ClaudeCodeInstaller(config)
+        commands = [
+            'python "/opt/tools/claude-docs-helper.py" hook-check',
+            "python -c 'import claude_docs_hook'",
+            "echo claude-code-docs-spa",
+        ]
+        other = {
+            "matcher": "Read",
+            "hooks": [{"type": "command", "command": command} for command in commands],
+        }
+        config.settings_file.write_text(json.dumps({"hooks": {"PreToolUse": [other]}}))
+        installer.setup_auto_update()
+
+        installer.uninstall(skip_dir_removal=True)
+
+        settings = json.loads(config.settings_file.read_text())
+        assert settings["hooks"]["PreToolUse"] == [other]
+
+    def test_hook_only_calls_helper_when_due(self, config):
+        """Test that a fresh stamp ends the hook without running the helper."""
+        config.hook_scope = "session"
+        HelperScriptGenerator(config).create_hook_script()
+        config.update_stamp_path.touch()
+
+        subprocess.run(hook_command(config), shell=True, check=True)  # noqa: S602
+        assert not (config.install_dir / "called").exists()
+
+        old = time.time() - 120
+        os.utime(config.update_stamp_path, (old, old))
+        subprocess.run(hook_command(config), shell=True, check=True)  # noqa: S602
+        assert (config.install_dir / "called").read_text() == "hook-check"
+
+
+class FakeResponse(io.BytesIO):
+    """Body and headers of a canned urlopen response."""
+
+    def __init__(self, body, headers):
+        super().__init__(body)
+        self.headers = headers
+
+
+class FakeMirror:
+    """Stands in for urlopen, serving a published manifest and its files."""
+
+    BASE_URL = "https://mirror.test/docs/"
+
+    def __init__(self, files, etag='"v1"'):
+        self.files = dict(files)
+        self.etag = etag
+        self.requested = []
+        self.corrupt = set()
+        self.search_index = None
+
+    def manifest(self):
+        entries = {
+            name: {"hash": hashlib.sha256(body).hexdigest()}
+            for name, body in self.files.items()
+        }
+        manifest = {"base_url": self.BASE_URL, "files": entries}
+        if self.search_index in entries:
+            manifest["search_index"] = {
+                "file": self.search_index,
+                **entries.pop(self.search_index),
+            }
+        return manifest
+
+    def urlopen(self, request, timeout=None):
+        url = request.full_url
+        self.requested.append(url)
+        if url.endswith("docs_manifest.json"):
+            if request.headers.get("If-none-match") == self.etag:
+                raise urllib.error.HTTPError(url, 304, "Not Modified", {}, None)
+            body = json.dumps(self.manifest()).encode()
+            return FakeResponse(body, {"ETag": self.etag})
+        name = url.removeprefix(self.BASE_URL)
+        body = b"tampered" if name in self.corrupt else self.files[name]
+        return FakeResponse(body, {})
+
+
+class TestManifestUpdater:
+    """Test suite for manifest-driven delta updates of an installed mirror."""
+
+    @pytest.fixture
+    def config(self, tmp_path):
+        """Create an installation with an outdated mirror."""
+        config = InstallerConfig(install_dir=tmp_path)
+        docs = config.docs_dir
+        docs.mkdir()
+        (docs / "hooks.md").write_bytes(b"# Hooks")
+        (docs / "setup.md").write_bytes(b"# Setup v1")
+        (docs / "old.md").write_bytes(b"# Old")
+        config.manifest_file_path.write_text(
+            json.dumps({"files": {"hooks.md": {}, "setup.md": {}, "old.md": {}}})
+        )
+        return config
+
+    @pytest.fixture
+    def mirror(self):
+        """Publish a manifest with one changed, one new and one removed file."""
+        return FakeMirror(
+            {"hooks.md": b"# Hooks", "setup.md": b"# Setup v2", "mcp.md": b"# MCP"}
+        )
+
+    def test_only_changed_files_are_downloaded(self, config, mirror):
+        """Test that files whose hash matches are not downloaded."""
+        with patch("urllib.request.urlopen", side_effect=mirror.urlopen):
+            result = ManifestUpdater(config).update()
+
+        assert sorted(result["files_updated"]) == ["mcp.md", "setup.md"]
+        assert result["files_removed"] == ["old.md"]
+        assert f"{FakeMirror.BASE_URL}hooks.md" not in mirror.requested
+        assert (config.docs_dir / "setup.md").read_bytes() == b"# Setup v2"
+        assert not (config.docs_dir / "old.md").exists()
+        saved = json.loads(config.manifest_file_path.read_text())
+        assert saved == mirror.manifest()
+        assert (config.install_dir / ".docs-manifest-etag").read_text() == '"v1"'
+        changes = json.loads(
+            (config.install_dir / ".docs-manifest-changes.json").read_text()
+        )
+        assert changes["updated"] == ["mcp.md", "setup.md"]
+        assert changes["removed"] == ["old.md"]
+
+    def test_unchanged_manifest_is_not_applied_again(self, config, mirror):
+        """Test that a 304 for the manifest ends the update."""
+        with patch("urllib.request.urlopen", side_effect=mirror.urlopen):
+            ManifestUpdater(config).update()
+            mirror.requested.clear()
+            result = ManifestUpdater(config).update()
+
+        assert result["up_to_date"] is True
+        assert len(mirror.requested) == 1
+
+    def test_corrupt_download_keeps_old_manifest(self, config, mirror):
+        """Test that a file failing verification is not written."""
+        mirror.corrupt.add("setup.md")
+        old_manifest = config.manifest_file_path.read_text()
+
+        with patch("urllib.request.urlopen", side_effect=mirror.urlopen):
+            result = ManifestUpdater(config).update()
+
+        assert result["files_failed"] == ["setup.md"]
+        assert (config.docs_dir / "setup.md").read_bytes() == b"# Setup v1"
+        assert (config.docs_dir / "old.md").exists()
+        assert config.manifest_file_path.read_text() == old_manifest
+        assert not (config.install_dir / ".docs-manifest-etag").exists()
+
+    def test_helper_applies_manifest_delta(self, config, mirror):
+        """Test the same delta update in the generated helper script."""
+        helper = load_helper(config.install_dir)
+
+        with patch("urllib.request.urlopen", side_effect=mirror.urlopen):
+            result = helper["manifest_update"]()
+            again = helper["manifest_update"]()
+
+        assert sorted(result["updated"]) == ["mcp.md", "setup.md"]
+        assert result["removed"] == ["old.md"]
+        assert again is None
+        assert (config.docs_dir / "mcp.md").read_bytes() == b"# MCP"
+        assert f"{FakeMirror.BASE_URL}hooks.md" not in mirror.requested
+
+    def test_whats_new_lists_last_manifest_delta(
+        self, config, mirror, capsys, monkeypatch
+    ):
+        """Test that /docs -t shows the applied delta without git history."""
+        monkeypatch.chdir(config.install_dir)
+        helper = load_helper(config.install_dir)
+        helper["auto_update"] = lambda: None
+
+        with patch("urllib.request.urlopen", side_effect=mirror.urlopen):
+            helper["manifest_update"]()
+        with patch("subprocess.run") as run:
+            helper["whats_new"]()
+
+        run.assert_not_called()
+        output = capsys.readouterr().out
+        assert "• mcp\n• setup\n• old (removed)\n" in output
+        assert "hooks" not in output
+
+    def test_corrupt_local_manifest_is_replaced(self, config, mirror):
+        """Test that a truncated local manifest does not stop the update."""
+        config.manifest_file_path.write_text('{"files": {"hooks.md"')
+
+        with patch("urllib.request.urlopen", side_effect=mirror.urlopen):
+            result = ManifestUpdater(config).update()
+
+        assert sorted(result["files_updated"]) == ["mcp.md", "setup.md"]
+        assert json.loads(config.manifest_file_path.read_text()) == mirror.manifest()
+        assert not list(config.docs_dir.glob(".*"))
+
+    def test_search_index_is_updated(self, config, mirror):
+        """Test that the index named by the manifest is downloaded with the pages."""
+        mirror.files["search_index.json"] = b'{"version":1}'
+        mirror.search_index = "search_index.json"
+        helper_config = InstallerConfig(install_dir=config.install_dir / "helper")
+        shutil.copytree(config.docs_dir, helper_config.docs_dir)
+        helper = load_helper(helper_config.install_dir)
+
+        with patch("urllib.request.urlopen", side_effect=mirror.urlopen):
+            result = ManifestUpdater(config).update()
+            helper_result = helper["manifest_update"]()
+
+        assert "search_index.json" in result["files_updated"]
+        assert "search_index.json" in helper_result["updated"]
+        for docs_dir in (config.docs_dir, helper_config.docs_dir):
+            assert (docs_dir / "search_index.json").read_bytes() == b'{"version":1}'
+
+    def test_manifest_url_follows_repository(self):
+        """Test the raw URL of the published manifest."""
+        config = InstallerConfig(repo_url="https://github.com/me/docs")
+
+        assert config.manifest_url == (
+            "https://raw.githubusercontent.com/me/docs/main/docs/docs_manifest.json"
+        )
+        with pytest.raises(ValueError, match="update_mode"):
+            InstallerConfig(update_mode="rsync")
+
+
+class TestHelperSearch:
+    """Test suite for /docs search in the generated helper script."""
+
+    @pytest.fixture
+    def helper(self, tmp_path):
+        """Load the helper over a mirror with a search index."""
+        docs = tmp_path / "docs"
+        docs.mkdir()
+        (docs / "hooks.md").write_text(
+            "# Hooks\n\nHooks run shell commands.\n\n"
+            "## Configuración\n\nAdd hooks to settings.json under PreToolUse.\n"
+        )
+        (docs / "settings.md").write_text(
+            "# Settings\n\nThe settings.json file sets permissions and env.\n"
+        )
+        index = build_search_index(docs, ["hooks.md", "settings.md"])
+        (docs / "search_index.json").write_bytes(encode_search_index(index))
+        helper = load_helper(tmp_path)
+        helper["auto_update"] = lambda: None
+        return helper
+
+    def test_sections_are_ranked_with_snippets(self, helper, capsys):
+        """Test ranked sections, accent folding and snippets."""
+        helper["search_docs"]("configuracion hooks")
+
+        out = capsys.readouterr().out
+        first, second = out.split("1. ", 1)[1].split("2. ", 1)
+        assert first.startswith("hooks > Configuración (line 5)")
+        assert "Add hooks to settings.json under PreToolUse." in first
+        assert second.startswith("hooks > Hooks (line 1)")
+        assert "settings >" not in out
+
+    def test_bm25_prefers_frequent_term(self, helper):
+        """Test that scores follow term frequency within a section."""
+        index = helper["load_search_index"]()
+
+        ranked = helper["search_sections"](index, {"settings"})
+
+        sections = [index["sections"][section] for section, _ in ranked]
+        assert [row[1] for row in sections] == ["Settings", "Configuración"]
+
+    def test_missing_index_is_reported(self, tmp_path, capsys):
+        """Test the message shown before the index was downloaded."""
+        helper = load_helper(tmp_path)
+        helper["auto_update"] = lambda: None
+
+        helper["search_docs"]("hooks")
+
+        assert "Search index not found" in capsys.readouterr().out
@@ -1,7 +1,7 @@
 """Tests for main module."""
 
 from tempfile import TemporaryDirectory
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -27,7 +27,8 @@ class TestMain:
         """Test main function with successful fetch."""
         with patch("claude_code_docs_spa.main.ClaudeCodeFetcher") as mock_fetcher_class:
             mock_fetcher = MagicMock()
-            mock_fetcher.fetch_all_documentation.return_value = {
+            mock_fetcher.afetch_all_documentation = AsyncMock()
+            mock_fetcher.afetch_all_documentation.return_value = {
                 "pages_discovered": 10,
                 "pages_fetched": 8,
                 "pages_failed": 2,
@@ -49,7 +50,8 @@ class TestMain:
         """Test main function with fetch error."""
         with patch("claude_code_docs_spa.main.ClaudeCodeFetcher") as mock_fetcher_class:
             mock_fetcher = MagicMock()
-            mock_fetcher.fetch_all_documentation.side_effect = Exception(
+            mock_fetcher.afetch_all_documentation = AsyncMock()
+            mock_fetcher.afetch_all_documentation.side_effect = Exception(
                 "Network error"
             )
             mock_fetcher_class.return_value = mock_fetcher
@@ -141,19 +143,19 @@ class TestMain:
             assert "file not found" in result["error"].lower()
 
     @pytest.mark.asyncio
-    async def test_main_unknown_command(self):
+    async def test_main_unknown_command(self, tmp_path):
         """Test main function with unknown command."""
         # Mock the argument parser to avoid SystemExit
         with patch("sys.exit"):
-            result = await main(["unknown"])
+            result = await main(["--docs-dir", str(tmp_path / "docs"), "unknown"])
 
             assert result["status"] == "error"
             assert "unknown" in result["message"].lower()
 
     @pytest.mark.asyncio
-    async def test_main_default_command(self):
+    async def test_main_default_command(self, tmp_path):
         """Test main function with default command (fetch)."""
-        result = await main([])
+        result = await main(["--docs-dir", str(tmp_path / "docs")])
 
         # Should default to fetch command
         assert "status" in result
@@ -278,7 +280,8 @@ class TestMain:
         """Test that main function handles exceptions gracefully."""
         with patch("claude_code_docs_spa.main.ClaudeCodeFetcher") as mock_fetcher_class:
             mock_fetcher = MagicMock()
-            mock_fetcher.fetch_all_documentation.side_effect = Exception("Test error")
+            mock_fetcher.afetch_all_documentation = AsyncMock()
+            mock_fetcher.afetch_all_documentation.side_effect = Exception("Test error")
             mock_fetcher_class.return_value = mock_fetcher
 
             result = await main(["fetch"])
@@ -0,0 +1,135 @@
+"""Tests for profiling module."""
+
+import pstats
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from claude_code_docs_spa.main import main
+from claude_code_docs_spa.profiling import CommandProfiler, SamplingProfiler
+
+
+def busy_worker() -> None:
+    """Burn a little CPU in a named function."""
+    sum(i * i for i in range(20_000))
+
+
+class TestCommandProfiler:
+    """Test suite for CLI command profiling."""
+
+    def test_invalid_mode_rejected(self, tmp_path):
+        """Test that unknown profilers are rejected."""
+        with pytest.raises(ValueError, match="mode"):
+            CommandProfiler(tmp_path, "fetch", mode="perf")
+
+    def test_cprofile_covers_worker_threads(self, tmp_path):
+        """Test that functions run in threads started while profiling show up."""
+        with CommandProfiler(tmp_path, "fetch", top=5) as profiler:
+            worker = threading.Thread(target=busy_worker)
+            worker.start()
+            worker.join()
+
+        assert profiler.data_path.suffix == ".prof"
+        functions = {name for _, _, name in pstats.Stats(str(profiler.data_path)).stats}
+        assert "busy_worker" in functions
+        assert "cumulative" in profiler.summary_path.read_text()
+        assert threading.getprofile() is None
+
+    def test_cprofile_covers_thread_pool_workers(self, tmp_path):
+        """Test profiling work submitted to a pool, as fetch does."""
+        with (
+            CommandProfiler(tmp_path, "fetch") as profiler,
+            ThreadPoolExecutor(max_workers=4) as executor,
+        ):
+            futures = [executor.submit(busy_worker) for _ in range(8)]
+            results = [future.result(timeout=10) for future in futures]
+
+        assert results == [None] * 8
+        calls = {
+            name: stats[1]
+            for (_, _, name), stats in pstats.Stats(
+                str(profiler.data_path)
+            ).stats.items()
+        }
+        assert calls["busy_worker"] == 8
+
+    def test_cprofile_reads_worker_still_running(self, tmp_path):
+        """Test that a worker outliving the command reports its work so far."""
+        done, release = threading.Event(), threading.Event()
+
+        def worker():
+            busy_worker()
+            done.set()
+            release.wait(timeout=10)
+            busy_worker()
+
+        with CommandProfiler(tmp_path, "fetch") as profiler:
+            thread = threading.Thread(target=worker)
+            thread.start()
+            assert done.wait(timeout=10)
+
+        release.set()
+        thread.join(timeout=10)
+
+        calls = {
+            name: stats[1]
+            for (_, _, name), stats in pstats.Stats(
+                str(profiler.data_path)
+            ).stats.items()
+        }
+        assert calls["busy_worker"] == 1
+        assert not thread.is_alive()
+
+    def test_sampling_writes_collapsed_stacks(self, tmp_path):
+        """Test the collapsed-stack output of the sampling profiler."""
+        with CommandProfiler(tmp_path, "install", mode="sampling") as profiler:
+            time.sleep(0.05)
+
+        assert profiler.data_path.name.startswith("profile-install-")
+        lines = profiler.data_path.read_text().splitlines()
+        assert lines
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+        assert "Self samples:" in profiler.summary_path.read_text()
+
+    def test_sampling_summary_counts_functions(self):
+        """Test self and inclusive counts of sampled stacks."""
+        sampler = SamplingProfiler(interval=0.01)
+        sampler.stacks.update({"MainThread;main;fetch": 3, "MainThread;main": 1})
+
+        summary = sampler.summary(top=5)
+
+        assert "4 samples every 10 ms" in summary
+        self_part, inclusive_part = summary.split("Inclusive samples:")
+        assert self_part.split()[-6:] == ["3", "75.0%", "fetch", "1", "25.0%", "main"]
+        assert inclusive_part.split()[:3] == ["4", "100.0%", "main"]
+
+
+class TestProfileOption:
+    """Test suite for the --profile CLI option."""
+
+    @pytest.mark.asyncio
+    async def test_fetch_is_profiled(self, tmp_path):
+        """Test that --profile writes a profile and reports its paths."""
+        with patch("claude_code_docs_spa.main.ClaudeCodeFetcher") as mock_fetcher_class:
+            mock_fetcher = MagicMock()
+            mock_fetcher.afetch_all_documentation = AsyncMock(return_value={})
+            mock_fetcher_class.return_value = mock_fetcher
+
+            result = await main(
+                ["fetch", "--profile", "--profile-dir", str(tmp_path / "profiles")]
+            )
+
+        assert result["status"] == "success"
+        assert result["profile"]["mode"] == "cprofile"
+        assert (tmp_path / "profiles").is_dir()
+        assert result["profile"]["data"].endswith(".prof")
+
+    @pytest.mark.asyncio
+    async def test_dry_run_is_not_profiled(self):
+        """Test that a dry run writes no profile."""
+        result = await main(["fetch", "--dry-run", "--profile"])
+
+        assert "profile" not in result